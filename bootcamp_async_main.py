@@ -0,0 +1,77 @@
+"""
+Bootcamp F2025
+
+Main process that runs every worker as a task on a single event loop instead of as processes
+"""
+
+import asyncio
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.async_runtime import async_runtime
+from modules.command import command
+from modules.telemetry import telemetry
+from utilities.mavlink import mavlink_parser
+
+
+# MAVLink connection
+CONNECTION_STRING = "tcp:localhost:12345"
+USE_NATIVE_PARSER = True
+
+RUN_TIME = 100  # seconds
+HEARTBEAT_PERIOD = 1  # seconds
+TELEMETRY_FUSION_MODE = telemetry.FusionMode.INTERPOLATE
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    connection, _ = mavlink_parser.mavlink_connection(CONNECTION_STRING, USE_NATIVE_PARSER)
+    connection.wait_heartbeat(timeout=30)  # Wait for the "drone" to connect
+    main_logger.info("Connected!")
+
+    result = asyncio.run(
+        async_runtime.run_vehicle(
+            connection,
+            command.Position(10, 20, 30),
+            RUN_TIME,
+            main_logger,
+            TELEMETRY_FUSION_MODE,
+            HEARTBEAT_PERIOD,
+        )
+    )
+    connection.close()
+    if not result:
+        main_logger.error("Stopped early")
+        return -1
+
+    main_logger.info("Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
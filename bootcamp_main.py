@@ -8,16 +8,21 @@ import multiprocessing as mp
 import queue
 import time
 
-from pymavlink import mavutil
-
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.command import command
 from modules.command import command_worker
-from modules.heartbeat import heartbeat_receiver_worker
-from modules.heartbeat import heartbeat_sender_worker
+from modules.heartbeat import heartbeat_link_worker
+from modules.link_quality import link_quality_board
+from modules.mavlink_demux import mavlink_demux_worker
+from modules.mavlink_demux import subscriber_connection
+from modules.stream_rate import stream_rate_negotiator
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_state_board
 from modules.telemetry import telemetry_worker
+from utilities.mavlink import mavlink_parser
+from utilities.metrics import latency_histogram
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from utilities.workers import worker_manager
@@ -25,27 +30,130 @@ from utilities.workers import worker_manager
 
 # MAVLink connection
 CONNECTION_STRING = "tcp:localhost:12345"
+# Parse frames in C if pymavlink was built with the native extension, otherwise Python is used
+USE_NATIVE_PARSER = True
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 # Set queue max sizes (<= 0 for infinity)
 QUEUE_MAX_SIZE = 0
+# Demultiplexer subscription queues must be bounded so a stalled worker cannot grow them forever
+SUBSCRIPTION_QUEUE_MAX_SIZE = 100
 
 # Set worker counts
-HEARTBEAT_SENDER_COUNT = 1
-HEARTBEAT_RECEIVER_COUNT = 1
 TELEMETRY_WORKER_COUNT = 1
 COMMAND_WORKER_COUNT = 1
 
 # Any other constants
+# Interpolate attitude to every position timestamp instead of pairing the latest of each
+TELEMETRY_FUSION_MODE = telemetry.FusionMode.INTERPOLATE
 RUN_TIME = 100  # seconds
+METRICS_LOG_PERIOD = 10  # seconds
+# Only have the vehicle send the subscribed periodic messages, at these rates (Hz)
+NEGOTIATE_STREAM_RATES = True
+STREAM_RATES = {
+    "ATTITUDE": 10,
+    "LOCAL_POSITION_NED": 10,
+}
+# Also stop every default stream that no worker subscribes to
+STOP_UNSUBSCRIBED_STREAMS = True
+# Measure the downlink before and after negotiating, adds two measurements to startup
+MEASURE_STREAM_RATES = False
+STREAM_RATE_MEASURE_TIME = 2  # seconds, before and after negotiating
+# Every received frame is appended to this telemetry log for replay, None to not record
+# e.g. f"logs/flight_{int(time.time())}.tlog"
+RECORD_PATH = None
+# Match COMMAND_ACK, retry unacknowledged commands, and do not resend one that is in flight
+TRACK_COMMAND_ACKS = True
+# Uplink limit per command type for this link: rate (Hz) and burst, None for no limit
+COMMAND_RATE_LIMITS = {
+    "MAV_CMD_CONDITION_CHANGE_ALT": (1, 1),
+    "MAV_CMD_CONDITION_YAW": (2, 1),
+}
+# Command acts only on the newest telemetry when it falls behind, skipping stale samples
+COMMAND_LATEST_ONLY = True
+# Command reads the newest telemetry from shared memory, so telemetry is not queued at all
+# Always latest only and without the queue dwell metric, so off by default
+COMMAND_READS_STATE_BOARD = False
+# Command decides on the state dead reckoned to the present, at most this far ahead
+COMMAND_PREDICTION_HORIZON = 1  # seconds, None to decide on the samples as received
+HEARTBEAT_PERIOD = 1  # seconds
+# Heartbeat periods without one before the link is lost
+HEARTBEAT_DISCONNECT_THRESHOLD = 5
+# Track liveness of every system and component on the link, not only the vehicle
+TRACK_HEARTBEAT_PEERS = False
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
 # =================================================================================================
 
 
+def receive_latency_metrics(
+    metrics_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    worker_metrics: "dict[str, latency_histogram.LatencyMetrics]",
+) -> None:
+    """
+    Keeps the latest cumulative histograms of each worker.
+    """
+    while True:
+        try:
+            source, metrics = metrics_queue.queue.get_nowait()
+        except queue.Empty:
+            return
+
+        worker_metrics[source] = metrics
+
+
+def log_link_transitions(
+    heartbeat_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    main_logger: logger.Logger,
+) -> None:
+    """
+    Logs the changes of link state and, when peers are tracked, of each peer.
+    """
+    while True:
+        try:
+            item = heartbeat_queue.queue.get_nowait()
+        except queue.Empty:
+            return
+
+        if isinstance(item, tuple):
+            (system, component), transition = item
+            main_logger.info(f"System {system} component {component}: {transition!r}")
+        else:
+            main_logger.info(f"Link: {item!r}")
+
+
+def log_message_rates(
+    rates_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    main_logger: logger.Logger,
+) -> None:
+    """
+    Logs the messages per second by type published by the demultiplexer.
+    """
+    while True:
+        try:
+            rates = rates_queue.queue.get_nowait()
+        except queue.Empty:
+            return
+
+        main_logger.info(f"Message rates (Hz): {rates}")
+
+
+def merge_latency_metrics(
+    worker_metrics: "dict[str, latency_histogram.LatencyMetrics]",
+) -> latency_histogram.LatencyMetrics:
+    """
+    Combines the histograms of every worker.
+    """
+    merged = latency_histogram.LatencyMetrics()
+    for metrics in worker_metrics.values():
+        merged.merge(metrics)
+
+    return merged
+
+
 def main() -> int:
     """
     Main function.
@@ -73,7 +181,9 @@ def main() -> int:
     # To test, you will run each of your workers individually to see if they work
     # (test "drones" are provided for you test your workers)
     # NOTE: If you want to have type annotations for the connection, it is of type mavutil.mavfile
-    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    connection, is_native = mavlink_parser.mavlink_connection(CONNECTION_STRING, USE_NATIVE_PARSER)
+    if USE_NATIVE_PARSER and not is_native:
+        main_logger.warning("Native MAVLink parser is not available, using the Python parser")
     connection.wait_heartbeat(timeout=30)  # Wait for the "drone" to connect
 
     # =============================================================================================
@@ -88,32 +198,122 @@ def main() -> int:
     heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, maxsize=QUEUE_MAX_SIZE)
     telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, maxsize=QUEUE_MAX_SIZE)
     command_output_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, maxsize=QUEUE_MAX_SIZE)
-    command_input_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, maxsize=QUEUE_MAX_SIZE)
+    # Latency histograms from the workers
+    metrics_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, maxsize=QUEUE_MAX_SIZE)
+    # Messages per second by type from the demultiplexer
+    rates_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, maxsize=QUEUE_MAX_SIZE)
+    # Subscription queues, filled by the demultiplexer which is the only reader of the connection
+    heartbeat_subscription_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        manager, maxsize=SUBSCRIPTION_QUEUE_MAX_SIZE
+    )
+    telemetry_subscription_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        manager, maxsize=SUBSCRIPTION_QUEUE_MAX_SIZE
+    )
+    command_subscription_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        manager, maxsize=SUBSCRIPTION_QUEUE_MAX_SIZE
+    )
+    subscriptions = {
+        "HEARTBEAT": [heartbeat_subscription_queue],
+        "ATTITUDE": [telemetry_subscription_queue],
+        "LOCAL_POSITION_NED": [telemetry_subscription_queue],
+        "COMMAND_ACK": [command_subscription_queue],
+    }
+    heartbeat_connection = subscriber_connection.SubscriberConnection(
+        connection, heartbeat_subscription_queue
+    )
+    telemetry_connection = subscriber_connection.SubscriberConnection(
+        connection, telemetry_subscription_queue
+    )
+    command_connection = subscriber_connection.SubscriberConnection(
+        connection, command_subscription_queue
+    )
+    # Only have the vehicle send what the workers subscribe to
+    # Done before the demultiplexer starts, since it reads the connection
+    if NEGOTIATE_STREAM_RATES:
+        rates = {
+            message_type: STREAM_RATES[message_type]
+            for message_type in subscriptions
+            if message_type in STREAM_RATES
+        }
+        result, negotiator = stream_rate_negotiator.StreamRateNegotiator.create(
+            connection, rates, main_logger, stop_other_streams=STOP_UNSUBSCRIBED_STREAMS
+        )
+        if not result:
+            main_logger.error("Failed to create stream rate negotiator")
+            return -1
+
+        # Get Pylance to stop complaining
+        assert negotiator is not None
+
+        if not MEASURE_STREAM_RATES:
+            negotiator.negotiate()
+        else:
+            before = negotiator.measure(STREAM_RATE_MEASURE_TIME)
+            negotiator.negotiate()
+            after = negotiator.measure(STREAM_RATE_MEASURE_TIME)
+            negotiator.verify(after)
+            bandwidth_before = sum(bandwidth for _, bandwidth in before.values())
+            bandwidth_after = sum(bandwidth for _, bandwidth in after.values())
+            main_logger.info(
+                f"Downlink {bandwidth_before:.0f} B/s -> {bandwidth_after:.0f} B/s, "
+                f"saved {bandwidth_before - bandwidth_after:.0f} B/s"
+            )
+
+    # Latest telemetry in shared memory, for workers that only need the newest state
+    telemetry_board = None
+    if COMMAND_READS_STATE_BOARD:
+        result, telemetry_board = telemetry_state_board.TelemetryStateBoard.create()
+        if not result:
+            main_logger.error("Failed to create telemetry state board")
+            return -1
+
+    # Link quality from the demultiplexer, also used by the heartbeat receiver to report degradation
+    result, quality_board = link_quality_board.LinkQualityBoard.create()
+    if not result:
+        main_logger.error("Failed to create link quality board")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert quality_board is not None
+
     # Create worker properties for each worker type (what inputs it takes, how many workers)
     workers = []
-    # Heartbeat sender
-    for _ in range(HEARTBEAT_SENDER_COUNT):
-        workers.append(
-            worker_manager.Worker(
-                target=heartbeat_sender_worker.heartbeat_sender_worker,
-                args=(connection, heartbeat_queue),
-            )
+    # Demultiplexer, exactly one since it owns the read side of the connection
+    workers.append(
+        worker_manager.Worker(
+            target=mavlink_demux_worker.mavlink_demux_worker,
+            args=(connection, subscriptions, RECORD_PATH, quality_board, rates_queue),
         )
+    )
 
-    # Heartbeat receiver
-    for _ in range(HEARTBEAT_RECEIVER_COUNT):
-        workers.append(
-            worker_manager.Worker(
-                target=heartbeat_receiver_worker.heartbeat_receiver_worker,
-                args=(connection, heartbeat_queue),
-            )
+    # Heartbeat sender and receiver, exactly one since both are tied to the link
+    workers.append(
+        worker_manager.Worker(
+            target=heartbeat_link_worker.heartbeat_link_worker,
+            args=(
+                connection,
+                heartbeat_connection,
+                heartbeat_queue,
+                HEARTBEAT_PERIOD,
+                HEARTBEAT_DISCONNECT_THRESHOLD,
+                TRACK_HEARTBEAT_PEERS,
+                quality_board,
+            ),
         )
+    )
 
     # Telemetry
     for _ in range(TELEMETRY_WORKER_COUNT):
         workers.append(
             worker_manager.Worker(
-                target=telemetry_worker.telemetry_worker, args=(connection, telemetry_queue)
+                target=telemetry_worker.telemetry_worker,
+                args=(
+                    telemetry_connection,
+                    None if COMMAND_READS_STATE_BOARD else telemetry_queue,
+                    TELEMETRY_FUSION_MODE,
+                    telemetry_board,
+                    metrics_queue,
+                ),
             )
         )
 
@@ -123,7 +323,18 @@ def main() -> int:
         workers.append(
             worker_manager.Worker(
                 target=command_worker.command_worker,
-                args=(connection, target_position, command_input_queue, command_output_queue),
+                args=(
+                    command_connection,
+                    target_position,
+                    telemetry_queue,
+                    command_output_queue,
+                    metrics_queue,
+                    TRACK_COMMAND_ACKS,
+                    COMMAND_RATE_LIMITS,
+                    COMMAND_LATEST_ONLY,
+                    COMMAND_PREDICTION_HORIZON,
+                    telemetry_board,
+                ),
             )
         )
 
@@ -136,6 +347,8 @@ def main() -> int:
     # Main's work: read from all queues that output to main, and log any commands that we make
     # Continue running for 100 seconds or until the drone disconnects
     start_time = time.time()
+    next_metrics_log = start_time + METRICS_LOG_PERIOD
+    worker_metrics = {}
     while time.time() - start_time < RUN_TIME:
         try:
             msg = command_output_queue.get(timeout=1)
@@ -143,12 +356,29 @@ def main() -> int:
         except queue.Empty:
             pass
 
+        log_link_transitions(heartbeat_queue, main_logger)
+        log_message_rates(rates_queue, main_logger)
+        receive_latency_metrics(metrics_queue, worker_metrics)
+        if time.time() >= next_metrics_log:
+            main_logger.info(f"Latency:\n{merge_latency_metrics(worker_metrics).summary()}")
+            result, report = quality_board.read()
+            if result:
+                main_logger.info(f"Link quality: {report}")
+            next_metrics_log += METRICS_LOG_PERIOD
+
     # Stop the processes
     controller.stop_all()
     main_logger.info("Requested exit")
 
     # Fill and drain queues from END TO START
-    for q in [command_output_queue, telemetry_queue, heartbeat_queue]:
+    for q in [
+        command_output_queue,
+        telemetry_queue,
+        heartbeat_queue,
+        command_subscription_queue,
+        telemetry_subscription_queue,
+        heartbeat_subscription_queue,
+    ]:
         while True:
             try:
                 _ = q.get_nowait()
@@ -160,6 +390,17 @@ def main() -> int:
     controller.join_all()
     main_logger.info("Stopped")
 
+    # Workers send their final histograms on exit
+    receive_latency_metrics(metrics_queue, worker_metrics)
+    main_logger.info(f"Final latency:\n{merge_latency_metrics(worker_metrics).summary()}")
+
+    # Workers are gone, so the boards can be freed
+    if telemetry_board is not None:
+        telemetry_board.close()
+        telemetry_board.unlink()
+    quality_board.close()
+    quality_board.unlink()
+
     # We can reset controller in case we want to reuse it
     # Alternatively, create a new WorkerController instance
     controller.reset()
@@ -0,0 +1,63 @@
+"""
+Decision-making on the event loop.
+"""
+
+import asyncio
+import time
+
+from utilities.metrics import latency_histogram
+from ..command import command
+from ..common.modules.logger import logger
+from . import async_connection
+
+
+class AsyncCommand:
+    """
+    Runs Command on each TelemetryData as soon as it is put on the telemetry queue.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: async_connection.AsyncConnection,
+        target: command.Position,
+        local_logger: logger.Logger,
+    ) -> "tuple[True, AsyncCommand] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create an AsyncCommand object.
+        """
+        command_object = command.Command.create(connection.connection, target, local_logger)
+        if command_object is None:
+            return False, None
+
+        return True, AsyncCommand(cls.__private_key, command_object, target)
+
+    def __init__(
+        self,
+        key: object,
+        command_object: command.Command,
+        target: command.Position,
+    ) -> None:
+        assert key is AsyncCommand.__private_key, "Use create() method"
+
+        self.__command = command_object
+        self.__target = target
+        self.latency_metrics = latency_histogram.LatencyMetrics()
+
+    async def run(self, telemetry_queue: asyncio.Queue, output_queue: asyncio.Queue) -> None:
+        """
+        Puts every command description on the output queue until cancelled.
+        """
+        while True:
+            path = await telemetry_queue.get()
+            consume_time = time.time()
+            if path.enqueue_time is not None:
+                self.latency_metrics.record("queue dwell", consume_time - path.enqueue_time)
+            if path.receive_time is not None:
+                self.latency_metrics.record("sample age", consume_time - path.receive_time)
+
+            run_command = self.__command.run(self.__target, path)
+            if run_command:
+                await output_queue.put(run_command)
@@ -0,0 +1,132 @@
+"""
+Event loop driven reader for a MAVLink connection.
+"""
+
+import asyncio
+
+from pymavlink import mavutil
+
+from ..common.modules.logger import logger
+
+
+# Readable wakeups in a row without any bytes mean the peer closed the socket
+EMPTY_WAKEUP_LIMIT = 100
+
+
+class AsyncConnection:  # pylint: disable=too-many-instance-attributes
+    """
+    Registers the connection's file descriptor with the event loop, so the loop sleeps until
+    bytes arrive instead of a thread polling. Every message is routed by type to the
+    subscribed asyncio queues, as MavlinkDemux does across processes.
+
+    Any transport string that mavutil.mavlink_connection() opens on a socket or serial port works.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+    ) -> "tuple[True, AsyncConnection] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create an AsyncConnection object.
+
+        connection: Connection to the drone, nothing else may read from it.
+        local_logger: Existing logger from process.
+        """
+        if getattr(connection, "fd", None) is None:
+            local_logger.error("Connection has no file descriptor to wait on", True)
+            return False, None
+
+        return True, AsyncConnection(cls.__private_key, connection, local_logger)
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+    ) -> None:
+        assert key is AsyncConnection.__private_key, "Use create() method"
+
+        self.connection = connection
+        self.__local_logger = local_logger
+        self.__routes: "dict[str, list[asyncio.Queue]]" = {}
+        self.__loop: "asyncio.AbstractEventLoop | None" = None
+        self.__empty_wakeups = 0
+        self.closed: "asyncio.Future | None" = None
+
+        self.wakeup_count = 0
+        self.received_count = 0
+        # Per message type, messages dropped because a subscriber queue was full
+        self.dropped_counts: "dict[str, int]" = {}
+
+    @property
+    def mav(self) -> "mavutil.mavlink.MAVLink":
+        """
+        MAVLink encoder of the underlying connection, for sending.
+        """
+        return self.connection.mav
+
+    def subscribe(self, message_types: "list[str]", maxsize: int = 100) -> asyncio.Queue:
+        """
+        Queue receiving every message of the given types. Messages are dropped when it is full.
+        """
+        subscription = asyncio.Queue(maxsize)
+        for message_type in message_types:
+            self.__routes.setdefault(message_type, []).append(subscription)
+
+        return subscription
+
+    def start(self) -> None:
+        """
+        Starts reading, must be called from a coroutine on the loop that will run the workers.
+        """
+        self.__loop = asyncio.get_running_loop()
+        self.closed = self.__loop.create_future()
+        self.__loop.add_reader(self.connection.fd, self.__on_readable)
+
+    def stop(self) -> None:
+        """
+        Stops reading. The connection itself stays open.
+        """
+        if self.__loop is not None:
+            self.__loop.remove_reader(self.connection.fd)
+            self.__loop = None
+
+    def __on_readable(self) -> None:
+        """
+        Parses everything that arrived and routes it.
+        """
+        self.wakeup_count += 1
+        bytes_before = self.connection.mav.total_bytes_received
+        received = 0
+        while True:
+            msg = self.connection.recv_msg()
+            if msg is None:
+                break
+
+            if msg.get_type() == "BAD_DATA":
+                continue
+
+            received += 1
+            for subscription in self.__routes.get(msg.get_type(), []):
+                # Never block the loop on a slow consumer
+                try:
+                    subscription.put_nowait(msg)
+                except asyncio.QueueFull:
+                    self.dropped_counts[msg.get_type()] = (
+                        self.dropped_counts.get(msg.get_type(), 0) + 1
+                    )
+
+        self.received_count += received
+        if self.connection.mav.total_bytes_received > bytes_before:
+            self.__empty_wakeups = 0
+        else:
+            self.__empty_wakeups += 1
+        if self.__empty_wakeups >= EMPTY_WAKEUP_LIMIT:
+            self.__local_logger.error("Connection closed by peer", True)
+            self.stop()
+            if not self.closed.done():
+                self.closed.set_result(None)
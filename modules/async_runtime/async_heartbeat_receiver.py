@@ -0,0 +1,78 @@
+"""
+Heartbeat receiving on the event loop.
+"""
+
+import asyncio
+import time
+
+from ..common.modules.logger import logger
+from ..heartbeat import link_state
+from . import async_connection
+
+
+# Missed periods in a row before the vehicle is considered disconnected
+DISCONNECT_THRESHOLD = 5
+
+
+class AsyncHeartbeatReceiver:
+    """
+    Waits on the HEARTBEAT subscription with the loss deadline as timeout,
+    so the loop only wakes on a heartbeat or a lost connection.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: async_connection.AsyncConnection,
+        local_logger: logger.Logger,
+        period: float = 1.0,  # s
+    ) -> "tuple[True, AsyncHeartbeatReceiver] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create an AsyncHeartbeatReceiver object.
+
+        Subscribes immediately, so it must be created before the connection starts reading.
+        """
+        result, state_machine = link_state.LinkStateMachine.create(period, DISCONNECT_THRESHOLD)
+        if not result:
+            local_logger.error("Heartbeat period must be positive", True)
+            return False, None
+
+        subscription = connection.subscribe(["HEARTBEAT"])
+        return True, AsyncHeartbeatReceiver(
+            cls.__private_key, subscription, local_logger, state_machine
+        )
+
+    def __init__(
+        self,
+        key: object,
+        subscription: asyncio.Queue,
+        local_logger: logger.Logger,
+        state_machine: link_state.LinkStateMachine,
+    ) -> None:
+        assert key is AsyncHeartbeatReceiver.__private_key, "Use create() method"
+
+        self.__subscription = subscription
+        self.__local_logger = local_logger
+        self.state_machine = state_machine
+
+    async def run(self, output_queue: asyncio.Queue) -> None:
+        """
+        Puts every change of connection state, until cancelled.
+        """
+        while True:
+            # Once lost, nothing more happens until the next heartbeat
+            wait = None
+            if self.state_machine.state != link_state.LinkState.DISCONNECTED:
+                wait = max(self.state_machine.deadline() - time.monotonic(), 0.0)
+
+            try:
+                await asyncio.wait_for(self.__subscription.get(), wait)
+                transition = self.state_machine.heartbeat(time.monotonic())
+            except asyncio.TimeoutError:
+                transition = self.state_machine.check(time.monotonic())
+
+            if transition is not None:
+                self.__local_logger.info(str(transition))
+                await output_queue.put(transition)
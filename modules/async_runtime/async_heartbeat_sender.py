@@ -0,0 +1,53 @@
+"""
+Heartbeat sending on the event loop.
+"""
+
+import asyncio
+
+from ..heartbeat import heartbeat_sender
+from . import async_connection
+
+
+class AsyncHeartbeatSender:
+    """
+    Sends a heartbeat every period, scheduled against the loop clock so sends do not drift.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: async_connection.AsyncConnection,
+        period: float = 1.0,  # s
+    ) -> "tuple[True, AsyncHeartbeatSender] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create an AsyncHeartbeatSender object.
+        """
+        if period <= 0.0:
+            return False, None
+
+        sender = heartbeat_sender.HeartbeatSender.create(connection.connection)
+        return True, AsyncHeartbeatSender(cls.__private_key, sender, period)
+
+    def __init__(
+        self,
+        key: object,
+        sender: heartbeat_sender.HeartbeatSender,
+        period: float,
+    ) -> None:
+        assert key is AsyncHeartbeatSender.__private_key, "Use create() method"
+
+        self.__sender = sender
+        self.__period = period
+
+    async def run(self) -> None:
+        """
+        Sends until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        next_send = loop.time()
+        while True:
+            self.__sender.run()
+            next_send += self.__period
+            await asyncio.sleep(max(0.0, next_send - loop.time()))
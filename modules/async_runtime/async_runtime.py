@@ -0,0 +1,115 @@
+"""
+Runs every worker of a single vehicle as tasks on one event loop.
+"""
+
+import asyncio
+
+from pymavlink import mavutil
+
+from ..command import command
+from ..common.modules.logger import logger
+from ..telemetry import telemetry
+from . import async_command
+from . import async_connection
+from . import async_heartbeat_receiver
+from . import async_heartbeat_sender
+from . import async_telemetry
+
+
+QUEUE_MAX_SIZE = 100
+
+
+async def log_outputs(
+    output_queue: asyncio.Queue, prefix: str, local_logger: logger.Logger
+) -> None:
+    """
+    Logs everything put on the queue until cancelled.
+    """
+    while True:
+        output = await output_queue.get()
+        local_logger.info(f"{prefix}: {output}")
+
+
+async def run_vehicle(
+    connection: mavutil.mavfile,
+    target: command.Position,
+    run_time: float,  # s
+    local_logger: logger.Logger,
+    fusion_mode: telemetry.FusionMode = telemetry.FusionMode.LATEST,
+    heartbeat_period: float = 1.0,  # s
+) -> bool:
+    """
+    Heartbeat sender and receiver, telemetry, and command for the vehicle on the connection,
+    for run_time seconds or until the vehicle closes the connection.
+
+    Returns whether every worker was created and ran for the full time.
+    """
+    result, reader = async_connection.AsyncConnection.create(connection, local_logger)
+    if not result:
+        return False
+
+    result, sender = async_heartbeat_sender.AsyncHeartbeatSender.create(reader, heartbeat_period)
+    if not result:
+        local_logger.error("Failed to create heartbeat sender", True)
+        return False
+
+    result, receiver = async_heartbeat_receiver.AsyncHeartbeatReceiver.create(
+        reader, local_logger, heartbeat_period
+    )
+    if not result:
+        local_logger.error("Failed to create heartbeat receiver", True)
+        return False
+
+    result, telemetry_object = async_telemetry.AsyncTelemetry.create(
+        reader, local_logger, fusion_mode
+    )
+    if not result:
+        local_logger.error("Failed to create telemetry", True)
+        return False
+
+    result, command_object = async_command.AsyncCommand.create(reader, target, local_logger)
+    if not result:
+        local_logger.error("Failed to create command", True)
+        return False
+
+    heartbeat_queue = asyncio.Queue(QUEUE_MAX_SIZE)
+    telemetry_queue = asyncio.Queue(QUEUE_MAX_SIZE)
+    command_output_queue = asyncio.Queue(QUEUE_MAX_SIZE)
+
+    reader.start()
+    tasks = [
+        asyncio.create_task(sender.run()),
+        asyncio.create_task(receiver.run(heartbeat_queue)),
+        asyncio.create_task(telemetry_object.run(telemetry_queue)),
+        asyncio.create_task(command_object.run(telemetry_queue, command_output_queue)),
+        asyncio.create_task(log_outputs(heartbeat_queue, "Heartbeat", local_logger)),
+        asyncio.create_task(log_outputs(command_output_queue, "Command output", local_logger)),
+    ]
+
+    # Sleeps until either the time is up or the vehicle disconnects
+    done, _ = await asyncio.wait(
+        [reader.closed, *tasks], timeout=run_time, return_when=asyncio.FIRST_COMPLETED
+    )
+
+    reader.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    local_logger.info(
+        f"Wakeups: {reader.wakeup_count}, received: {reader.received_count}, "
+        f"dropped: {reader.dropped_counts}",
+        True,
+    )
+    local_logger.info(
+        f"Latency:\n{telemetry_object.telemetry.latency_metrics.summary()}\n"
+        f"{command_object.latency_metrics.summary()}",
+        True,
+    )
+
+    # A task finishing early means it raised
+    for task in done:
+        if task is not reader.closed and task.exception() is not None:
+            local_logger.error(f"Worker failed: {task.exception()}", True)
+
+    return len(done) == 0
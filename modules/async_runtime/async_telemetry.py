@@ -0,0 +1,77 @@
+"""
+Telemetry gathering on the event loop.
+"""
+
+import asyncio
+import time
+
+from ..common.modules.logger import logger
+from ..telemetry import telemetry
+from . import async_connection
+
+
+class AsyncTelemetry:
+    """
+    Feeds the telemetry subscription into Telemetry.process(),
+    waiting on the subscription instead of the socket.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: async_connection.AsyncConnection,
+        local_logger: logger.Logger,
+        fusion_mode: telemetry.FusionMode = telemetry.FusionMode.LATEST,
+        pairing_timeout: float = 1.0,  # s
+    ) -> "tuple[True, AsyncTelemetry] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create an AsyncTelemetry object.
+
+        Subscribes immediately, so it must be created before the connection starts reading.
+        """
+        telemetry_object = telemetry.Telemetry.create(
+            connection.connection,
+            local_logger,
+            pairing_timeout=pairing_timeout,
+            fusion_mode=fusion_mode,
+        )
+        if telemetry_object is None:
+            return False, None
+
+        subscription = connection.subscribe(telemetry.TELEMETRY_MESSAGE_TYPES)
+        return True, AsyncTelemetry(
+            cls.__private_key, telemetry_object, subscription, local_logger, pairing_timeout
+        )
+
+    def __init__(
+        self,
+        key: object,
+        telemetry_object: telemetry.Telemetry,
+        subscription: asyncio.Queue,
+        local_logger: logger.Logger,
+        pairing_timeout: float,
+    ) -> None:
+        assert key is AsyncTelemetry.__private_key, "Use create() method"
+
+        self.telemetry = telemetry_object
+        self.__subscription = subscription
+        self.__local_logger = local_logger
+        self.__pairing_timeout = pairing_timeout
+
+    async def run(self, output_queue: asyncio.Queue) -> None:
+        """
+        Puts every TelemetryData on the output queue until cancelled.
+        """
+        while True:
+            try:
+                msg = await asyncio.wait_for(self.__subscription.get(), self.__pairing_timeout)
+            except asyncio.TimeoutError:
+                self.__local_logger.warning("Did not receive messages, restarting...")
+                continue
+
+            telemetry_data = self.telemetry.process(msg, time.time())
+            if telemetry_data is not None:
+                telemetry_data.enqueue_time = time.time()
+                await output_queue.put(telemetry_data)
@@ -2,12 +2,27 @@
 Decision-making logic.
 """
 
+import enum
 import math
+import struct
+import time
 
+import numpy as np
 from pymavlink import mavutil
 
+from utilities.mavlink import mavlink_templates
+from utilities.metrics import rolling_statistics
 from ..common.modules.logger import logger
 from ..telemetry import telemetry
+from . import command_rate_limiter
+from . import command_tracker
+from . import dead_reckoning
+
+
+# Velocity statistics cover the last VELOCITY_WINDOW_SIZE samples within VELOCITY_WINDOW_TIME
+VELOCITY_WINDOW_SIZE = 100
+VELOCITY_WINDOW_TIME = 10  # s
+VELOCITY_EMA_TIME_CONSTANT = 1  # s
 
 
 class Position:
@@ -24,6 +39,174 @@ class Position:
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+ALTITUDE_TOLERANCE = 0.5  # m
+YAW_TOLERANCE = 5  # deg
+
+
+class Decision(enum.IntEnum):
+    """
+    What Command does for a sample, stored as int8 by decide_batch().
+    """
+
+    NONE = 0
+    CHANGE_ALTITUDE = 1
+    CHANGE_YAW = 2
+
+
+# Wire format: kind, delta, time_since_boot (-1 for unknown), sequence
+COMMAND_RESULT_FORMAT = struct.Struct("<BdqI")
+
+
+class CommandResult:
+    """
+    A command that was sent: its kind, the altitude change (m) or relative yaw (deg),
+    the time_since_boot (ms) of the telemetry that triggered it, and its sequence number.
+
+    Pickles as its 21 byte wire format, str() gives the text that main logs.
+    """
+
+    __slots__ = ("kind", "delta", "time_since_boot", "sequence")
+
+    def __init__(
+        self, kind: Decision, delta: float, time_since_boot: int | None, sequence: int = 0
+    ) -> None:
+        self.kind = kind
+        self.delta = delta
+        self.time_since_boot = time_since_boot
+        self.sequence = sequence
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs into the wire format.
+        """
+        return COMMAND_RESULT_FORMAT.pack(
+            self.kind,
+            self.delta,
+            -1 if self.time_since_boot is None else self.time_since_boot,
+            self.sequence,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "tuple[True, CommandResult] | tuple[False, None]":
+        """
+        Unpacks from the wire format.
+
+        Returns whether the data was valid and the CommandResult.
+        """
+        if len(data) != COMMAND_RESULT_FORMAT.size:
+            return False, None
+
+        kind, delta, time_since_boot, sequence = COMMAND_RESULT_FORMAT.unpack(data)
+        if kind not in (Decision.CHANGE_ALTITUDE, Decision.CHANGE_YAW):
+            return False, None
+
+        return True, cls(
+            Decision(kind), delta, None if time_since_boot < 0 else time_since_boot, sequence
+        )
+
+    def __reduce__(self) -> "tuple":
+        """
+        Pickle as the raw wire format, used by queues.
+        """
+        return _command_result_from_wire, (self.to_bytes(),)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CommandResult):
+            return NotImplemented
+
+        return (self.kind, self.delta, self.time_since_boot, self.sequence) == (
+            other.kind,
+            other.delta,
+            other.time_since_boot,
+            other.sequence,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.kind, self.delta, self.time_since_boot, self.sequence))
+
+    def __str__(self) -> str:
+        if self.kind == Decision.CHANGE_ALTITUDE:
+            return f"CHANGE_ALTITUDE: {self.delta}"
+
+        return f"CHANGING_YAW: {self.delta}"
+
+    def __repr__(self) -> str:
+        return (
+            f"CommandResult({self.kind.name}, {self.delta}, "
+            f"time_since_boot={self.time_since_boot}, sequence={self.sequence})"
+        )
+
+
+def _command_result_from_wire(data: bytes) -> CommandResult:
+    """
+    Unpickle helper, the data was packed by to_bytes() so it is always valid.
+    """
+    result, command_result = CommandResult.from_bytes(data)
+    assert result, "Corrupted CommandResult pickle"
+    return command_result
+
+
+def decide(target: Position, x: float, y: float, z: float, yaw: float) -> "tuple[Decision, float]":
+    """
+    Decision for a single sample, without sending anything.
+
+    Returns the decision and the altitude change (m) or relative yaw (deg) for it, 0 for none.
+    """
+    if target.z - z > ALTITUDE_TOLERANCE or target.z - z < -ALTITUDE_TOLERANCE:
+        return Decision.CHANGE_ALTITUDE, target.z - z
+
+    target_angle = math.atan2(target.y - y, target.x - x)
+    angle_difference = target_angle - yaw
+    if angle_difference > (math.pi):
+        angle_difference = -1 * ((2 * math.pi) - angle_difference)
+    elif angle_difference < -1 * (math.pi):
+        angle_difference = -1 * ((-2 * math.pi) - angle_difference)
+    angle_difference_deg = math.degrees(angle_difference)
+    if angle_difference_deg > YAW_TOLERANCE or angle_difference_deg < -YAW_TOLERANCE:
+        return Decision.CHANGE_YAW, angle_difference_deg
+
+    return Decision.NONE, 0.0
+
+
+def decide_batch(
+    target: Position, x: np.ndarray, y: np.ndarray, z: np.ndarray, yaw: np.ndarray
+) -> "tuple[np.ndarray, np.ndarray]":
+    """
+    decide() for every sample of a trajectory at once, e.g. the fields of a TelemetryBatch.
+
+    Returns the Decision values (int8) and amounts (float64) per sample.
+    """
+    altitude_delta = target.z - np.asarray(z, dtype=np.float64)
+    change_altitude = (altitude_delta > ALTITUDE_TOLERANCE) | (altitude_delta < -ALTITUDE_TOLERANCE)
+
+    target_angle = np.arctan2(
+        target.y - np.asarray(y, dtype=np.float64), target.x - np.asarray(x, dtype=np.float64)
+    )
+    angle_difference = target_angle - np.asarray(yaw, dtype=np.float64)
+    # Same single wrap as decide()
+    angle_difference = np.where(
+        angle_difference > math.pi,
+        -1 * ((2 * math.pi) - angle_difference),
+        np.where(
+            angle_difference < -1 * math.pi,
+            -1 * ((-2 * math.pi) - angle_difference),
+            angle_difference,
+        ),
+    )
+    angle_difference_deg = np.degrees(angle_difference)
+    change_yaw = ~change_altitude & (
+        (angle_difference_deg > YAW_TOLERANCE) | (angle_difference_deg < -YAW_TOLERANCE)
+    )
+
+    decisions = np.full(altitude_delta.shape, Decision.NONE, dtype=np.int8)
+    decisions[change_altitude] = Decision.CHANGE_ALTITUDE
+    decisions[change_yaw] = Decision.CHANGE_YAW
+    amounts = np.where(
+        change_altitude, altitude_delta, np.where(change_yaw, angle_difference_deg, 0.0)
+    )
+    return decisions, amounts
+
+
 class Command:  # pylint: disable=too-many-instance-attributes
     """
     Command class to make a decision based on recieved telemetry,
@@ -38,11 +221,46 @@ class Command:  # pylint: disable=too-many-instance-attributes
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        tracker: command_tracker.CommandTracker | None = None,
+        limiter: command_rate_limiter.CommandRateLimiter | None = None,
+        predictor: dead_reckoning.DeadReckoning | None = None,
     ) -> object:
         """
         Falliable create (instantiation) method to create a Command object.
+
+        tracker: Optional acknowledgement tracking, which suppresses a command with the same
+        setpoint as the one still in flight and holds a different one until the vehicle
+        acknowledges. Without it every decision is sent.
+        limiter: Optional per command type rate limit. Commands over the limit wait in it,
+        and are sent by update().
+        predictor: Optional dead reckoning, decisions are then made on the state predicted
+        for the present instead of the aged sample.
         """
-        return Command(cls.__private_key, connection, target, local_logger)
+        statistics = {}
+        for name in ["x_velocity", "y_velocity", "z_velocity", "speed"]:
+            result, statistics[name] = rolling_statistics.RollingStatistics.create(
+                VELOCITY_WINDOW_SIZE, VELOCITY_WINDOW_TIME, VELOCITY_EMA_TIME_CONSTANT
+            )
+            if not result:
+                local_logger.error("Failed to create velocity statistics", True)
+                return None
+
+        result, template = mavlink_templates.CommandLongTemplate.create(connection)
+        if not result:
+            local_logger.error("Failed to create COMMAND_LONG template", True)
+            return None
+
+        return Command(
+            cls.__private_key,
+            connection,
+            target,
+            local_logger,
+            statistics,
+            tracker,
+            limiter,
+            predictor,
+            template,
+        )
 
     def __init__(
         self,
@@ -50,79 +268,180 @@ class Command:  # pylint: disable=too-many-instance-attributes
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        statistics: "dict[str, rolling_statistics.RollingStatistics]",
+        tracker: command_tracker.CommandTracker | None,
+        limiter: command_rate_limiter.CommandRateLimiter | None,
+        predictor: dead_reckoning.DeadReckoning | None,
+        template: mavlink_templates.CommandLongTemplate,
     ) -> None:
         assert key is Command.__private_key, "Use create() method"
 
         self.local_logger = local_logger
         self.target = target
         self.connection = connection
-        self.total_xv = 0
-        self.total_yv = 0
-        self.total_zv = 0
-        self.steps = 0
+        # Recent velocity per axis and speed, keyed by x_velocity, y_velocity, z_velocity, speed
+        self.velocity_statistics = statistics
+        self.tracker = tracker
+        self.limiter = limiter
+        self.predictor = predictor
+        # Pre-encoded COMMAND_LONG to target_system=1 and target_component=0
+        self.template = template
+        # Of the next CommandResult
+        self.sequence = 0
+
+    def __submit(
+        self,
+        command: int,
+        params: "tuple[float, float, float, float, float, float, float]",
+        setpoint: "tuple[float, ...]",
+        tolerance: float,
+        command_result: CommandResult,
+    ) -> "CommandResult | None":
+        """
+        Sends the command now if the rate limit allows, otherwise leaves it waiting in the limiter.
+
+        setpoint: What the command drives the vehicle to, relative parameters change every
+        sample while the setpoint does not.
+        tolerance: Setpoints closer than this are the same command.
+
+        Returns the result, numbered, if it was sent.
+        """
+        # Checked first so a duplicate takes no token and is not counted as sent
+        if self.tracker is not None and self.tracker.is_duplicate(command, setpoint, tolerance):
+            # Anything still waiting was decided on older telemetry than this
+            if self.limiter is not None:
+                self.limiter.discard(command)
+            return None
+
+        item = (command, params, setpoint, tolerance, command_result)
+        if self.limiter is not None and not self.limiter.submit(command, item):
+            return None
+
+        return self.__send(*item)
+
+    def __numbered(self, command_result: CommandResult) -> CommandResult:
+        """
+        Assigns the next sequence number, results are numbered in the order they are sent.
+        """
+        command_result.sequence = self.sequence
+        self.sequence += 1
+        return command_result
+
+    def update(self) -> "list[CommandResult]":
+        """
+        Handles acknowledgements and sends waiting commands that the rate limit now allows.
+        Call regularly, including when there is no telemetry.
+
+        Returns the result of every command sent.
+        """
+        sent = []
+        if self.tracker is not None:
+            # Held commands sent now that the vehicle acknowledged or timed out
+            sent += [self.__numbered(pending.context) for pending in self.tracker.update()]
+
+        if self.limiter is not None:
+            for item in self.limiter.release():
+                command_result = self.__send(*item)
+                if command_result is not None:
+                    sent.append(command_result)
+
+        return sent
+
+    def __send(
+        self,
+        command: int,
+        params: "tuple[float, float, float, float, float, float, float]",
+        setpoint: "tuple[float, ...]",
+        tolerance: float,
+        command_result: CommandResult,
+    ) -> "CommandResult | None":
+        """
+        COMMAND_LONG to target_system=1 and target_component=0, through the tracker if any.
+
+        Returns the result, numbered, if it was sent now. None if suppressed as a duplicate
+        or held by the tracker.
+        """
+        if self.tracker is None:
+            self.template.send(command, params)
+            return self.__numbered(command_result)
+
+        result, _ = self.tracker.send(
+            command, params, setpoint=setpoint, tolerance=tolerance, context=command_result
+        )
+        return self.__numbered(command_result) if result else None
+
+    def velocity_summary(self) -> str:
+        """
+        Windowed mean and moving average velocity, and speed spread and max.
+        """
+        speed = self.velocity_statistics["speed"]
+        if speed.count == 0:
+            return "No velocity samples"
+
+        mean = tuple(
+            round(self.velocity_statistics[name].mean, 3)
+            for name in ["x_velocity", "y_velocity", "z_velocity"]
+        )
+        ema = tuple(
+            round(self.velocity_statistics[name].ema, 3)
+            for name in ["x_velocity", "y_velocity", "z_velocity"]
+        )
+        return (
+            f"Velocity over {speed.count} samples: mean {mean} m/s, moving average {ema} m/s, "
+            f"speed mean {speed.mean:.3f} m/s std {math.sqrt(speed.variance):.3f} m/s "
+            f"max {speed.max:.3f} m/s"
+        )
 
     def run(
         self,
         target: Position,
         path: telemetry.TelemetryData,  # Put your own arguments here
-    ) -> str:
+    ) -> "CommandResult | None":
         """
         Make a decision based on received telemetry data.
         """
-        self.steps += 1
-        self.total_xv += path.x_velocity
-        self.total_yv += path.y_velocity
-        self.total_zv += path.z_velocity
-        average_velocity = (
-            self.total_xv / self.steps,
-            self.total_yv / self.steps,
-            self.total_zv / self.steps,
-        )
-        # Log average velocity for this trip so far
-        self.local_logger.info(f"Average Velocity: {average_velocity}")
+        # Vehicle time, so queueing delays do not distort the window. Samples without it are
+        # left out rather than stamped with the local clock, which would jump the window
+        if path.time_since_boot is not None:
+            timestamp = path.time_since_boot / 1000
+            self.velocity_statistics["x_velocity"].add(path.x_velocity, timestamp)
+            self.velocity_statistics["y_velocity"].add(path.y_velocity, timestamp)
+            self.velocity_statistics["z_velocity"].add(path.z_velocity, timestamp)
+            self.velocity_statistics["speed"].add(
+                math.sqrt(path.x_velocity**2 + path.y_velocity**2 + path.z_velocity**2), timestamp
+            )
+        state = path if self.predictor is None else self.predictor.predict(path, time.time())
+        decision, amount = decide(target, state.x, state.y, state.z, state.yaw)
+        if self.limiter is not None:
+            # A waiting command's relative parameters are from older telemetry, drop it unless
+            # this sample decides the same, which then replaces it
+            if decision != Decision.CHANGE_ALTITUDE:
+                self.limiter.discard(mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT)
+            if decision != Decision.CHANGE_YAW:
+                self.limiter.discard(mavutil.mavlink.MAV_CMD_CONDITION_YAW)
         # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
-        if target.z - path.z > 0.5 or target.z - path.z < -0.5:
-            amount_to_move = target.z - path.z
-            # move the drone
-            self.connection.mav.command_long_send(
-                1,
-                0,
+        if decision == Decision.CHANGE_ALTITUDE:
+            # move the drone, param1 is the climb rate and param7 the altitude
+            return self.__submit(
                 mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
-                confirmation=0,
-                param1=1,
-                param2=0,
-                param3=0,
-                param4=0,
-                param5=0,
-                param6=0,
-                param7=target.z,
+                (1, 0, 0, 0, 0, 0, target.z),
+                (target.z,),
+                ALTITUDE_TOLERANCE,
+                CommandResult(decision, amount, path.time_since_boot),
             )
-            return f"CHANGE_ALTITUDE: {amount_to_move}"
-
-        target_angle = math.atan2(target.y - path.y, target.x - path.x)
-        angle_difference = target_angle - path.yaw
-        if angle_difference > (math.pi):
-            angle_difference = -1 * ((2 * math.pi) - angle_difference)
-        elif angle_difference < -1 * (math.pi):
-            angle_difference = -1 * ((-2 * math.pi) - angle_difference)
-        angle_difference_deg = math.degrees(angle_difference)
-        if angle_difference_deg > 5 or angle_difference_deg < -5:
-            # rotate the drone
-            direction = -1 if angle_difference_deg > 0 else 1
-            self.connection.mav.command_long_send(
-                1,
-                0,
+
+        if decision == Decision.CHANGE_YAW:
+            # rotate the drone, relative angle (param4 = 1) at 5 deg/s
+            direction = -1 if amount > 0 else 1
+            # The relative angle changes as the drone turns, the heading it turns to does not
+            heading = (math.degrees(state.yaw) + amount + 180) % 360 - 180
+            return self.__submit(
                 mavutil.mavlink.MAV_CMD_CONDITION_YAW,
-                confirmation=0,
-                param1=angle_difference_deg,
-                param2=5,
-                param3=direction,
-                param4=1,
-                param5=0,
-                param6=0,
-                param7=0,
+                (amount, 5, direction, 1, 0, 0, 0),
+                (heading,),
+                YAW_TOLERANCE,
+                CommandResult(decision, amount, path.time_since_boot),
             )
-            return f"CHANGING_YAW: {angle_difference_deg}"
         return None
         # The appropriate commands to use are instructed below
 
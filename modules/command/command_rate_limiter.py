@@ -0,0 +1,156 @@
+"""
+Per command type uplink rate limiting.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from ..common.modules.logger import logger
+
+
+class TokenBucket:
+    """
+    Allows rate sends per second on average, and up to burst at once.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.__last_refill = time.monotonic()
+
+    def take(self) -> bool:
+        """
+        Uses a token if one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.__last_refill) * self.rate)
+        self.__last_refill = now
+        if self.tokens < 1.0:
+            return False
+
+        self.tokens -= 1.0
+        return True
+
+
+class CommandRateLimiter:
+    """
+    Token bucket per MAV_CMD, holding at most one waiting command of each type.
+    A newer command replaces the waiting one, since only the latest decision matters.
+
+    Does not send anything: submit() says whether to send now, and release() returns
+    waiting commands once their bucket allows.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        limits: "dict[str, tuple[float, int]]",
+        local_logger: logger.Logger,
+        default_limit: "tuple[float, int] | None" = None,
+    ) -> "tuple[True, CommandRateLimiter] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a CommandRateLimiter object.
+
+        limits: MAV_CMD name (e.g. "MAV_CMD_CONDITION_YAW") to rate in Hz and burst size.
+        local_logger: Existing logger from process.
+        default_limit: Rate and burst for commands not in limits, None to not limit them.
+        """
+        buckets = {}
+        for name, limit in limits.items():
+            command = getattr(mavutil.mavlink, name, None)
+            if not name.startswith("MAV_CMD_") or command is None:
+                local_logger.error(f"Unknown command {name}", True)
+                return False, None
+
+            buckets[command] = limit
+
+        for rate, burst in [*buckets.values()] + ([default_limit] if default_limit else []):
+            if rate <= 0.0 or burst < 1:
+                local_logger.error("Rates must be positive and bursts at least 1", True)
+                return False, None
+
+        return True, CommandRateLimiter(cls.__private_key, buckets, default_limit)
+
+    def __init__(
+        self,
+        key: object,
+        limits: "dict[int, tuple[float, int]]",
+        default_limit: "tuple[float, int] | None",
+    ) -> None:
+        assert key is CommandRateLimiter.__private_key, "Use create() method"
+
+        self.__buckets = {command: TokenBucket(*limit) for command, limit in limits.items()}
+        self.__default_limit = default_limit
+        # Per command, the newest command that is waiting for a token
+        self.__waiting: "dict[int, object]" = {}
+
+        self.sent_count = 0
+        self.deferred_count = 0
+        # Commands replaced while waiting, so never sent
+        self.coalesced_count = 0
+        # Commands dropped while waiting, so never sent
+        self.discarded_count = 0
+
+    def __bucket(self, command: int) -> "TokenBucket | None":
+        """
+        Bucket of the command, created from the default limit on first use.
+        """
+        bucket = self.__buckets.get(command)
+        if bucket is None and self.__default_limit is not None:
+            bucket = TokenBucket(*self.__default_limit)
+            self.__buckets[command] = bucket
+
+        return bucket
+
+    def submit(self, command: int, item: object) -> bool:
+        """
+        Offers a command, item is what release() returns for it if it has to wait.
+
+        Returns whether to send it now. Otherwise it waits, replacing any waiting one.
+        """
+        bucket = self.__bucket(command)
+        if command not in self.__waiting and (bucket is None or bucket.take()):
+            self.sent_count += 1
+            return True
+
+        if command in self.__waiting:
+            self.coalesced_count += 1
+        else:
+            self.deferred_count += 1
+        self.__waiting[command] = item
+        return False
+
+    def discard(self, command: int) -> bool:
+        """
+        Drops the waiting command of this type, e.g. once newer telemetry no longer calls for it.
+
+        Returns whether one was waiting.
+        """
+        if self.__waiting.pop(command, None) is None:
+            return False
+
+        self.discarded_count += 1
+        return True
+
+    def release(self) -> "list[object]":
+        """
+        Items of waiting commands that may be sent now.
+        """
+        released = []
+        for command in list(self.__waiting):
+            if self.__bucket(command).take():
+                released.append(self.__waiting.pop(command))
+                self.sent_count += 1
+
+        return released
+
+    @property
+    def waiting_count(self) -> int:
+        """
+        Commands waiting for a token.
+        """
+        return len(self.__waiting)
@@ -0,0 +1,356 @@
+"""
+COMMAND_LONG delivery tracking.
+"""
+
+import math
+import time
+from typing import Callable
+
+from pymavlink import mavutil
+
+from utilities.mavlink import mavlink_templates
+from utilities.metrics import latency_histogram
+from ..common.modules.logger import logger
+
+
+# Parameters closer than this are the same command
+PARAMETER_TOLERANCE = 1e-3
+
+
+class PendingCommand:  # pylint: disable=too-many-instance-attributes
+    """
+    A command waiting for its COMMAND_ACK, used like a future.
+    Held commands wait for the one in flight to finish before they are sent.
+
+    result is the MAV_RESULT once acknowledged, or None if it timed out or was superseded.
+    """
+
+    def __init__(
+        self,
+        command: int,
+        params: "tuple[float, ...]",
+        target: "tuple[int, int]",
+        ack_timeout: float,
+        setpoint: "tuple[float, ...]",
+        context: object,
+    ) -> None:
+        self.command = command
+        self.params = params
+        # System and component
+        self.target = target
+        # What the command drives the vehicle to, compared to find duplicates
+        self.setpoint = setpoint
+        # Caller's data, e.g. what to report once a held command is sent
+        self.context = context
+        self.attempts = 0
+        self.first_send_time = time.monotonic()
+        self.last_send_time = self.first_send_time
+        self.deadline = self.first_send_time + ack_timeout
+        self.result: "int | None" = None
+        self.__done = False
+        self.__callbacks: "list[Callable[[PendingCommand], None]]" = []
+
+    def done(self) -> bool:
+        """
+        Whether the command was acknowledged, timed out, or superseded.
+        """
+        return self.__done
+
+    def add_done_callback(self, callback: "Callable[[PendingCommand], None]") -> None:
+        """
+        Calls callback(self) once done, immediately if already done.
+        """
+        if self.__done:
+            callback(self)
+            return
+
+        self.__callbacks.append(callback)
+
+    def finish(self, result: "int | None") -> None:
+        """
+        Completes the command and runs the callbacks.
+        """
+        self.result = result
+        self.__done = True
+        for callback in self.__callbacks:
+            callback(self)
+        self.__callbacks.clear()
+
+
+class CommandTracker:  # pylint: disable=too-many-instance-attributes
+    """
+    In-flight command table keyed by command id.
+
+    Sends COMMAND_LONG, matches COMMAND_ACK, and retries on timeout with an increasing
+    confirmation field. A command with the same setpoint as the one still in flight is
+    suppressed, a different one is held and sent once the one in flight is acknowledged
+    or times out, so the vehicle is never sent a new command while executing the last.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        ack_timeout: float = 1.0,  # s
+        max_retries: int = 2,
+        latency_metrics: latency_histogram.LatencyMetrics | None = None,
+        template: mavlink_templates.CommandLongTemplate | None = None,
+    ) -> "tuple[True, CommandTracker] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a CommandTracker object.
+
+        connection: Connection to the drone, must receive COMMAND_ACK.
+        local_logger: Existing logger from process.
+        ack_timeout: Time to wait for each attempt to be acknowledged.
+        max_retries: Sends after the first before giving up.
+        latency_metrics: Optional metrics to record round trip times into.
+        template: Optional pre-encoded COMMAND_LONG on connection, used for every send to its
+        target, other targets go through pymavlink.
+        """
+        if ack_timeout <= 0.0:
+            local_logger.error("Acknowledgement timeout must be positive", True)
+            return False, None
+
+        if max_retries < 0:
+            local_logger.error("Retries must not be negative", True)
+            return False, None
+
+        return True, CommandTracker(
+            cls.__private_key,
+            connection,
+            local_logger,
+            ack_timeout,
+            max_retries,
+            latency_metrics,
+            template,
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        ack_timeout: float,
+        max_retries: int,
+        latency_metrics: latency_histogram.LatencyMetrics | None,
+        template: mavlink_templates.CommandLongTemplate | None,
+    ) -> None:
+        assert key is CommandTracker.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__local_logger = local_logger
+        self.__ack_timeout = ack_timeout
+        self.__max_retries = max_retries
+        self.__latency_metrics = latency_metrics
+        self.__template = template
+        self.__in_flight: "dict[int, PendingCommand]" = {}
+        # Per command, the newest command waiting for the one in flight
+        self.__held: "dict[int, PendingCommand]" = {}
+
+        self.sent_count = 0
+        self.retry_count = 0
+        self.suppressed_count = 0
+        self.held_count = 0
+        self.timed_out_count = 0
+
+    @property
+    def in_flight(self) -> "dict[int, PendingCommand]":
+        """
+        Commands waiting for acknowledgement, by command id.
+        """
+        return self.__in_flight
+
+    def is_duplicate(
+        self,
+        command: int,
+        setpoint: "tuple[float, ...]",
+        tolerance: float = PARAMETER_TOLERANCE,
+    ) -> bool:
+        """
+        Whether the command in flight already drives to setpoint, within tolerance.
+        Counted as suppressed if so, for callers that check before spending anything on a send.
+        """
+        pending = self.__in_flight.get(command)
+        if pending is None or not _close(pending.setpoint, setpoint, tolerance):
+            return False
+
+        self.suppressed_count += 1
+        return True
+
+    def send(
+        self,
+        command: int,
+        params: "tuple[float, float, float, float, float, float, float]",
+        target_system: int = 1,
+        target_component: int = 0,
+        setpoint: "tuple[float, ...] | None" = None,
+        tolerance: float = PARAMETER_TOLERANCE,
+        context: object = None,
+    ) -> "tuple[bool, PendingCommand | None]":
+        """
+        Sends the command unless one of the same type is in flight.
+
+        setpoint: What the command drives the vehicle to, for commands with relative
+        parameters. None to compare the parameters.
+        tolerance: Setpoints closer than this are the same command.
+        context: Stored in the pending entry.
+
+        Returns whether it was sent now and its pending entry. The entry of a held command
+        is returned by update() once sent, or finished with None if a newer one replaces it.
+        A duplicate of the command in flight has no entry.
+        """
+        if setpoint is None:
+            setpoint = tuple(params)
+
+        if self.is_duplicate(command, setpoint, tolerance):
+            return False, None
+
+        pending = PendingCommand(
+            command,
+            params,
+            (target_system, target_component),
+            self.__ack_timeout,
+            setpoint,
+            context,
+        )
+        if command in self.__in_flight:
+            # Only the newest decision is worth sending, with the freshest parameters
+            held = self.__held.pop(command, None)
+            if held is not None:
+                held.finish(None)
+            self.__held[command] = pending
+            self.held_count += 1
+            return False, pending
+
+        self.__in_flight[command] = pending
+        self.__transmit(pending)
+        return True, pending
+
+    def __send_held(self, command: int) -> "PendingCommand | None":
+        """
+        Sends the held command, if any, once the one in flight is done.
+        """
+        pending = self.__held.pop(command, None)
+        if pending is None:
+            return None
+
+        self.__in_flight[command] = pending
+        self.__transmit(pending)
+        return pending
+
+    def __transmit(self, pending: PendingCommand) -> None:
+        """
+        Sends an attempt, the confirmation field counts retransmissions.
+        """
+        if self.__template is not None and pending.target == self.__template.target:
+            self.__template.send(pending.command, pending.params, pending.attempts)
+        else:
+            target_system, target_component = pending.target
+            self.__connection.mav.command_long_send(
+                target_system,
+                target_component,
+                pending.command,
+                pending.attempts,
+                *pending.params,
+            )
+        pending.attempts += 1
+        pending.last_send_time = time.monotonic()
+        pending.deadline = pending.last_send_time + self.__ack_timeout
+        self.sent_count += 1
+
+    def handle_ack(
+        self, msg: "mavutil.mavlink.MAVLink_command_ack_message"
+    ) -> "tuple[bool, PendingCommand | None]":
+        """
+        Matches an acknowledgement to its command.
+
+        Returns whether a command was waiting for it, and the held command sent in its place.
+        """
+        pending = self.__in_flight.get(msg.command)
+        if pending is None:
+            return False, None
+
+        now = time.monotonic()
+        # Accepted and still running, keep waiting for the final result
+        if msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            pending.deadline = now + self.__ack_timeout
+            return True, None
+
+        if self.__latency_metrics is not None:
+            self.__latency_metrics.record(
+                f"command {command_name(msg.command)}", now - pending.last_send_time
+            )
+        del self.__in_flight[msg.command]
+        pending.finish(msg.result)
+        return True, self.__send_held(msg.command)
+
+    def check_timeouts(self) -> "list[PendingCommand]":
+        """
+        Retries or gives up on every command past its deadline.
+        A held command is sent instead of retrying an outdated one.
+
+        Returns the held commands sent.
+        """
+        sent = []
+        now = time.monotonic()
+        for command, pending in list(self.__in_flight.items()):
+            if now < pending.deadline:
+                continue
+
+            if command in self.__held:
+                del self.__in_flight[command]
+                pending.finish(None)
+                sent.append(self.__send_held(command))
+                continue
+
+            if pending.attempts <= self.__max_retries:
+                self.retry_count += 1
+                self.__transmit(pending)
+                continue
+
+            self.__local_logger.warning(
+                f"{command_name(command)} not acknowledged after {pending.attempts} attempts"
+            )
+            self.timed_out_count += 1
+            del self.__in_flight[command]
+            pending.finish(None)
+
+        return sent
+
+    def update(self) -> "list[PendingCommand]":
+        """
+        Handles every waiting COMMAND_ACK without blocking, then checks timeouts.
+
+        Returns the held commands sent.
+        """
+        sent = []
+        while True:
+            msg = self.__connection.recv_match(type="COMMAND_ACK", blocking=False)
+            if msg is None:
+                break
+
+            _, held = self.handle_ack(msg)
+            if held is not None:
+                sent.append(held)
+
+        return sent + self.check_timeouts()
+
+
+def _close(old: "tuple[float, ...]", new: "tuple[float, ...]", tolerance: float) -> bool:
+    """
+    Whether every component is within tolerance.
+    """
+    return len(old) == len(new) and all(
+        math.isclose(a, b, abs_tol=tolerance) for a, b in zip(old, new)
+    )
+
+
+def command_name(command: int) -> str:
+    """
+    MAV_CMD name, e.g. MAV_CMD_CONDITION_YAW.
+    """
+    entry = mavutil.mavlink.enums["MAV_CMD"].get(command)
+    return entry.name if entry is not None else str(command)
@@ -4,24 +4,43 @@ Command worker to make decisions based on Telemetry Data.
 
 import os
 import pathlib
+import queue
+import time
 
 from pymavlink import mavutil
 
+from utilities.mavlink import mavlink_templates
+from utilities.metrics import latency_histogram
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import command
+from . import command_rate_limiter
+from . import command_tracker
+from . import dead_reckoning
 from ..common.modules.logger import logger
+from ..telemetry import telemetry_state_board
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+METRICS_REPORT_PERIOD = 5  # seconds
+# Bounds how long waiting commands and exit requests can go unnoticed while idle
+INPUT_TIMEOUT = 0.1  # seconds
+
+
 def command_worker(
     connection: mavutil.mavfile,
     target: command.Position,
     controller: worker_controller.WorkerController,
     command_input_queue: queue_proxy_wrapper.QueueProxyWrapper,
     command_output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    metrics_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
+    track_acks: bool = False,
+    rate_limits: "dict[str, tuple[float, int]] | None" = None,
+    latest_only: bool = False,
+    max_prediction_horizon: float | None = None,
+    state_board: telemetry_state_board.TelemetryStateBoard | None = None,
     # Place your own arguments here
     # Add other necessary worker arguments here
 ) -> None:
@@ -33,6 +52,17 @@ def command_worker(
     controller: worker controller,
     command_input_queue: queue of inputs,
     command_output_queue: queue of outputs,
+    metrics_queue: optional queue to main for periodic latency histograms,
+    track_acks: match COMMAND_ACK, retry unacknowledged commands, and suppress duplicates,
+        the connection must receive COMMAND_ACK,
+    rate_limits: optional MAV_CMD name to rate (Hz) and burst, the newest waiting command of
+        each type is sent once allowed,
+    latest_only: on each wakeup act only on the newest queued sample and skip the older ones,
+        otherwise every sample is acted on in order,
+    max_prediction_horizon: decide on the state dead reckoned to the present, at most this
+        many seconds ahead, None to decide on the samples as received,
+    state_board: read the newest sample from shared memory instead of command_input_queue,
+        samples written between two reads are skipped as in latest_only mode,
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -55,15 +85,112 @@ def command_worker(
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
     # Instantiate class object (command.Command)
-    command_object = command.Command.create(connection, target, local_logger)
+    latency_metrics = latency_histogram.LatencyMetrics()
+    tracker = None
+    if track_acks:
+        result, template = mavlink_templates.CommandLongTemplate.create(connection)
+        if not result:
+            local_logger.error("Failed to create COMMAND_LONG template", True)
+            return
+
+        result, tracker = command_tracker.CommandTracker.create(
+            connection, local_logger, latency_metrics=latency_metrics, template=template
+        )
+        if not result:
+            local_logger.error("Failed to create command tracker", True)
+            return
+
+    limiter = None
+    if rate_limits is not None:
+        result, limiter = command_rate_limiter.CommandRateLimiter.create(rate_limits, local_logger)
+        if not result:
+            local_logger.error("Failed to create command rate limiter", True)
+            return
+
+    predictor = None
+    if max_prediction_horizon is not None:
+        result, predictor = dead_reckoning.DeadReckoning.create(max_prediction_horizon)
+        if not result:
+            local_logger.error("Failed to create dead reckoning", True)
+            return
+
+    command_object = command.Command.create(
+        connection, target, local_logger, tracker, limiter, predictor
+    )
+    if command_object is None:
+        local_logger.error("Failed to create command", True)
+        return
+
+    # Samples discarded in favour of a newer one, only in latest_only mode or from the board
+    skipped_count = 0
+    board_generation = 0
+    next_metrics_report = time.monotonic() + METRICS_REPORT_PERIOD
     while not controller.is_exit_requested():
-        if not command_input_queue.queue.empty():
-            path = command_input_queue.queue.get()
+        if time.monotonic() >= next_metrics_report:
+            local_logger.info(command_object.velocity_summary())
+            if latest_only or state_board is not None:
+                local_logger.info(f"Stale samples skipped: {skipped_count}")
+            if predictor is not None:
+                local_logger.info(predictor.summary())
+            # Histograms are cumulative, main keeps the latest from each worker
+            if metrics_queue is not None:
+                metrics_queue.queue.put((f"{worker_name}_{process_id}", latency_metrics))
+            next_metrics_report += METRICS_REPORT_PERIOD
+
+        for run_command in command_object.update():
+            command_output_queue.queue.put(run_command)
+
+        # Block rather than poll, so an idle worker uses no CPU
+        if state_board is not None:
+            state_board.wait(INPUT_TIMEOUT)
+            last_generation = board_generation
+            result, board_generation, path = state_board.read_if_changed(last_generation)
+            if result:
+                skipped_count += board_generation - last_generation - 1
+        elif latest_only:
+            result, path, skipped = command_input_queue.get_latest(INPUT_TIMEOUT)
+            skipped_count += skipped
+        else:
+            try:
+                path = command_input_queue.queue.get(timeout=INPUT_TIMEOUT)
+                result = True
+            except queue.Empty:
+                result = False
+
+        # None is the shutdown sentinel
+        if result and path is not None:
+            consume_time = time.time()
+            if path.enqueue_time is not None:
+                latency_metrics.record("queue dwell", consume_time - path.enqueue_time)
+            if path.receive_time is not None:
+                latency_metrics.record("sample age", consume_time - path.receive_time)
             run_command = command_object.run(target, path)
             if run_command:
                 command_output_queue.queue.put(run_command)
     # Main loop: do work.
 
+    if tracker is not None:
+        local_logger.info(
+            f"Commands sent: {tracker.sent_count}, retried: {tracker.retry_count}, "
+            f"suppressed: {tracker.suppressed_count}, held: {tracker.held_count}, "
+            f"timed out: {tracker.timed_out_count}",
+            True,
+        )
+    if limiter is not None:
+        local_logger.info(
+            f"Rate limited commands sent: {limiter.sent_count}, deferred: {limiter.deferred_count}, "
+            f"coalesced: {limiter.coalesced_count}, discarded: {limiter.discarded_count}",
+            True,
+        )
+    if latest_only or state_board is not None:
+        local_logger.info(f"Stale samples skipped: {skipped_count}", True)
+    if predictor is not None:
+        local_logger.info(predictor.summary(), True)
+    if metrics_queue is not None:
+        metrics_queue.queue.put((f"{worker_name}_{process_id}", latency_metrics))
+    if state_board is not None:
+        state_board.close()
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
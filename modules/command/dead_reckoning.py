@@ -0,0 +1,196 @@
+"""
+Dead reckoning of telemetry forward to the present.
+"""
+
+import array
+import math
+
+from utilities.metrics import clock_offset_estimator
+from utilities.metrics import rolling_statistics
+from ..telemetry import attitude_history
+from ..telemetry import telemetry
+
+
+ERROR_WINDOW_SIZE = 100
+
+# (position, velocity) pairs of TelemetryData.values indices, velocities are in the same
+# local NED frame as the position
+POSITION_RATES = tuple(
+    (telemetry.TELEMETRY_FIELDS.index(axis), telemetry.TELEMETRY_FIELDS.index(f"{axis}_velocity"))
+    for axis in ("x", "y", "z")
+)
+TIME_INDEX = telemetry.TELEMETRY_FIELDS.index("time_since_boot")
+YAW_INDEX = telemetry.TELEMETRY_FIELDS.index("yaw")
+YAW_SPEED_INDEX = telemetry.TELEMETRY_FIELDS.index("yaw_speed")
+
+
+def extrapolate(sample: telemetry.TelemetryData, horizon: float) -> telemetry.TelemetryData:
+    """
+    Constant velocity and yaw rate prediction of the sample horizon seconds later.
+    Fields without a rate, or whose rate is missing, are copied unchanged.
+
+    yaw_speed is the body rate, which is close to the yaw rate while roll and pitch are small.
+    """
+    values = array.array("d", sample.values)
+    for position, velocity in POSITION_RATES:
+        if not math.isnan(values[velocity]):
+            values[position] += values[velocity] * horizon
+
+    if not math.isnan(values[YAW_SPEED_INDEX]):
+        values[YAW_INDEX] = attitude_history.wrap_angle(
+            values[YAW_INDEX] + values[YAW_SPEED_INDEX] * horizon
+        )
+
+    # NaN (unknown) stays NaN
+    values[TIME_INDEX] += round(horizon * 1000)
+
+    predicted = telemetry.TelemetryData()
+    predicted.values = values
+    predicted.receive_time = sample.receive_time
+    predicted.enqueue_time = sample.enqueue_time
+    return predicted
+
+
+class DeadReckoning:  # pylint: disable=too-many-instance-attributes
+    """
+    Predicts where the vehicle is now from a sample that has aged in the pipeline.
+
+    The age of a sample is measured from its vehicle timestamp with the local clock offset,
+    so the wait for its pair in Telemetry is included, not only the queue dwell.
+    Without a vehicle timestamp the age is measured from the local receive time.
+
+    Every sample is also compared against the prediction of the previous one to its time,
+    both for prediction and for holding the previous state, so the benefit is measurable.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        max_horizon: float,  # s
+    ) -> "tuple[True, DeadReckoning] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a DeadReckoning object.
+
+        max_horizon: Longest prediction, older samples are only predicted this far.
+        Also the longest gap between samples that is scored.
+        """
+        if max_horizon <= 0.0:
+            return False, None
+
+        statistics = {}
+        for name in [
+            "horizon",
+            "position_error",
+            "hold_position_error",
+            "yaw_error",
+            "hold_yaw_error",
+        ]:
+            result, statistics[name] = rolling_statistics.RollingStatistics.create(
+                ERROR_WINDOW_SIZE
+            )
+            if not result:
+                return False, None
+
+        return True, DeadReckoning(cls.__private_key, max_horizon, statistics)
+
+    def __init__(
+        self,
+        key: object,
+        max_horizon: float,
+        statistics: "dict[str, rolling_statistics.RollingStatistics]",
+    ) -> None:
+        assert key is DeadReckoning.__private_key, "Use create() method"
+
+        self.max_horizon = max_horizon
+        # Keyed by horizon (s), position_error (m), yaw_error (deg), and the hold_ variants
+        self.statistics = statistics
+        self.clock_offset = clock_offset_estimator.ClockOffsetEstimator()
+        self.__previous: "telemetry.TelemetryData | None" = None
+
+        self.predicted_count = 0
+        self.clamped_count = 0
+
+    def age(self, sample: telemetry.TelemetryData, now: float) -> float:
+        """
+        Seconds since the sample was valid, 0 if unknown.
+
+        now: Local time, seconds since the epoch.
+        """
+        if sample.receive_time is None:
+            return 0.0
+
+        time_since_boot = sample.time_since_boot
+        if time_since_boot is None:
+            return max(0.0, now - sample.receive_time)
+
+        self.clock_offset.latency(sample.receive_time, time_since_boot)
+        return max(0.0, now - (time_since_boot / 1000 + self.clock_offset.offset))
+
+    def __score(self, sample: telemetry.TelemetryData) -> None:
+        """
+        Compares the sample against the previous one predicted to its time.
+        """
+        previous = self.__previous
+        self.__previous = sample
+        if previous is None or previous.time_since_boot is None or sample.time_since_boot is None:
+            return
+
+        elapsed = (sample.time_since_boot - previous.time_since_boot) / 1000
+        if elapsed <= 0.0 or elapsed > self.max_horizon:
+            return
+
+        predicted = extrapolate(previous, elapsed)
+        observed = [sample.values[position] for position, _ in POSITION_RATES]
+        timestamp = sample.time_since_boot / 1000
+        for prefix, state in [("", predicted), ("hold_", previous)]:
+            position_error = math.dist(
+                [state.values[position] for position, _ in POSITION_RATES], observed
+            )
+            yaw_error = abs(
+                math.degrees(
+                    attitude_history.wrap_angle(state.values[YAW_INDEX] - sample.values[YAW_INDEX])
+                )
+            )
+            # Incomplete samples are not scored
+            if not math.isnan(position_error):
+                self.statistics[f"{prefix}position_error"].add(position_error, timestamp)
+            if not math.isnan(yaw_error):
+                self.statistics[f"{prefix}yaw_error"].add(yaw_error, timestamp)
+
+    def predict(self, sample: telemetry.TelemetryData, now: float) -> telemetry.TelemetryData:
+        """
+        Predicts the state at now from the sample.
+
+        now: Local time, seconds since the epoch.
+
+        Returns a new TelemetryData, the sample is unchanged.
+        """
+        self.__score(sample)
+
+        horizon = self.age(sample, now)
+        if horizon > self.max_horizon:
+            horizon = self.max_horizon
+            self.clamped_count += 1
+
+        self.predicted_count += 1
+        self.statistics["horizon"].add(horizon, now)
+        return extrapolate(sample, horizon)
+
+    def summary(self) -> str:
+        """
+        Mean horizon, and mean prediction error against holding the previous state.
+        """
+        if self.statistics["position_error"].count == 0:
+            return f"Predicted {self.predicted_count} samples, none scored"
+
+        horizon = self.statistics["horizon"]
+        return (
+            f"Predicted {self.predicted_count} samples ({self.clamped_count} clamped), "
+            f"horizon mean {horizon.mean:.3f} s max {horizon.max:.3f} s, "
+            f"position error {self.statistics['position_error'].mean:.3f} m "
+            f"(hold {self.statistics['hold_position_error'].mean:.3f} m), "
+            f"yaw error {self.statistics['yaw_error'].mean:.2f} deg "
+            f"(hold {self.statistics['hold_yaw_error'].mean:.2f} deg)"
+        )
@@ -0,0 +1,71 @@
+"""
+Heartbeat sending and receiving on one schedule.
+"""
+
+import time
+
+from utilities.workers import periodic_scheduler
+from . import heartbeat_receiver
+from . import heartbeat_sender
+from . import link_state
+
+
+class HeartbeatLink:
+    """
+    Runs a HeartbeatSender and a HeartbeatReceiver from one loop.
+
+    Waiting for heartbeats on the connection is how the loop sleeps,
+    so each wait ends at the sender's next deadline at the latest.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        sender: heartbeat_sender.HeartbeatSender,
+        receiver: heartbeat_receiver.HeartbeatReceiver,
+        period: float = 1.0,  # s
+    ) -> "tuple[True, HeartbeatLink] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a HeartbeatLink object.
+
+        period: Time between sent heartbeats.
+        """
+        result, scheduler = periodic_scheduler.PeriodicScheduler.create()
+        if not result:
+            return False, None
+
+        if not scheduler.add("heartbeat", period, sender.run):
+            return False, None
+
+        return True, HeartbeatLink(cls.__private_key, receiver, scheduler)
+
+    def __init__(
+        self,
+        key: object,
+        receiver: heartbeat_receiver.HeartbeatReceiver,
+        scheduler: periodic_scheduler.PeriodicScheduler,
+    ) -> None:
+        assert key is HeartbeatLink.__private_key, "Use create() method"
+
+        self.receiver = receiver
+        self.scheduler = scheduler
+
+    def run(self, max_wait: float) -> link_state.LinkTransition | None:  # s
+        """
+        Receives until the next heartbeat is due or the loss deadline, at most max_wait,
+        then sends every heartbeat that is due.
+
+        Returns the change of connection state, if any.
+        """
+        wait = min(max_wait, self.scheduler.next_deadline() - time.monotonic())
+        transition = self.receiver.run(max(wait, 0.0))
+        self.scheduler.run_pending()
+        return transition
+
+    def summary(self) -> str:
+        """
+        Send schedule statistics.
+        """
+        return self.scheduler.summary()
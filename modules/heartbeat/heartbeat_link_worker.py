@@ -0,0 +1,89 @@
+"""
+Link worker that sends and receives heartbeats in one process.
+"""
+
+import os
+import pathlib
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import heartbeat_link
+from . import heartbeat_receiver_worker
+from . import heartbeat_sender
+from ..common.modules.logger import logger
+from ..link_quality import link_quality_board
+
+
+# Bounds how long an exit request can go unnoticed
+EXIT_CHECK_PERIOD = 0.1  # seconds
+
+
+def heartbeat_link_worker(
+    connection: mavutil.mavfile,
+    receive_connection: mavutil.mavfile,
+    controller: worker_controller.WorkerController,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    heartbeat_time: float = 1,
+    disconnect_threshold: int = 5,
+    track_peers: bool = False,
+    quality_board: link_quality_board.LinkQualityBoard | None = None,
+) -> None:
+    """
+    Worker process.
+
+    connection - connection to drone, heartbeats are sent on it
+    receive_connection - heartbeats from the drone, e.g. a demultiplexer subscription
+    controller - worker controller
+    output_queue - changes of connection state, and of each peer as ((system, component), transition)
+    heartbeat_time - time between heartbeats, sent and expected
+    disconnect_threshold - heartbeat periods without one before the connection is lost
+    track_peers - also track liveness of every system and component heard on the link
+    quality_board - link quality written by the demultiplexer, reports degraded links
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    sender = heartbeat_sender.HeartbeatSender.create(connection)
+    if sender is None:
+        local_logger.error("Failed to create heartbeat sender", True)
+        return
+
+    receiver = heartbeat_receiver_worker.create_receiver(
+        receive_connection,
+        local_logger,
+        heartbeat_time,
+        disconnect_threshold,
+        track_peers,
+        quality_board,
+    )
+    if receiver is None:
+        return
+
+    # Instantiate class object (heartbeat_link.HeartbeatLink)
+    result, link = heartbeat_link.HeartbeatLink.create(sender, receiver, heartbeat_time)
+    if not result:
+        local_logger.error("Failed to create heartbeat link", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert link is not None
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        transition = link.run(EXIT_CHECK_PERIOD)
+        heartbeat_receiver_worker.put_transitions(output_queue, transition, receiver)
+
+    local_logger.info(link.summary(), True)
+    heartbeat_receiver_worker.log_peers(receiver)
@@ -0,0 +1,212 @@
+"""
+Liveness of every system and component heard on a link.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from utilities.timers import timer_wheel
+from . import link_state
+from ..common.modules.logger import logger
+
+
+# Loss deadlines are checked this many times per heartbeat period
+TICKS_PER_PERIOD = 10
+
+
+class PeerLiveness:
+    """
+    Connection state and counters of one (system, component).
+    """
+
+    def __init__(self, state_machine: link_state.LinkStateMachine, now: float) -> None:
+        self.state_machine = state_machine
+        self.first_seen = now  # Monotonic
+        self.vehicle_type: "int | None" = None
+        self.autopilot: "int | None" = None
+        # Monotonic time of the last transition to connected, None while disconnected
+        self.connected_since: "float | None" = None
+        # Connected time before connected_since
+        self.__past_uptime = 0.0
+
+    @property
+    def state(self) -> "link_state.LinkState | None":
+        """
+        Current state.
+        """
+        return self.state_machine.state
+
+    @property
+    def loss_count(self) -> int:
+        """
+        Times the peer has been declared lost.
+        """
+        return self.state_machine.disconnect_count
+
+    def uptime(self, now: float) -> float:
+        """
+        Total seconds connected.
+        """
+        if self.connected_since is None:
+            return self.__past_uptime
+
+        return self.__past_uptime + now - self.connected_since
+
+    def apply(self, transition: link_state.LinkTransition, now: float) -> None:
+        """
+        Updates the uptime bookkeeping for a transition at monotonic time now.
+        """
+        if transition.state != link_state.LinkState.DISCONNECTED:
+            if self.connected_since is None:
+                self.connected_since = now
+            return
+
+        # Lost once the deadline passed, the silence counts as down time
+        self.__past_uptime = self.uptime(self.state_machine.last_heartbeat)
+        self.connected_since = None
+
+
+class HeartbeatMonitor:
+    """
+    Tracks a LinkStateMachine for every (system, component) that sends heartbeats.
+
+    Loss deadlines are kept in a timer wheel, so with hundreds of peers each check only
+    touches the peers whose deadline is due instead of scanning all of them.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        local_logger: logger.Logger,
+        period: float = 1.0,  # s
+        disconnect_threshold: int = 5,
+    ) -> "tuple[True, HeartbeatMonitor] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a HeartbeatMonitor object.
+
+        period: Expected time between heartbeats of each peer.
+        disconnect_threshold: Periods without a heartbeat before a peer is lost.
+        """
+        result, _ = link_state.LinkStateMachine.create(period, disconnect_threshold)
+        if not result:
+            local_logger.error("Invalid heartbeat period or disconnect threshold", True)
+            return False, None
+
+        result, wheel = timer_wheel.TimerWheel.create(period / TICKS_PER_PERIOD, time.monotonic())
+        if not result:
+            local_logger.error("Failed to create timer wheel", True)
+            return False, None
+
+        return True, HeartbeatMonitor(
+            cls.__private_key, local_logger, period, disconnect_threshold, wheel
+        )
+
+    def __init__(
+        self,
+        key: object,
+        local_logger: logger.Logger,
+        period: float,
+        disconnect_threshold: int,
+        wheel: timer_wheel.TimerWheel,
+    ) -> None:
+        assert key is HeartbeatMonitor.__private_key, "Use create() method"
+
+        self.__local_logger = local_logger
+        self.__period = period
+        self.__disconnect_threshold = disconnect_threshold
+        self.__wheel = wheel
+        # (system, component) to liveness
+        self.peers: "dict[tuple[int, int], PeerLiveness]" = {}
+
+    def next_check(self) -> float:
+        """
+        Monotonic time of the next tick that can expire a peer.
+        """
+        return self.__wheel.time_of_tick(self.__wheel.current_tick + 1)
+
+    def heartbeat(
+        self, msg: "mavutil.mavlink.MAVLink_heartbeat_message", now: float
+    ) -> "tuple[tuple[int, int], link_state.LinkTransition] | None":
+        """
+        Records a heartbeat received at monotonic time now.
+
+        Returns the peer and its transition to connected, if any.
+        """
+        peer_id = (msg.get_srcSystem(), msg.get_srcComponent())
+        peer = self.peers.get(peer_id)
+        if peer is None:
+            _, state_machine = link_state.LinkStateMachine.create(
+                self.__period, self.__disconnect_threshold
+            )
+            peer = PeerLiveness(state_machine, now)
+            self.peers[peer_id] = peer
+
+        peer.vehicle_type = msg.type
+        peer.autopilot = msg.autopilot
+        transition = peer.state_machine.heartbeat(now)
+        self.__wheel.schedule(peer_id, peer.state_machine.deadline())
+        if transition is None:
+            return None
+
+        peer.apply(transition, now)
+        self.__local_logger.info(f"System {peer_id[0]} component {peer_id[1]}: {transition}")
+        return peer_id, transition
+
+    def update(self, now: float) -> "list[tuple[tuple[int, int], link_state.LinkTransition]]":
+        """
+        Expires peers whose deadline passed by monotonic time now.
+
+        Returns every peer lost and its transition.
+        """
+        lost = []
+        for peer_id in self.__wheel.advance(now):
+            peer = self.peers[peer_id]
+            transition = peer.state_machine.check(now)
+            if transition is None:
+                continue
+
+            peer.apply(transition, now)
+            self.__local_logger.warning(f"System {peer_id[0]} component {peer_id[1]}: {transition}")
+            lost.append((peer_id, transition))
+
+        return lost
+
+    def liveness_table(self, now: float) -> "list[dict[str, object]]":
+        """
+        One row per peer, sorted by system and component.
+
+        now: Monotonic time, for uptime and time since the last heartbeat.
+        """
+        return [
+            {
+                "system": peer_id[0],
+                "component": peer_id[1],
+                "state": None if peer.state is None else peer.state.value,
+                "vehicle_type": peer.vehicle_type,
+                "autopilot": peer.autopilot,
+                "since_heartbeat": now - peer.state_machine.last_heartbeat,
+                "uptime": peer.uptime(now),
+                "heartbeats": peer.state_machine.heartbeat_count,
+                "losses": peer.loss_count,
+            }
+            for peer_id, peer in sorted(self.peers.items())
+        ]
+
+    def log_liveness_table(self, now: float) -> None:
+        """
+        Logs liveness_table(), one line per peer.
+        """
+        for row in self.liveness_table(now):
+            self.__local_logger.info(f"Peer {row}", True)
+
+    def connected_count(self) -> int:
+        """
+        Peers currently connected, degraded or not.
+        """
+        return sum(
+            peer.state in (link_state.LinkState.CONNECTED, link_state.LinkState.DEGRADED)
+            for peer in self.peers.values()
+        )
@@ -2,8 +2,13 @@
 Heartbeat receiving logic.
 """
 
+import time
+
 from pymavlink import mavutil
 
+from . import heartbeat_monitor
+from . import link_state
+from ..link_quality import link_quality_board
 from ..common.modules.logger import logger
 
 
@@ -12,11 +17,10 @@ from ..common.modules.logger import logger
 # =================================================================================================
 class HeartbeatReceiver:
     """
-    HeartbeatReceiver class to send a heartbeat
+    HeartbeatReceiver class to receive heartbeats and report changes of connection state
     """
 
     __private_key = object()
-    output_queue = []
 
     @classmethod
     def create(
@@ -24,11 +28,27 @@ class HeartbeatReceiver:
         connection: mavutil.mavfile,
         # args,  # Put your own arguments here
         local_logger: logger.Logger,
+        period: float = 1.0,  # s
+        disconnect_threshold: int = 5,
+        monitor: heartbeat_monitor.HeartbeatMonitor | None = None,
+        quality_board: link_quality_board.LinkQualityBoard | None = None,
     ) -> object:
         """
         Falliable create (instantiation) method to create a HeartbeatReceiver object.
+
+        period: Expected time between heartbeats.
+        disconnect_threshold: Periods without a heartbeat before the connection is lost.
+        monitor: Optional liveness tracking of every system and component on the link.
+        quality_board: Optional link quality reports, a lossy link is reported as degraded.
         """
-        return HeartbeatReceiver(cls.__private_key, connection, local_logger)
+        result, state_machine = link_state.LinkStateMachine.create(period, disconnect_threshold)
+        if not result:
+            local_logger.error("Invalid heartbeat period or disconnect threshold", True)
+            return None
+
+        return HeartbeatReceiver(
+            cls.__private_key, connection, local_logger, state_machine, monitor, quality_board
+        )
 
     def __init__(
         self,
@@ -36,32 +56,82 @@ class HeartbeatReceiver:
         connection: mavutil.mavfile,
         # args,  # Put your own arguments here
         local_logger: logger.Logger,
+        state_machine: link_state.LinkStateMachine,
+        monitor: heartbeat_monitor.HeartbeatMonitor | None,
+        quality_board: link_quality_board.LinkQualityBoard | None,
     ) -> None:
         assert key is HeartbeatReceiver.__private_key, "Use create() method"
 
         # Do any intializiation here
         self.connection = connection
         self.local_logger = local_logger
-        self.missed = 0
+        self.state_machine = state_machine
+        self.monitor = monitor
+        self.quality_board = quality_board
+        self.quality_generation = 0
+        # Changes of peer state from the monitor, until taken
+        self.peer_transitions: "list[tuple[tuple[int, int], link_state.LinkTransition]]" = []
 
     def run(
         self,
+        max_wait: float,  # s
         # args,  # Put your own arguments here
-    ) -> str:
+    ) -> "link_state.LinkTransition | None":
         """
-        Attempt to recieve a heartbeat message.
-        If disconnected for over a threshold number of periods,
-        the connection is considered disconnected.
+        Wait for a heartbeat until the loss deadline, at most max_wait.
+        If none arrives by the deadline, the connection is considered disconnected.
+        Once disconnected the deadline has passed, so wait the full max_wait for the next one.
+
+        Returns the change of connection state, if any.
         """
-        msg = self.connection.recv_match(type="HEARTBEAT")
-        if not msg:
-            self.missed += 1
-            self.local_logger.warning(f"Missed Heartbeat {self.missed}")
-            if self.missed >= 5:
-                return "Disconnected"
-            return None
-        self.missed = 0
-        return "Connected"
+        if self.state_machine.state == link_state.LinkState.DISCONNECTED:
+            wait_until = time.monotonic() + max_wait
+        else:
+            wait_until = self.state_machine.deadline()
+        if self.monitor is not None:
+            wait_until = min(wait_until, self.monitor.next_check())
+        wait = min(max_wait, wait_until - time.monotonic())
+        msg = None
+        if wait > 0.0:
+            msg = self.connection.recv_match(type="HEARTBEAT", blocking=True, timeout=wait)
+
+        now = time.monotonic()
+        if msg is not None:
+            transition = self.state_machine.heartbeat(now)
+        else:
+            transition = self.state_machine.check(now)
+
+        if self.monitor is not None:
+            if msg is not None:
+                peer_transition = self.monitor.heartbeat(msg, now)
+                if peer_transition is not None:
+                    self.peer_transitions.append(peer_transition)
+            self.peer_transitions.extend(self.monitor.update(now))
+
+        if transition is None and self.quality_board is not None:
+            result, self.quality_generation, report = self.quality_board.read_if_changed(
+                self.quality_generation
+            )
+            if result:
+                transition = self.state_machine.link_quality(report.loss_rate, now)
+                if transition is not None:
+                    self.local_logger.info(f"{transition} at {report}", True)
+                    return transition
+
+        if transition is not None:
+            self.local_logger.info(
+                f"{transition} after {transition.silence:.3f} s without heartbeat", True
+            )
+        return transition
+
+    def take_peer_transitions(self) -> "list[tuple[tuple[int, int], link_state.LinkTransition]]":
+        """
+        Changes of peer state since the last call, as ((system, component), transition).
+        Always empty without a monitor.
+        """
+        peer_transitions = self.peer_transitions
+        self.peer_transitions = []
+        return peer_transitions
 
 
 # =================================================================================================
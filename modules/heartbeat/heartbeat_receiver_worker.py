@@ -10,18 +10,79 @@ from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
+from . import heartbeat_monitor
 from . import heartbeat_receiver
+from . import link_state
+from ..link_quality import link_quality_board
 from ..common.modules.logger import logger
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+# Bounds how long an exit request can go unnoticed
+EXIT_CHECK_PERIOD = 0.1  # seconds
+
+
+def create_receiver(
+    connection: mavutil.mavfile,
+    local_logger: logger.Logger,
+    heartbeat_time: float,
+    disconnect_threshold: int,
+    track_peers: bool,
+    quality_board: link_quality_board.LinkQualityBoard | None,
+) -> heartbeat_receiver.HeartbeatReceiver | None:
+    """
+    Receiver with a peer monitor if track_peers, logs and returns None on failure.
+    Shared with the link worker.
+    """
+    monitor = None
+    if track_peers:
+        result, monitor = heartbeat_monitor.HeartbeatMonitor.create(
+            local_logger, heartbeat_time, disconnect_threshold
+        )
+        if not result:
+            local_logger.error("Failed to create heartbeat monitor", True)
+            return None
+
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, heartbeat_time, disconnect_threshold, monitor, quality_board
+    )
+    if receiver is None:
+        local_logger.error("Failed to create heartbeat receiver", True)
+    return receiver
+
+
+def put_transitions(
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    transition: link_state.LinkTransition | None,
+    receiver: heartbeat_receiver.HeartbeatReceiver,
+) -> None:
+    """
+    Puts the change of connection state, if any, then those of each peer.
+    """
+    if transition is not None:
+        output_queue.queue.put(transition)
+    for peer_transition in receiver.take_peer_transitions():
+        output_queue.queue.put(peer_transition)
+
+
+def log_peers(receiver: heartbeat_receiver.HeartbeatReceiver) -> None:
+    """
+    Logs the liveness of each peer, if tracked.
+    """
+    if receiver.monitor is not None:
+        receiver.monitor.log_liveness_table(time.monotonic())
+
+
 def heartbeat_receiver_worker(
     connection: mavutil.mavfile,
     controller: worker_controller.WorkerController,  # Place your own arguments here
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
-    heartbeat_time: int,
+    heartbeat_time: float = 1,
+    disconnect_threshold: int = 5,
+    track_peers: bool = False,
+    quality_board: link_quality_board.LinkQualityBoard | None = None,
     # Add other necessary worker arguments here
 ) -> None:
     """
@@ -29,8 +90,11 @@ def heartbeat_receiver_worker(
 
     connection - connection to drone
     controller - worker controller
-    output_queue - worker output queue
-    HEATBEAT_TIME - time for a single heartbeat
+    output_queue - changes of connection state, and of each peer as ((system, component), transition)
+    heartbeat_time - time for a single heartbeat
+    disconnect_threshold - heartbeat periods without one before the connection is lost
+    track_peers - also track liveness of every system and component heard on the link
+    quality_board - link quality written by the demultiplexer, reports degraded links
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -54,16 +118,20 @@ def heartbeat_receiver_worker(
     # =============================================================================================
     # Instantiate class object (heartbeat_receiver.HeartbeatReceiver)
 
-    heart_beat_receiver_object = heartbeat_receiver.HeartbeatReceiver.create(
-        connection, local_logger
+    heart_beat_receiver_object = create_receiver(
+        connection, local_logger, heartbeat_time, disconnect_threshold, track_peers, quality_board
     )
+    if heart_beat_receiver_object is None:
+        return
+
+    # Waits on the connection up to the loss deadline, only changes of state go to main
     while not controller.is_exit_requested():
-        result = heart_beat_receiver_object.run()
-        if result:
-            output_queue.queue.put(result)
-        time.sleep(heartbeat_time)
+        transition = heart_beat_receiver_object.run(EXIT_CHECK_PERIOD)
+        put_transitions(output_queue, transition, heart_beat_receiver_object)
     # Main loop: do work.
 
+    log_peers(heart_beat_receiver_object)
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
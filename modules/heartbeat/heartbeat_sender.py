@@ -4,6 +4,8 @@ Heartbeat sending logic.
 
 from pymavlink import mavutil
 
+from utilities.mavlink import mavlink_templates
+
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
@@ -24,18 +26,27 @@ class HeartbeatSender:
         """
         Falliable create (instantiation) method to create a HeartbeatSender object.
         """
-        return HeartbeatSender(cls.__private_key, connection)
+        result, template = mavlink_templates.HeartbeatTemplate.create(
+            connection, mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID
+        )
+        if not result:
+            return None
+
+        return HeartbeatSender(cls.__private_key, connection, template)
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
+        template: mavlink_templates.HeartbeatTemplate,
         # args,  # Put your own arguments here
     ) -> None:
         assert key is HeartbeatSender.__private_key, "Use create() method"
 
         # Do any intializiation here
         self.connection = connection
+        # Every heartbeat is identical, so its frames are encoded once
+        self.template = template
 
     def run(
         self,
@@ -44,9 +55,7 @@ class HeartbeatSender:
         """
         Attempt to send a heartbeat message.
         """
-        self.connection.mav.heartbeat_send(
-            mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
-        )  # Send a heartbeat message
+        self.template.send()  # Send a heartbeat message
 
 
 # =================================================================================================
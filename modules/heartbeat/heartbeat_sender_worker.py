@@ -4,10 +4,10 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
+from utilities.workers import periodic_scheduler
 from utilities.workers import worker_controller
 from . import heartbeat_sender
 from ..common.modules.logger import logger
@@ -16,6 +16,11 @@ from ..common.modules.logger import logger
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+HEARTBEAT_PERIOD = 1  # seconds
+# Bounds how long an exit request can go unnoticed
+EXIT_CHECK_PERIOD = 0.1  # seconds
+
+
 def heartbeat_sender_worker(
     connection: mavutil.mavfile,
     controller: worker_controller.WorkerController,  # Place your own arguments here
@@ -49,11 +54,22 @@ def heartbeat_sender_worker(
     # =============================================================================================
     # Instantiate class object (heartbeat_sender.HeartbeatSender)
     heart_beat_sender_object = heartbeat_sender.HeartbeatSender.create(connection)
+    if heart_beat_sender_object is None:
+        local_logger.error("Failed to create heartbeat sender", True)
+        return
+
+    # Absolute deadlines, so send time and wakeup jitter do not accumulate into drift
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create()
+    if not result or not scheduler.add("heartbeat", HEARTBEAT_PERIOD, heart_beat_sender_object.run):
+        local_logger.error("Failed to create heartbeat schedule", True)
+        return
+
     while not controller.is_exit_requested():
-        heart_beat_sender_object.run()
-        time.sleep(1)
+        scheduler.run_next(EXIT_CHECK_PERIOD)
     # Main loop: do work.
 
+    local_logger.info(scheduler.summary(), True)
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -0,0 +1,163 @@
+"""
+Connection state of a link, driven by heartbeat deadlines.
+"""
+
+import enum
+import time
+
+
+class LinkState(enum.Enum):
+    """
+    Whether heartbeats are arriving.
+    """
+
+    CONNECTED = "Connected"
+    # Heartbeats arrive but the link is losing frames
+    DEGRADED = "Degraded"
+    DISCONNECTED = "Disconnected"
+
+
+class LinkTransition:
+    """
+    A change of link state.
+    """
+
+    __slots__ = ("state", "timestamp", "silence")
+
+    def __init__(self, state: LinkState, timestamp: float, silence: float) -> None:
+        self.state = state
+        # Local time of the transition, seconds since the epoch
+        self.timestamp = timestamp
+        # Seconds without a heartbeat before the transition
+        self.silence = silence
+
+    def __str__(self) -> str:
+        return self.state.value
+
+    def __repr__(self) -> str:
+        return (
+            f"LinkTransition({self.state.name}, timestamp={self.timestamp:.3f}, "
+            f"silence={self.silence:.3f})"
+        )
+
+
+class LinkStateMachine:
+    """
+    Declares the link lost once no heartbeat has arrived for disconnect_threshold periods,
+    measured on the monotonic clock, and connected again on the next heartbeat.
+    While connected, link quality reports move it between connected and degraded.
+
+    Only changes of state are reported, so a steady link produces no output.
+    Callers wait until deadline(), which bounds the detection latency.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        period: float = 1.0,  # s
+        disconnect_threshold: int = 5,
+        degraded_loss_rate: float = 0.2,
+        recovered_loss_rate: float = 0.1,
+    ) -> "tuple[True, LinkStateMachine] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a LinkStateMachine object.
+
+        period: Expected time between heartbeats.
+        disconnect_threshold: Periods without a heartbeat before the link is lost.
+        degraded_loss_rate: Frame loss at which a connected link is degraded.
+        recovered_loss_rate: Frame loss at which a degraded link is connected again,
+        lower than degraded_loss_rate so the state does not flap.
+        """
+        if period <= 0.0 or disconnect_threshold < 1:
+            return False, None
+
+        if not 0.0 <= recovered_loss_rate < degraded_loss_rate <= 1.0:
+            return False, None
+
+        return True, LinkStateMachine(
+            cls.__private_key,
+            period,
+            disconnect_threshold,
+            degraded_loss_rate,
+            recovered_loss_rate,
+        )
+
+    def __init__(
+        self,
+        key: object,
+        period: float,
+        disconnect_threshold: int,
+        degraded_loss_rate: float,
+        recovered_loss_rate: float,
+    ) -> None:
+        assert key is LinkStateMachine.__private_key, "Use create() method"
+
+        self.timeout = period * disconnect_threshold
+        self.__degraded_loss_rate = degraded_loss_rate
+        self.__recovered_loss_rate = recovered_loss_rate
+        # None until the first heartbeat or timeout
+        self.state: "LinkState | None" = None
+        # Creation counts as a heartbeat, so a silent link is declared lost after the timeout
+        self.last_heartbeat = time.monotonic()
+
+        self.heartbeat_count = 0
+        self.disconnect_count = 0
+
+    def deadline(self) -> float:
+        """
+        Monotonic time the link is declared lost without another heartbeat.
+        """
+        return self.last_heartbeat + self.timeout
+
+    def __transition(self, state: LinkState, now: float) -> "LinkTransition | None":
+        """
+        Moves to the state, returning the transition if it changed.
+        """
+        if self.state == state:
+            return None
+
+        self.state = state
+        if state == LinkState.DISCONNECTED:
+            self.disconnect_count += 1
+        return LinkTransition(state, time.time(), now - self.last_heartbeat)
+
+    def heartbeat(self, now: float) -> "LinkTransition | None":
+        """
+        Records a heartbeat received at monotonic time now.
+
+        Returns the transition to connected, if any.
+        """
+        transition = None
+        # A heartbeat says nothing about loss, so a degraded link stays degraded
+        if self.state != LinkState.DEGRADED:
+            transition = self.__transition(LinkState.CONNECTED, now)
+        self.last_heartbeat = now
+        self.heartbeat_count += 1
+        return transition
+
+    def check(self, now: float) -> "LinkTransition | None":
+        """
+        Checks for loss at monotonic time now.
+
+        Returns the transition to disconnected, if any.
+        """
+        if now < self.deadline():
+            return None
+
+        return self.__transition(LinkState.DISCONNECTED, now)
+
+    def link_quality(self, loss_rate: float, now: float) -> "LinkTransition | None":
+        """
+        Applies the recent frame loss (0 to 1) at monotonic time now.
+
+        Returns the transition between connected and degraded, if any.
+        """
+        if self.state == LinkState.CONNECTED and loss_rate >= self.__degraded_loss_rate:
+            return self.__transition(LinkState.DEGRADED, now)
+
+        if self.state == LinkState.DEGRADED and loss_rate <= self.__recovered_loss_rate:
+            return self.__transition(LinkState.CONNECTED, now)
+
+        return None
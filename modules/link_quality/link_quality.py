@@ -0,0 +1,251 @@
+"""
+Link quality estimation from MAVLink sequence numbers.
+"""
+
+import collections
+import time
+
+from pymavlink import mavutil
+
+
+SEQUENCE_MODULUS = 256
+# A sequence number this far behind the expected one is a late or repeated frame, otherwise a gap
+SEQUENCE_BEHIND = SEQUENCE_MODULUS // 2
+
+# Field order of LinkQualityReport.values()
+REPORT_FIELDS = (
+    "timestamp",  # s since the epoch
+    "window",  # s
+    "received",
+    "lost",
+    "reordered",
+    "duplicates",
+    "bytes_per_second",
+    "messages_per_second",
+)
+
+
+class LinkQualityReport:  # pylint: disable=too-many-instance-attributes
+    """
+    Totals over the recent window, all sources combined.
+    """
+
+    __slots__ = REPORT_FIELDS
+
+    def __init__(
+        self,
+        timestamp: float,
+        window: float,
+        received: float,
+        lost: float,
+        reordered: float,
+        duplicates: float,
+        bytes_per_second: float,
+        messages_per_second: float,
+    ) -> None:
+        self.timestamp = timestamp
+        self.window = window
+        self.received = received
+        self.lost = lost
+        self.reordered = reordered
+        self.duplicates = duplicates
+        self.bytes_per_second = bytes_per_second
+        self.messages_per_second = messages_per_second
+
+    @property
+    def loss_rate(self) -> float:
+        """
+        Fraction of sent frames that never arrived, 0 without traffic.
+        """
+        sent = self.received + self.lost
+        return self.lost / sent if sent > 0 else 0.0
+
+    def values(self) -> "list[float]":
+        """
+        Fields in REPORT_FIELDS order, for shared memory.
+        """
+        return [getattr(self, field) for field in REPORT_FIELDS]
+
+    def __str__(self) -> str:
+        return (
+            f"Over {self.window:.1f} s: {self.received:.0f} received, {self.lost:.0f} lost "
+            f"({self.loss_rate:.1%}), {self.reordered:.0f} reordered, "
+            f"{self.duplicates:.0f} duplicates, {self.messages_per_second:.1f} msg/s, "
+            f"{self.bytes_per_second:.0f} B/s"
+        )
+
+
+class SourceSequence:
+    """
+    Sequence tracking of one (system, component).
+    """
+
+    def __init__(self, sequence: int) -> None:
+        self.expected = (sequence + 1) % SEQUENCE_MODULUS
+        # Recently skipped sequence numbers to the bucket their loss was counted in, oldest first,
+        # a late arrival of one is a reorder
+        self.missing: "collections.OrderedDict[int, int]" = collections.OrderedDict()
+
+    def update(self, sequence: int, bucket_index: int) -> "tuple[int, int, int, int | None]":
+        """
+        Returns frames lost, reordered, and duplicated by this frame,
+        and for a frame counted as lost that arrived late, the bucket its loss was counted in.
+
+        bucket_index: Bucket that any loss found by this frame is counted in.
+        """
+        gap = (sequence - self.expected) % SEQUENCE_MODULUS
+        if gap >= SEQUENCE_BEHIND:
+            if sequence in self.missing:
+                return 0, 1, 0, self.missing.pop(sequence)
+
+            return 0, 0, 1, None
+
+        for offset in range(gap):
+            self.missing[(self.expected + offset) % SEQUENCE_MODULUS] = bucket_index
+        self.expected = (sequence + 1) % SEQUENCE_MODULUS
+
+        # Skipped numbers can only be told apart from a repeat until they are reused
+        while self.missing:
+            oldest = next(iter(self.missing))
+            if (self.expected - oldest) % SEQUENCE_MODULUS <= SEQUENCE_BEHIND:
+                break
+            del self.missing[oldest]
+        return gap, 0, 0, None
+
+
+class LinkQuality:
+    """
+    Fed every received frame. Counts loss, reordering, and duplicates from the per source
+    sequence numbers, and bytes and messages by type, over a sliding window.
+
+    The window is a ring of buckets, so each frame is a few counter increments
+    and reports sum at most bucket_count buckets.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        window_time: float = 10.0,  # s
+        bucket_count: int = 10,
+    ) -> "tuple[True, LinkQuality] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a LinkQuality object.
+
+        window_time: Span of the sliding window.
+        bucket_count: Buckets in the window, the window slides by window_time / bucket_count.
+        """
+        if window_time <= 0.0 or bucket_count < 1:
+            return False, None
+
+        return True, LinkQuality(cls.__private_key, window_time, bucket_count)
+
+    def __init__(self, key: object, window_time: float, bucket_count: int) -> None:
+        assert key is LinkQuality.__private_key, "Use create() method"
+
+        self.__bucket_time = window_time / bucket_count
+        self.__bucket_count = bucket_count
+        # (bucket index, counts, messages by type), oldest first
+        self.__buckets: (
+            "collections.deque[tuple[int, collections.Counter, collections.Counter]]"
+        ) = collections.deque()
+        self.__first_time: "float | None" = None
+        # (system, component) to sequence tracking
+        self.sources: "dict[tuple[int, int], SourceSequence]" = {}
+
+    def __bucket(self, now: float) -> "tuple[int, collections.Counter, collections.Counter]":
+        """
+        Index and counters of the bucket for now, dropping buckets that left the window.
+        """
+        index = int(now // self.__bucket_time)
+        if not self.__buckets or self.__buckets[-1][0] != index:
+            self.__buckets.append((index, collections.Counter(), collections.Counter()))
+        while self.__buckets[0][0] <= index - self.__bucket_count:
+            self.__buckets.popleft()
+
+        return self.__buckets[-1]
+
+    def __uncount_loss(self, bucket_index: int) -> None:
+        """
+        Takes back a loss counted in the bucket, unless it has left the window with it.
+        """
+        for index, counts, _ in self.__buckets:
+            if index == bucket_index:
+                counts["lost"] -= 1
+                return
+
+    def add(self, msg: "mavutil.mavlink.MAVLink_message", now: float) -> None:
+        """
+        Counts a received frame.
+
+        now: Local receive time, seconds since the epoch.
+        """
+        if self.__first_time is None:
+            self.__first_time = now
+
+        index, counts, types = self.__bucket(now)
+        counts["received"] += 1
+        counts["bytes"] += len(msg.get_msgbuf())
+        types[msg.get_type()] += 1
+
+        source = (msg.get_srcSystem(), msg.get_srcComponent())
+        sequence = msg.get_seq()
+        tracking = self.sources.get(source)
+        if tracking is None:
+            self.sources[source] = SourceSequence(sequence)
+            return
+
+        lost, reordered, duplicates, late_bucket_index = tracking.update(sequence, index)
+        counts["lost"] += lost
+        counts["reordered"] += reordered
+        counts["duplicates"] += duplicates
+        if late_bucket_index is not None:
+            self.__uncount_loss(late_bucket_index)
+
+    def __totals(self, now: float) -> "tuple[float, collections.Counter, collections.Counter]":
+        """
+        Window length and summed counters as of now.
+        """
+        index = int(now // self.__bucket_time)
+        counts = collections.Counter()
+        types = collections.Counter()
+        for bucket_index, bucket_counts, bucket_types in self.__buckets:
+            if bucket_index > index - self.__bucket_count:
+                counts.update(bucket_counts)
+                types.update(bucket_types)
+
+        window = self.__bucket_time * self.__bucket_count
+        if self.__first_time is not None:
+            # Do not dilute the rates before a full window has passed
+            window = max(min(window, now - self.__first_time), self.__bucket_time)
+        return window, counts, types
+
+    def report(self, now: "float | None" = None) -> LinkQualityReport:
+        """
+        Totals over the window ending now (seconds since the epoch, None for the current time).
+        """
+        if now is None:
+            now = time.time()
+
+        window, counts, _ = self.__totals(now)
+        return LinkQualityReport(
+            now,
+            window,
+            counts["received"],
+            counts["lost"],
+            counts["reordered"],
+            counts["duplicates"],
+            counts["bytes"] / window,
+            counts["received"] / window,
+        )
+
+    def message_rates(self, now: "float | None" = None) -> "dict[str, float]":
+        """
+        Messages per second by type over the window ending now.
+        """
+        if now is None:
+            now = time.time()
+
+        window, _, types = self.__totals(now)
+        return {message_type: count / window for message_type, count in sorted(types.items())}
@@ -0,0 +1,81 @@
+"""
+Latest LinkQualityReport shared between processes.
+"""
+
+import math
+
+from utilities.workers import shared_state_board
+from . import link_quality
+
+
+class LinkQualityBoard:
+    """
+    The newest link quality report in shared memory.
+    The demultiplexer worker writes, main and the heartbeat receiver read.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls) -> "tuple[bool, LinkQualityBoard | None]":
+        """
+        Allocates the board, called by main before starting workers.
+        """
+        result, board = shared_state_board.SharedStateBoard.create(len(link_quality.REPORT_FIELDS))
+        if not result:
+            return False, None
+
+        return True, LinkQualityBoard(cls.__create_key, board)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        board: shared_state_board.SharedStateBoard,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is LinkQualityBoard.__create_key, "Use create() method"
+
+        self.__board = board
+
+    def write(self, report: link_quality.LinkQualityReport) -> None:
+        """
+        Publishes a report, only called by the demultiplexer worker.
+        """
+        self.__board.write(report.values())
+
+    def read_if_changed(
+        self, last_generation: int
+    ) -> "tuple[bool, int, link_quality.LinkQualityReport | None]":
+        """
+        Returns whether there is a newer report than last_generation,
+        the current generation, and the report.
+        """
+        result, generation, values = self.__board.read_if_changed(last_generation)
+        if not result or generation == 0:
+            return False, generation, None
+
+        return True, generation, link_quality.LinkQualityReport(*values.tolist())
+
+    def read(self) -> "tuple[bool, link_quality.LinkQualityReport | None]":
+        """
+        Returns whether a report has been written and the newest report.
+        """
+        result, generation, values = self.__board.read()
+        if not result or generation == 0 or math.isnan(values[0]):
+            return False, None
+
+        return True, link_quality.LinkQualityReport(*values.tolist())
+
+    def close(self) -> None:
+        """
+        Detaches this process.
+        """
+        self.__board.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the board, only called by main after every worker has stopped.
+        """
+        self.__board.unlink()
@@ -0,0 +1,132 @@
+"""
+Single-reader MAVLink demultiplexing logic.
+"""
+
+import queue
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from ..common.modules.logger import logger
+from ..link_quality import link_quality
+from ..tlog import tlog_recorder
+
+
+# Subscribing to this type receives every message on the link
+ALL_MESSAGES = "*"
+
+
+class MavlinkDemux:  # pylint: disable=too-many-instance-attributes
+    """
+    Sole reader of the MAVLink connection.
+    Each frame is parsed once and then routed by message type to the subscribed queues.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+        local_logger: logger.Logger,
+        recorder: tlog_recorder.TlogRecorder | None = None,
+        quality: link_quality.LinkQuality | None = None,
+    ) -> "tuple[True, MavlinkDemux] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a MavlinkDemux object.
+
+        connection: Connection to the drone, only read by this object.
+        subscriptions: Message type (e.g. "ATTITUDE") to the queues that receive it.
+        local_logger: Existing logger from process.
+        recorder: Optional log that every received frame is appended to.
+        quality: Optional link quality estimation that every received frame is counted in.
+        """
+        if len(subscriptions) == 0:
+            local_logger.error("No subscriptions, nothing would consume the link", True)
+            return False, None
+
+        return True, MavlinkDemux(
+            cls.__private_key, connection, subscriptions, local_logger, recorder, quality
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+        local_logger: logger.Logger,
+        recorder: tlog_recorder.TlogRecorder | None,
+        quality: link_quality.LinkQuality | None,
+    ) -> None:
+        assert key is MavlinkDemux.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__local_logger = local_logger
+        self.__recorder = recorder
+        self.__quality = quality
+
+        # Copy so main can keep editing its own dictionary
+        self.__routes = {
+            message_type: list(queues) for message_type, queues in subscriptions.items()
+        }
+        self.__wildcard_queues = self.__routes.pop(ALL_MESSAGES, [])
+
+        self.received_count = 0
+        self.routed_count = 0
+        # Per message type, messages dropped because a subscriber queue was full
+        self.dropped_counts: "dict[str, int]" = {}
+
+    def run(self, timeout: float) -> "tuple[bool, str | None]":
+        """
+        Receive a single message and copy it to every subscriber of its type.
+
+        timeout: Maximum time in seconds to wait for a message.
+
+        Returns whether a message was received and its type.
+        """
+        msg = self.__connection.recv_match(blocking=True, timeout=timeout)
+        if msg is None:
+            return False, None
+
+        message_type = msg.get_type()
+        if message_type == "BAD_DATA":
+            return False, None
+
+        self.received_count += 1
+
+        now = time.time()
+        if self.__recorder is not None:
+            self.__recorder.record(msg, now)
+
+        if self.__quality is not None:
+            self.__quality.add(msg, now)
+
+        for subscriber in self.__routes.get(message_type, []) + self.__wildcard_queues:
+            # Never block on a slow subscriber, it would starve every other subscriber
+            try:
+                subscriber.queue.put_nowait(msg)
+            except queue.Full:
+                self.dropped_counts[message_type] = self.dropped_counts.get(message_type, 0) + 1
+                continue
+
+            self.routed_count += 1
+
+        return True, message_type
+
+    def close(self) -> None:
+        """
+        Closes the recording, if any.
+        """
+        if self.__recorder is not None:
+            self.__recorder.close()
+
+    def log_statistics(self) -> None:
+        """
+        Log receive, route, and drop counts.
+        """
+        self.__local_logger.info(
+            f"Received: {self.received_count}, routed: {self.routed_count}, dropped: {self.dropped_counts}",
+            True,
+        )
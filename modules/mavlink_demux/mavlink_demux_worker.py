@@ -0,0 +1,106 @@
+"""
+Demultiplexer worker that owns the read side of the MAVLink connection.
+"""
+
+import os
+import pathlib
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import mavlink_demux
+from ..common.modules.logger import logger
+from ..link_quality import link_quality
+from ..link_quality import link_quality_board
+from ..tlog import tlog_recorder
+
+
+RECEIVE_TIMEOUT = 0.1  # seconds, bounds how long an exit request can go unnoticed
+QUALITY_PUBLISH_PERIOD = 1  # seconds
+QUALITY_LOG_PERIOD = 10  # seconds
+
+
+def mavlink_demux_worker(
+    connection: mavutil.mavfile,
+    subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+    controller: worker_controller.WorkerController,
+    record_path: "str | None" = None,
+    quality_board: link_quality_board.LinkQualityBoard | None = None,
+    rates_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
+) -> None:
+    """
+    Worker process.
+
+    connection - connection to drone, no other worker may read from it
+    subscriptions - message type to subscriber queues
+    controller - worker controller
+    record_path - tlog file that every received frame is appended to, None to not record
+    quality_board - optional shared memory board that link quality is published to
+    rates_queue - optional queue to main for periodic messages per second by type,
+    only with quality_board
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # The recording file is opened here since file handles cannot be passed between processes
+    recorder = None
+    if record_path is not None:
+        result, recorder = tlog_recorder.TlogRecorder.create(record_path)
+        if not result:
+            local_logger.error(f"Failed to open recording {record_path}", True)
+            return
+
+    quality = None
+    if quality_board is not None:
+        result, quality = link_quality.LinkQuality.create()
+        if not result:
+            local_logger.error("Failed to create link quality estimation", True)
+            return
+
+    # Instantiate class object (mavlink_demux.MavlinkDemux)
+    result, demux = mavlink_demux.MavlinkDemux.create(
+        connection, subscriptions, local_logger, recorder, quality
+    )
+    if not result:
+        local_logger.error("Failed to create demultiplexer", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert demux is not None
+
+    # Main loop: do work.
+    next_publish = time.time() + QUALITY_PUBLISH_PERIOD
+    next_log = time.time() + QUALITY_LOG_PERIOD
+    while not controller.is_exit_requested():
+        demux.run(RECEIVE_TIMEOUT)
+
+        if quality is None:
+            continue
+
+        now = time.time()
+        if now >= next_publish:
+            quality_board.write(quality.report(now))
+            next_publish += QUALITY_PUBLISH_PERIOD
+        if now >= next_log:
+            local_logger.info(f"Link quality: {quality.report(now)}", True)
+            if rates_queue is not None:
+                rates_queue.queue.put(quality.message_rates(now))
+            next_log += QUALITY_LOG_PERIOD
+
+    demux.close()
+    demux.log_statistics()
+    if quality is not None:
+        local_logger.info(f"Link quality: {quality.report()}", True)
+        local_logger.info(f"Message rates (Hz): {quality.message_rates()}", True)
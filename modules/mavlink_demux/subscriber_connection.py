@@ -0,0 +1,84 @@
+"""
+Connection stand-in for workers that receive through the demultiplexer.
+"""
+
+import queue
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+
+
+class SubscriberConnection:
+    """
+    Reads messages from a demultiplexer subscription queue instead of the link,
+    and sends directly on the underlying connection.
+
+    Supports the subset of mavutil.mavfile used by the workers,
+    so it can be passed anywhere a connection is expected.
+    """
+
+    def __init__(
+        self,
+        connection: mavutil.mavfile,
+        subscription_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    ) -> None:
+        """
+        connection: Connection to the drone, only used for sending.
+        subscription_queue: Queue filled by the demultiplexer.
+        """
+        self.__connection = connection
+        self.__subscription_queue = subscription_queue
+
+    @property
+    def mav(self) -> "mavutil.mavlink.MAVLink":
+        """
+        MAVLink encoder of the underlying connection, for sending.
+        """
+        return self.__connection.mav
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Returns the next subscribed message if one is waiting, otherwise None.
+        """
+        try:
+            return self.__subscription_queue.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def recv_match(
+        self,
+        condition: None = None,
+        type: "str | list[str] | set[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Same semantics as mavutil.mavfile.recv_match() except that
+        waiting is done on the subscription queue instead of the socket.
+
+        condition: Unsupported, must be None.
+        """
+        assert condition is None, "Conditions are not supported, filter by type"
+
+        if type is not None and not isinstance(type, (list, set)):
+            type = [type]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                if not blocking:
+                    msg = self.__subscription_queue.queue.get_nowait()
+                elif deadline is None:
+                    msg = self.__subscription_queue.queue.get()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0.0:
+                        return None
+                    msg = self.__subscription_queue.queue.get(timeout=remaining)
+            except queue.Empty:
+                return None
+
+            if type is None or msg.get_type() in type:
+                return msg
@@ -0,0 +1,270 @@
+"""
+Configures which messages the vehicle streams, and how often.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from ..common.modules.logger import logger
+
+
+# Legacy stream group of each message, for autopilots without SET_MESSAGE_INTERVAL
+DATA_STREAM_GROUPS = {
+    "ATTITUDE": mavutil.mavlink.MAV_DATA_STREAM_EXTRA1,
+    "GLOBAL_POSITION_INT": mavutil.mavlink.MAV_DATA_STREAM_POSITION,
+    "LOCAL_POSITION_NED": mavutil.mavlink.MAV_DATA_STREAM_POSITION,
+    "SYS_STATUS": mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
+    "VFR_HUD": mavutil.mavlink.MAV_DATA_STREAM_EXTRA2,
+}
+
+# Periodic messages ArduPilot and PX4 stream to a ground station by default,
+# stopped one by one for autopilots that ignore REQUEST_DATA_STREAM
+DEFAULT_STREAMED_MESSAGES = (
+    "AHRS",
+    "ALTITUDE",
+    "ATTITUDE",
+    "ATTITUDE_QUATERNION",
+    "BATTERY_STATUS",
+    "EKF_STATUS_REPORT",
+    "ESTIMATOR_STATUS",
+    "EXTENDED_SYS_STATE",
+    "GLOBAL_POSITION_INT",
+    "GPS_RAW_INT",
+    "HIGHRES_IMU",
+    "LOCAL_POSITION_NED",
+    "MEMINFO",
+    "MISSION_CURRENT",
+    "NAV_CONTROLLER_OUTPUT",
+    "POSITION_TARGET_GLOBAL_INT",
+    "POSITION_TARGET_LOCAL_NED",
+    "POWER_STATUS",
+    "RAW_IMU",
+    "RC_CHANNELS",
+    "SCALED_IMU2",
+    "SCALED_PRESSURE",
+    "SERVO_OUTPUT_RAW",
+    "SYS_STATUS",
+    "SYSTEM_TIME",
+    "VFR_HUD",
+    "VIBRATION",
+)
+
+# SET_MESSAGE_INTERVAL interval that stops a message
+STOP_INTERVAL = -1
+
+
+class StreamRateNegotiator:
+    """
+    Requests exactly the configured messages at the configured rates, optionally stopping
+    every default stream that was not requested first.
+    Messages that are not periodic (HEARTBEAT, COMMAND_ACK) are always sent and need no request.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        rates: "dict[str, float]",
+        local_logger: logger.Logger,
+        ack_timeout: float = 1.0,  # s
+        stop_other_streams: bool = False,
+    ) -> "tuple[True, StreamRateNegotiator] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a StreamRateNegotiator object.
+
+        connection: Connection to the drone, nothing else may read from it during negotiation.
+        rates: Message type (e.g. "ATTITUDE") to rate in Hz.
+        local_logger: Existing logger from process.
+        ack_timeout: Time to wait for each COMMAND_ACK before falling back.
+        stop_other_streams: Stop every stream the autopilot sends by default that is not in rates
+        before requesting, including ones other processes on the vehicle link may rely on.
+        """
+        for message_type, rate in rates.items():
+            if not hasattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}"):
+                local_logger.error(f"Unknown message type {message_type}", True)
+                return False, None
+
+            if rate <= 0.0:
+                local_logger.error(f"Rate for {message_type} must be positive", True)
+                return False, None
+
+        return True, StreamRateNegotiator(
+            cls.__private_key, connection, rates, local_logger, ack_timeout, stop_other_streams
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        rates: "dict[str, float]",
+        local_logger: logger.Logger,
+        ack_timeout: float,
+        stop_other_streams: bool,
+    ) -> None:
+        assert key is StreamRateNegotiator.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__rates = dict(rates)
+        self.__local_logger = local_logger
+        self.__ack_timeout = ack_timeout
+        self.__stop_other_streams = stop_other_streams
+
+    def __send_message_interval(self, message_type: str, interval: float) -> None:
+        """
+        Sends SET_MESSAGE_INTERVAL for the message, interval in us or STOP_INTERVAL.
+        """
+        self.__connection.mav.command_long_send(
+            self.__connection.target_system,
+            self.__connection.target_component,
+            mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
+            0,
+            getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}"),
+            interval,
+            0,
+            0,
+            0,
+            0,
+            0,
+        )
+
+    def __receive_acks(self, count: int) -> int:
+        """
+        Waits up to the ACK timeout for count SET_MESSAGE_INTERVAL acknowledgements.
+
+        Returns how many were accepted.
+        """
+        accepted = 0
+        deadline = time.monotonic() + self.__ack_timeout
+        while count > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                break
+
+            ack = self.__connection.recv_match(type="COMMAND_ACK", blocking=True, timeout=remaining)
+            if ack is None:
+                break
+
+            if ack.command == mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL:
+                count -= 1
+                accepted += ack.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
+
+        return accepted
+
+    def __set_message_interval(self, message_type: str, rate: float) -> bool:
+        """
+        Requests the message with SET_MESSAGE_INTERVAL.
+
+        Returns whether the vehicle accepted it.
+        """
+        self.__send_message_interval(message_type, 1e6 / rate)  # us
+        return self.__receive_acks(1) == 1
+
+    def __stop_other_messages(self) -> int:
+        """
+        Stops every default stream that was not requested, all at once so that
+        at most one ACK timeout is spent.
+
+        Returns how many stops the vehicle accepted.
+        """
+        # Stops ArduPilot's stream groups, PX4 ignores it
+        self.__connection.mav.request_data_stream_send(
+            self.__connection.target_system,
+            self.__connection.target_component,
+            mavutil.mavlink.MAV_DATA_STREAM_ALL,
+            0,
+            0,
+        )
+
+        stopped = [
+            message_type
+            for message_type in DEFAULT_STREAMED_MESSAGES
+            if message_type not in self.__rates
+        ]
+        for message_type in stopped:
+            self.__send_message_interval(message_type, STOP_INTERVAL)
+
+        accepted = self.__receive_acks(len(stopped))
+        self.__local_logger.info(
+            f"Stopped {accepted} of {len(stopped)} unsubscribed default streams", True
+        )
+        return accepted
+
+    def negotiate(self) -> "dict[str, str]":
+        """
+        Sends the requests.
+
+        Returns the method that was used for each message type.
+        """
+        if self.__stop_other_streams:
+            self.__stop_other_messages()
+
+        methods = {}
+        for message_type, rate in self.__rates.items():
+            if self.__set_message_interval(message_type, rate):
+                methods[message_type] = "SET_MESSAGE_INTERVAL"
+                continue
+
+            if message_type not in DATA_STREAM_GROUPS:
+                self.__local_logger.warning(f"Could not request {message_type}", True)
+                methods[message_type] = "UNSUPPORTED"
+                continue
+
+            # Rates of legacy streams are per group, the fastest request in a group wins
+            self.__connection.mav.request_data_stream_send(
+                self.__connection.target_system,
+                self.__connection.target_component,
+                DATA_STREAM_GROUPS[message_type],
+                max(1, round(rate)),
+                1,
+            )
+            methods[message_type] = "REQUEST_DATA_STREAM"
+
+        self.__local_logger.info(f"Stream rate requests: {methods}", True)
+        return methods
+
+    def measure(self, duration: float) -> "dict[str, tuple[float, float]]":
+        """
+        Receives every message for a while.
+
+        Returns each message type's rate in Hz and bandwidth in bytes/s.
+        """
+        counts: "dict[str, int]" = {}
+        byte_counts: "dict[str, int]" = {}
+        deadline = time.monotonic() + duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                break
+
+            msg = self.__connection.recv_match(blocking=True, timeout=remaining)
+            if msg is None or msg.get_type() == "BAD_DATA":
+                continue
+
+            message_type = msg.get_type()
+            counts[message_type] = counts.get(message_type, 0) + 1
+            byte_counts[message_type] = byte_counts.get(message_type, 0) + len(msg.get_msgbuf())
+
+        return {
+            message_type: (count / duration, byte_counts[message_type] / duration)
+            for message_type, count in counts.items()
+        }
+
+    def verify(
+        self, measured: "dict[str, tuple[float, float]]", tolerance: float = 0.5
+    ) -> "dict[str, bool]":
+        """
+        Whether each requested message arrives within tolerance (fraction) of its rate.
+        """
+        verified = {}
+        for message_type, rate in self.__rates.items():
+            actual_rate, _ = measured.get(message_type, (0.0, 0.0))
+            verified[message_type] = abs(actual_rate - rate) <= tolerance * rate
+            if not verified[message_type]:
+                self.__local_logger.warning(
+                    f"{message_type} requested at {rate} Hz, receiving {actual_rate:.2f} Hz", True
+                )
+
+        return verified
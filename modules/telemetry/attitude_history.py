@@ -0,0 +1,146 @@
+"""
+Short attitude history for aligning attitude to other message timestamps.
+"""
+
+import collections
+import math
+
+from pymavlink import mavutil
+
+
+# An attitude older than the newest by more than this is from a reset clock (e.g. vehicle reboot),
+# not late, and restarts the history
+RESET_TOLERANCE = 1000  # ms
+
+
+def wrap_angle(angle: float) -> float:
+    """
+    Wraps an angle in radians into [-pi, pi).
+    """
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+class Orientation:
+    """
+    Attitude estimated at a single timestamp.
+    """
+
+    __slots__ = ("roll", "pitch", "yaw", "roll_speed", "pitch_speed", "yaw_speed")
+
+    def __init__(
+        self,
+        roll: float,  # rad
+        pitch: float,  # rad
+        yaw: float,  # rad
+        roll_speed: float,  # rad/s
+        pitch_speed: float,  # rad/s
+        yaw_speed: float,  # rad/s
+    ) -> None:
+        self.roll = roll
+        self.pitch = pitch
+        self.yaw = yaw
+        self.roll_speed = roll_speed
+        self.pitch_speed = pitch_speed
+        self.yaw_speed = yaw_speed
+
+
+class AttitudeHistory:
+    """
+    Ring buffer of the latest ATTITUDE messages.
+
+    Attitude between two stored messages is linearly interpolated, with roll and yaw
+    taking the short way around. Attitude after the newest message is extrapolated with
+    its angular rates, so consumers never have to wait for the next attitude.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        history_size: int = 8,
+        max_extrapolation: int = 500,  # ms
+    ) -> "tuple[True, AttitudeHistory] | tuple[False, None]":
+        """
+        history_size: Number of attitude messages kept, must be at least 2 to interpolate.
+        max_extrapolation: Furthest past the newest attitude that is still estimated.
+        """
+        if history_size < 2:
+            return False, None
+
+        if max_extrapolation < 0:
+            return False, None
+
+        return True, AttitudeHistory(cls.__private_key, history_size, max_extrapolation)
+
+    def __init__(
+        self,
+        key: object,
+        history_size: int,
+        max_extrapolation: int,
+    ) -> None:
+        assert key is AttitudeHistory.__private_key, "Use create() method"
+
+        self.__attitudes: "collections.deque[mavutil.mavlink.MAVLink_attitude_message]" = (
+            collections.deque(maxlen=history_size)
+        )
+        self.__max_extrapolation = max_extrapolation
+
+    def add(self, attitude: "mavutil.mavlink.MAVLink_attitude_message") -> None:
+        """
+        Stores an ATTITUDE message. Out of order messages are discarded,
+        and a timestamp more than RESET_TOLERANCE before the newest clears the history.
+        """
+        if len(self.__attitudes) > 0 and attitude.time_boot_ms <= self.__attitudes[-1].time_boot_ms:
+            if self.__attitudes[-1].time_boot_ms - attitude.time_boot_ms <= RESET_TOLERANCE:
+                return
+
+            self.__attitudes.clear()
+
+        self.__attitudes.append(attitude)
+
+    def at(self, time_boot_ms: int) -> "tuple[True, Orientation] | tuple[False, None]":
+        """
+        Estimates the attitude at the timestamp.
+
+        Returns False if the time is older than the history or too far past the newest attitude.
+        """
+        if len(self.__attitudes) == 0:
+            return False, None
+
+        newest = self.__attitudes[-1]
+        if time_boot_ms >= newest.time_boot_ms:
+            elapsed = time_boot_ms - newest.time_boot_ms
+            if elapsed > self.__max_extrapolation:
+                return False, None
+
+            seconds = elapsed / 1000
+            return True, Orientation(
+                wrap_angle(newest.roll + newest.rollspeed * seconds),
+                newest.pitch + newest.pitchspeed * seconds,
+                wrap_angle(newest.yaw + newest.yawspeed * seconds),
+                newest.rollspeed,
+                newest.pitchspeed,
+                newest.yawspeed,
+            )
+
+        # Search newest to oldest, requests are normally close to the newest attitude
+        after = newest
+        for before in reversed(self.__attitudes):
+            if before.time_boot_ms <= time_boot_ms:
+                fraction = (time_boot_ms - before.time_boot_ms) / (
+                    after.time_boot_ms - before.time_boot_ms
+                )
+                return True, Orientation(
+                    wrap_angle(before.roll + fraction * wrap_angle(after.roll - before.roll)),
+                    before.pitch + fraction * (after.pitch - before.pitch),
+                    wrap_angle(before.yaw + fraction * wrap_angle(after.yaw - before.yaw)),
+                    before.rollspeed + fraction * (after.rollspeed - before.rollspeed),
+                    before.pitchspeed + fraction * (after.pitchspeed - before.pitchspeed),
+                    before.yawspeed + fraction * (after.yawspeed - before.yawspeed),
+                )
+
+            after = before
+
+        # Older than the whole history
+        return False, None
@@ -2,18 +2,78 @@
 Telemetry gathering logic.
 """
 
+import array
+import enum
+import math
+import struct
 import time
+from typing import Callable, Iterator
 
 from pymavlink import mavutil
 
+from utilities.metrics import clock_offset_estimator
+from utilities.metrics import latency_histogram
+from . import attitude_history
 from ..common.modules.logger import logger
 
 
-class TelemetryData:  # pylint: disable=too-many-instance-attributes
+# Field order of the packed representation
+TELEMETRY_FIELDS = (
+    "time_since_boot",  # ms
+    "x",  # m
+    "y",  # m
+    "z",  # m
+    "x_velocity",  # m/s
+    "y_velocity",  # m/s
+    "z_velocity",  # m/s
+    "roll",  # rad
+    "pitch",  # rad
+    "yaw",  # rad
+    "roll_speed",  # rad/s
+    "pitch_speed",  # rad/s
+    "yaw_speed",  # rad/s
+)
+
+# Wire format: magic, version, field count, padding, receive time, enqueue time,
+# then every field as a little endian float64
+# Missing values (None) are NaN
+TELEMETRY_WIRE_MAGIC = b"TD"
+TELEMETRY_WIRE_VERSION = 2
+TELEMETRY_WIRE_HEADER = struct.Struct("<2sBB4x2d")
+TELEMETRY_WIRE_FORMAT = struct.Struct(f"<2sBB4x2d{len(TELEMETRY_FIELDS)}d")
+
+
+def _telemetry_field(index: int, is_integer: bool = False) -> property:
+    """
+    Property reading and writing a single slot of the packed values.
+    """
+
+    def getter(self: "TelemetryData") -> "float | int | None":
+        value = self.values[index]
+        if math.isnan(value):
+            return None
+
+        return int(value) if is_integer else value
+
+    def setter(self: "TelemetryData", value: "float | int | None") -> None:
+        self.values[index] = math.nan if value is None else value
+
+    return property(getter, setter, doc=TELEMETRY_FIELDS[index])
+
+
+class TelemetryData:
     """
     Python struct to represent Telemtry Data. Contains the most recent attitude and position reading.
+
+    All fields are stored in a single float64 array, so instances are small and
+    serialize to a fixed size binary format.
+
+    receive_time and enqueue_time are local times (seconds since the epoch) for latency
+    measurement, and are not part of the telemetry fields.
     """
 
+    __slots__ = ("values", "receive_time", "enqueue_time")
+
     def __init__(
         self,
         time_since_boot: int | None = None,  # ms
@@ -30,19 +90,88 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         pitch_speed: float | None = None,  # rad/s
         yaw_speed: float | None = None,  # rad/s
     ) -> None:
-        self.time_since_boot = time_since_boot
-        self.x = x
-        self.y = y
-        self.z = z
-        self.x_velocity = x_velocity
-        self.y_velocity = y_velocity
-        self.z_velocity = z_velocity
-        self.roll = roll
-        self.pitch = pitch
-        self.yaw = yaw
-        self.roll_speed = roll_speed
-        self.pitch_speed = pitch_speed
-        self.yaw_speed = yaw_speed
+        self.receive_time: "float | None" = None
+        self.enqueue_time: "float | None" = None
+        self.values = array.array(
+            "d",
+            (
+                math.nan if value is None else value
+                for value in (
+                    time_since_boot,
+                    x,
+                    y,
+                    z,
+                    x_velocity,
+                    y_velocity,
+                    z_velocity,
+                    roll,
+                    pitch,
+                    yaw,
+                    roll_speed,
+                    pitch_speed,
+                    yaw_speed,
+                )
+            ),
+        )
+
+    time_since_boot = _telemetry_field(0, True)
+    x = _telemetry_field(1)
+    y = _telemetry_field(2)
+    z = _telemetry_field(3)
+    x_velocity = _telemetry_field(4)
+    y_velocity = _telemetry_field(5)
+    z_velocity = _telemetry_field(6)
+    roll = _telemetry_field(7)
+    pitch = _telemetry_field(8)
+    yaw = _telemetry_field(9)
+    roll_speed = _telemetry_field(10)
+    pitch_speed = _telemetry_field(11)
+    yaw_speed = _telemetry_field(12)
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs into the wire format.
+        """
+        return TELEMETRY_WIRE_FORMAT.pack(
+            TELEMETRY_WIRE_MAGIC,
+            TELEMETRY_WIRE_VERSION,
+            len(TELEMETRY_FIELDS),
+            math.nan if self.receive_time is None else self.receive_time,
+            math.nan if self.enqueue_time is None else self.enqueue_time,
+            *self.values,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "tuple[True, TelemetryData] | tuple[False, None]":
+        """
+        Unpacks from the wire format.
+
+        Returns whether the data was valid and the TelemetryData.
+        """
+        if len(data) != TELEMETRY_WIRE_FORMAT.size:
+            return False, None
+
+        magic, version, field_count, receive_time, enqueue_time = TELEMETRY_WIRE_HEADER.unpack_from(
+            data
+        )
+        if (
+            magic != TELEMETRY_WIRE_MAGIC
+            or version != TELEMETRY_WIRE_VERSION
+            or field_count != len(TELEMETRY_FIELDS)
+        ):
+            return False, None
+
+        telemetry_data = cls.__new__(cls)
+        telemetry_data.receive_time = None if math.isnan(receive_time) else receive_time
+        telemetry_data.enqueue_time = None if math.isnan(enqueue_time) else enqueue_time
+        telemetry_data.values = array.array("d", TELEMETRY_WIRE_FORMAT.unpack(data)[5:])
+        return True, telemetry_data
+
+    def __reduce__(self) -> "tuple":
+        """
+        Pickle as the raw wire format, used by queues.
+        """
+        return _telemetry_data_from_wire, (self.to_bytes(),)
 
     def __str__(self) -> str:
         return f"""{{
@@ -62,10 +191,44 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         }}"""
 
 
+def _telemetry_data_from_wire(data: bytes) -> TelemetryData:
+    """
+    Unpickle helper, the data was packed by to_bytes() so it is always valid.
+    """
+    result, telemetry_data = TelemetryData.from_bytes(data)
+    assert result, "Corrupted TelemetryData pickle"
+    return telemetry_data
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
-class Telemetry:
+class WaitMode(enum.Enum):
+    """
+    How Telemetry waits for messages.
+    """
+
+    # Spin on non-blocking receives, uses a full core while waiting
+    POLL = 0
+    # Sleep on the connection until a message arrives or the pairing deadline expires
+    BLOCKING = 1
+
+
+class FusionMode(enum.Enum):
+    """
+    How Telemetry combines attitude and position.
+    """
+
+    # Pair the latest of each and stamp with the newer timestamp
+    LATEST = 0
+    # One sample per position, with attitude interpolated to the position timestamp
+    INTERPOLATE = 1
+
+
+TELEMETRY_MESSAGE_TYPES = ["ATTITUDE", "LOCAL_POSITION_NED"]
+
+
+class Telemetry:  # pylint: disable=too-many-instance-attributes
     """
     Telemetry class to read position and attitude (orientation).
     """
@@ -77,22 +240,156 @@ class Telemetry:
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        wait_mode: WaitMode = WaitMode.BLOCKING,
+        pairing_timeout: float = 1.0,  # s
+        fusion_mode: FusionMode = FusionMode.LATEST,
     ) -> object:
         """
         Falliable create (instantiation) method to create a Telemetry object.
+
+        wait_mode: How to wait for messages.
+        pairing_timeout: Time to receive both an attitude and a position before giving up.
+        fusion_mode: How to combine attitude and position.
         """
-        return Telemetry(cls.__private_key, connection, local_logger)  # Create a Telemetry object
+        attitudes = None
+        if fusion_mode == FusionMode.INTERPOLATE:
+            result, attitudes = attitude_history.AttitudeHistory.create()
+            if not result:
+                local_logger.error("Failed to create attitude history", True)
+                return None
+
+        return Telemetry(
+            cls.__private_key, connection, local_logger, wait_mode, pairing_timeout, attitudes
+        )  # Create a Telemetry object
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        wait_mode: WaitMode,
+        pairing_timeout: float,
+        attitudes: "attitude_history.AttitudeHistory | None",
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
 
         self.connection = connection
         self.local_logger = local_logger
+        self.wait_mode = wait_mode
+        self.pairing_timeout = pairing_timeout
+        # Only used when interpolating
+        self.attitudes = attitudes
+        # Per message type link latency, relative to the fastest message seen
+        self.clock_offset = clock_offset_estimator.ClockOffsetEstimator()
+        self.latency_metrics = latency_histogram.LatencyMetrics()
+        # Only used when pairing the latest of each
+        self.__local_position: "mavutil.mavlink.MAVLink_local_position_ned_message | None" = None
+        self.__attitude: "mavutil.mavlink.MAVLink_attitude_message | None" = None
+
+    def __receive(self, deadline: float) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Receive a single telemetry message, or None if nothing is available.
+        Only blocks in BLOCKING mode, and never past the deadline.
+        """
+        if self.wait_mode == WaitMode.POLL:
+            return self.connection.recv_match(blocking=False)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0.0:
+            return None
+
+        return self.connection.recv_match(
+            type=TELEMETRY_MESSAGE_TYPES, blocking=True, timeout=remaining
+        )
+
+    def __fuse(
+        self, local_position: "mavutil.mavlink.MAVLink_local_position_ned_message"
+    ) -> "tuple[True, TelemetryData] | tuple[False, None]":
+        """
+        Combine a position with the attitude interpolated to its timestamp.
+        """
+        result, orientation = self.attitudes.at(local_position.time_boot_ms)
+        if not result:
+            return False, None
+
+        return True, TelemetryData(
+            local_position.time_boot_ms,
+            local_position.x,
+            local_position.y,
+            local_position.z,
+            local_position.vx,
+            local_position.vy,
+            local_position.vz,
+            orientation.roll,
+            orientation.pitch,
+            orientation.yaw,
+            orientation.roll_speed,
+            orientation.pitch_speed,
+            orientation.yaw_speed,
+        )
+
+    def process(
+        self, msg: "mavutil.mavlink.MAVLink_message", receive_time: float
+    ) -> "TelemetryData | None":
+        """
+        Handle a single received message, for callers that do their own receiving.
+
+        receive_time: Local time the message was received, seconds since the epoch.
+
+        Returns a TelemetryData once attitude and position have been combined, otherwise None.
+        """
+        self.local_logger.info(f"Received: {msg.get_type()}")
+        if msg.get_type() not in TELEMETRY_MESSAGE_TYPES:
+            return None
+
+        self.latency_metrics.record(
+            f"link {msg.get_type()}",
+            self.clock_offset.latency(receive_time, msg.time_boot_ms),
+        )
+        if self.attitudes is not None:
+            # History is kept across calls, so every position can produce a sample
+            if msg.get_type() == "ATTITUDE":
+                self.attitudes.add(msg)
+                return None
+
+            result, fused = self.__fuse(msg)
+            if not result:
+                return None
+
+            fused.receive_time = receive_time
+            return fused
+
+        # Read MAVLink message LOCAL_POSITION_NED (32)
+        if msg.get_type() == "LOCAL_POSITION_NED":
+            self.__local_position = msg
+        else:
+            self.__attitude = msg
+        if self.__attitude is None or self.__local_position is None:
+            return None
+
+        local_position = self.__local_position
+        attitude = self.__attitude
+        self.__local_position = None
+        self.__attitude = None
+        max_time_since_boot = max(local_position.time_boot_ms, attitude.time_boot_ms)
+        # Return the most recent of both, and use the most recent message's timestamp
+        telemetry_data = TelemetryData(
+            max_time_since_boot,
+            local_position.x,
+            local_position.y,
+            local_position.z,
+            local_position.vx,
+            local_position.vy,
+            local_position.vz,
+            attitude.roll,
+            attitude.pitch,
+            attitude.yaw,
+            attitude.rollspeed,
+            attitude.pitchspeed,
+            attitude.yawspeed,
+        )
+        telemetry_data.receive_time = receive_time
+        return telemetry_data
 
     def run(
         self,
@@ -102,39 +399,32 @@ class Telemetry:
         Receive LOCAL_POSITION_NED and ATTITUDE messages from the drone,
         combining them together to form a single TelemetryData object.
         """
-        start_time = time.time()
-        local_position = None
-        attitude = None
-        while time.time() - start_time < 1:
-            msg = self.connection.recv_match(blocking=False)
-            if msg:
-                self.local_logger.info(f"Received: {msg.get_type()}")
-            # Read MAVLink message LOCAL_POSITION_NED (32)
-            if msg and msg.get_type() == "LOCAL_POSITION_NED":
-                local_position = msg
-            elif msg and msg.get_type() == "ATTITUDE":
-                attitude = msg
-            if attitude and local_position:
-                max_time_since_boot = max(local_position.time_boot_ms, attitude.time_boot_ms)
-                # Return the most recent of both, and use the most recent message's timestamp
-                return TelemetryData(
-                    max_time_since_boot,
-                    local_position.x,
-                    local_position.y,
-                    local_position.z,
-                    local_position.vx,
-                    local_position.vy,
-                    local_position.vz,
-                    attitude.roll,
-                    attitude.pitch,
-                    attitude.yaw,
-                    attitude.rollspeed,
-                    attitude.pitchspeed,
-                    attitude.yawspeed,
-                )
+        deadline = time.monotonic() + self.pairing_timeout
+        # Each call pairs fresh messages
+        self.__local_position = None
+        self.__attitude = None
+        while time.monotonic() < deadline:
+            msg = self.__receive(deadline)
+            if not msg:
+                continue
+
+            telemetry_data = self.process(msg, time.time())
+            if telemetry_data is not None:
+                return telemetry_data
         self.local_logger.warning("Did not receive messages, restarting...")
         return None
 
+    def stream(self, should_stop: Callable[[], bool] | None = None) -> Iterator[TelemetryData]:
+        """
+        Yields fused samples continuously, until should_stop() returns True if given.
+        Pairing timeouts are skipped rather than yielded, and the attitude history and
+        clock offset estimate are kept between samples.
+        """
+        while should_stop is None or not should_stop():
+            telemetry_data = self.run()
+            if telemetry_data is not None:
+                yield telemetry_data
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -0,0 +1,106 @@
+"""
+Columnar storage of many TelemetryData samples.
+"""
+
+import numpy as np
+
+from . import telemetry
+
+
+# One float64 per field in TelemetryData order, so records have the same layout as
+# TelemetryData.values and missing fields are NaN
+TELEMETRY_BATCH_DTYPE = np.dtype([(name, np.float64) for name in telemetry.TELEMETRY_FIELDS])
+
+MINIMUM_CAPACITY = 16
+
+
+class TelemetryBatch:
+    """
+    Growable NumPy structured array of telemetry records, for vectorized
+    processing of whole flights.
+
+    Samples must be appended in time_since_boot order for time slicing.
+    """
+
+    def __init__(
+        self, capacity: int = MINIMUM_CAPACITY, records: "np.ndarray | None" = None
+    ) -> None:
+        """
+        capacity: Number of records to preallocate.
+        records: Existing structured array to wrap without copying, ignores capacity.
+        """
+        if records is None:
+            records = np.empty(max(capacity, MINIMUM_CAPACITY), dtype=TELEMETRY_BATCH_DTYPE)
+            self.__size = 0
+        else:
+            assert records.dtype == TELEMETRY_BATCH_DTYPE, "Records must use TELEMETRY_BATCH_DTYPE"
+            self.__size = len(records)
+
+        self.__records = records
+
+    @classmethod
+    def from_list(cls, data: "list[telemetry.TelemetryData]") -> "TelemetryBatch":
+        """
+        Packs a list of samples.
+        """
+        buffer = b"".join(sample.values.tobytes() for sample in data)
+        return cls(records=np.frombuffer(buffer, dtype=TELEMETRY_BATCH_DTYPE).copy())
+
+    def to_list(self) -> "list[telemetry.TelemetryData]":
+        """
+        Unpacks into a list of samples.
+        """
+        return [telemetry.TelemetryData(*record) for record in self.records.tolist()]
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def records(self) -> np.ndarray:
+        """
+        View of the filled part of the structured array.
+        """
+        return self.__records[: self.__size]
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        Zero copy view of a single field, e.g. "x" or "yaw".
+        """
+        return self.records[name]
+
+    def __reserve(self, capacity: int) -> None:
+        """
+        Grows geometrically so that appends are amortized constant time.
+        Existing views keep pointing at the old buffer.
+        """
+        if capacity <= len(self.__records):
+            return
+
+        new_capacity = max(capacity, 2 * len(self.__records), MINIMUM_CAPACITY)
+        new_records = np.empty(new_capacity, dtype=TELEMETRY_BATCH_DTYPE)
+        new_records[: self.__size] = self.__records[: self.__size]
+        self.__records = new_records
+
+    def append(self, data: telemetry.TelemetryData) -> None:
+        """
+        Appends a single sample.
+        """
+        self.__reserve(self.__size + 1)
+        self.__records[self.__size] = tuple(data.values)
+        self.__size += 1
+
+    def extend(self, other: "TelemetryBatch") -> None:
+        """
+        Appends every record of another batch.
+        """
+        self.__reserve(self.__size + len(other))
+        self.__records[self.__size : self.__size + len(other)] = other.records
+        self.__size += len(other)
+
+    def slice_by_time(self, start_ms: float, end_ms: float) -> "TelemetryBatch":
+        """
+        Records with start_ms <= time_since_boot < end_ms, as a view.
+        """
+        times = self.field("time_since_boot")
+        start, end = np.searchsorted(times, [start_ms, end_ms], side="left")
+        return TelemetryBatch(records=self.records[start:end])
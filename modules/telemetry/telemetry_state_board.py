@@ -0,0 +1,125 @@
+"""
+Latest TelemetryData shared between processes.
+"""
+
+import math
+import multiprocessing
+import multiprocessing.synchronize
+
+from utilities.workers import shared_state_board
+from . import telemetry
+
+
+# The telemetry fields, then the local receive time so readers can measure sample age
+BOARD_FIELD_COUNT = len(telemetry.TELEMETRY_FIELDS) + 1
+
+
+class TelemetryStateBoard:
+    """
+    The newest TelemetryData in shared memory.
+    The telemetry worker writes, any worker reads without a queue round trip.
+
+    Each write also sets an event, so one reader can block in wait() until there is a new
+    sample instead of polling. The event carries no data, reads still need no IPC.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls) -> "tuple[bool, TelemetryStateBoard | None]":
+        """
+        Allocates the board, called by main before starting workers.
+        """
+        result, board = shared_state_board.SharedStateBoard.create(BOARD_FIELD_COUNT)
+        if not result:
+            return False, None
+
+        return True, TelemetryStateBoard(cls.__create_key, board, multiprocessing.Event())
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        board: shared_state_board.SharedStateBoard,
+        written: multiprocessing.synchronize.Event,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is TelemetryStateBoard.__create_key, "Use create() method"
+
+        self.__board = board
+        # Set after every write, cleared by the waiting reader
+        self.__written = written
+
+    @property
+    def generation(self) -> int:
+        """
+        Number of samples written so far.
+        """
+        return self.__board.generation
+
+    def write(self, data: telemetry.TelemetryData) -> None:
+        """
+        Publishes a sample, only called by the telemetry worker.
+        """
+        self.__board.write(
+            [*data.values, math.nan if data.receive_time is None else data.receive_time]
+        )
+        self.__written.set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Blocks until a write since the last wait(), at most timeout seconds.
+        Only one process may wait, the others would miss wakeups.
+
+        Returns whether there was a write.
+        """
+        written = self.__written.wait(timeout)
+        # Cleared before reading, so a write during the read wakes the next wait()
+        self.__written.clear()
+        return written
+
+    def read(self) -> "tuple[bool, int, telemetry.TelemetryData | None]":
+        """
+        Returns whether a consistent sample was read, the generation, and the newest sample.
+        All fields are None before the first write.
+        """
+        result, generation, values = self.__board.read()
+        if not result:
+            return False, generation, None
+
+        return True, generation, _to_telemetry_data(values.tolist())
+
+    def read_if_changed(
+        self, last_generation: int
+    ) -> "tuple[bool, int, telemetry.TelemetryData | None]":
+        """
+        Returns whether there is a newer sample than last_generation,
+        the current generation, and the sample.
+        """
+        result, generation, values = self.__board.read_if_changed(last_generation)
+        if not result:
+            return False, generation, None
+
+        return True, generation, _to_telemetry_data(values.tolist())
+
+    def close(self) -> None:
+        """
+        Detaches this process.
+        """
+        self.__board.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the board, only called by main after every worker has stopped.
+        """
+        self.__board.unlink()
+
+
+def _to_telemetry_data(values: "list[float]") -> telemetry.TelemetryData:
+    """
+    Sample from the board layout.
+    """
+    data = telemetry.TelemetryData(*values[:-1])
+    data.receive_time = None if math.isnan(values[-1]) else values[-1]
+    return data
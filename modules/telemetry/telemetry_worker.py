@@ -4,22 +4,31 @@ Telemtry worker that gathers GPS data.
 
 import os
 import pathlib
+import time
 
 from pymavlink import mavutil
 
+from utilities.streams import stream_operators
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import telemetry
+from . import telemetry_state_board
 from ..common.modules.logger import logger
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+METRICS_REPORT_PERIOD = 5  # seconds
+
+
 def telemetry_worker(
     connection: mavutil.mavfile,
     controller: worker_controller.WorkerController,
-    telemetry_queue: queue_proxy_wrapper.QueueProxyWrapper,  # Place your own arguments here
+    telemetry_queue: queue_proxy_wrapper.QueueProxyWrapper | None,  # Place your own arguments here
+    fusion_mode: telemetry.FusionMode = telemetry.FusionMode.LATEST,
+    state_board: telemetry_state_board.TelemetryStateBoard | None = None,
+    metrics_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
     # Add other necessary worker arguments here
 ) -> None:
     """
@@ -27,7 +36,10 @@ def telemetry_worker(
 
     connection - connection to drone
     controller - worker controller
-    telemetry_queue - worker output queue
+    telemetry_queue - worker output queue, None when every consumer reads state_board
+    fusion_mode - how attitude and position are combined
+    state_board - optional shared memory board that always holds the newest sample
+    metrics_queue - optional queue to main for periodic latency histograms
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -50,13 +62,36 @@ def telemetry_worker(
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
     # Instantiate class object (telemetry.Telemetry)
-    telemetry_object = telemetry.Telemetry.create(connection, local_logger)
-    while not controller.is_exit_requested():
-        result = telemetry_object.run()
-        if result:
-            telemetry_queue.queue.put(result)
+    telemetry_object = telemetry.Telemetry.create(connection, local_logger, fusion_mode=fusion_mode)
+    if telemetry_object is None:
+        local_logger.error("Failed to create telemetry", True)
+        return
+
+    def enqueue(telemetry_data: telemetry.TelemetryData) -> None:
+        telemetry_data.enqueue_time = time.time()
+        telemetry_queue.queue.put(telemetry_data)
+
+    stages = [] if state_board is None else [stream_operators.tap(state_board.write)]
+    if telemetry_queue is not None:
+        stages.append(stream_operators.tap(enqueue))
+
+    next_metrics_report = time.monotonic() + METRICS_REPORT_PERIOD
+    for _ in stream_operators.pipeline(
+        telemetry_object.stream(controller.is_exit_requested), *stages
+    ):
+        # Histograms are cumulative, main keeps the latest from each worker
+        if metrics_queue is not None and time.monotonic() >= next_metrics_report:
+            metrics_queue.queue.put(
+                (f"{worker_name}_{process_id}", telemetry_object.latency_metrics)
+            )
+            next_metrics_report += METRICS_REPORT_PERIOD
     # Main loop: do work.
 
+    if metrics_queue is not None:
+        metrics_queue.queue.put((f"{worker_name}_{process_id}", telemetry_object.latency_metrics))
+    if state_board is not None:
+        state_board.close()
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
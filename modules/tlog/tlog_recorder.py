@@ -0,0 +1,92 @@
+"""
+Records received MAVLink frames to a telemetry log (tlog).
+"""
+
+import struct
+import time
+
+from pymavlink import mavutil
+
+
+# Every frame is prefixed by its receive time in microseconds since the epoch, big endian
+# Same layout as pymavlink and ground station tlogs
+TLOG_TIMESTAMP = struct.Struct(">Q")
+# Bounds how much of the recording a crash can lose
+FLUSH_PERIOD = 1.0  # s
+
+
+class TlogRecorder:
+    """
+    Appends raw MAVLink frames with receive timestamps to a binary log.
+    Buffered writes are flushed at least every flush_period while frames arrive.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls, path: str, flush_period: float = FLUSH_PERIOD
+    ) -> "tuple[bool, TlogRecorder | None]":
+        """
+        Opens the log for appending.
+
+        path: Log file path, created if it does not exist.
+        flush_period: Longest time in seconds frames stay buffered, 0 to flush every frame.
+
+        Returns whether the log could be opened and the recorder.
+        """
+        if flush_period < 0.0:
+            return False, None
+
+        try:
+            # Closed by close()
+            # pylint: disable-next=consider-using-with
+            file = open(path, "ab")
+        except OSError:
+            return False, None
+
+        return True, TlogRecorder(cls.__create_key, file, flush_period)
+
+    def __init__(
+        self, class_private_create_key: object, file: "object", flush_period: float
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is TlogRecorder.__create_key, "Use create() method"
+
+        self.__file = file
+        self.__flush_period = flush_period
+        self.__next_flush = time.monotonic() + flush_period
+        self.frame_count = 0
+
+    def record(
+        self, msg: "mavutil.mavlink.MAVLink_message", receive_time: "float | None" = None
+    ) -> None:
+        """
+        Appends a frame exactly as it was received.
+
+        receive_time: Seconds since the epoch, now if not provided.
+        """
+        if receive_time is None:
+            receive_time = time.time()
+
+        self.__file.write(TLOG_TIMESTAMP.pack(int(receive_time * 1e6)) + msg.get_msgbuf())
+        self.frame_count += 1
+
+        now = time.monotonic()
+        if now >= self.__next_flush:
+            self.flush()
+            self.__next_flush = now + self.__flush_period
+
+    def flush(self) -> None:
+        """
+        Writes buffered frames to disk.
+        """
+        self.__file.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the log.
+        """
+        self.__file.close()
@@ -0,0 +1,236 @@
+"""
+Replays a telemetry log (tlog) as if it were a live connection.
+"""
+
+import mmap
+import time
+
+import numpy as np
+from pymavlink import mavutil
+
+from . import tlog_recorder
+
+
+# Frame length excluding payload: header and CRC
+MAVLINK1_OVERHEAD = 8
+MAVLINK2_OVERHEAD = 12
+MAVLINK2_SIGNATURE_LENGTH = 13
+
+
+def frame_length(buffer: "mmap.mmap", offset: int) -> int:
+    """
+    Length of the MAVLink frame starting at offset, or 0 if there is no valid start marker.
+    """
+    if offset + 2 > len(buffer):
+        return 0
+
+    marker = buffer[offset]
+    payload_length = buffer[offset + 1]
+    if marker == mavutil.mavlink.PROTOCOL_MARKER_V1:
+        return MAVLINK1_OVERHEAD + payload_length
+
+    if marker == mavutil.mavlink.PROTOCOL_MARKER_V2:
+        if offset + 3 > len(buffer):
+            return 0
+
+        signature_length = 0
+        if buffer[offset + 2] & mavutil.mavlink.MAVLINK_IFLAG_SIGNED:
+            signature_length = MAVLINK2_SIGNATURE_LENGTH
+
+        return MAVLINK2_OVERHEAD + payload_length + signature_length
+
+    return 0
+
+
+class TlogReplay:  # pylint: disable=too-many-instance-attributes
+    """
+    Memory maps a tlog and serves its frames through the subset of mavutil.mavfile
+    used by the workers, so it can be passed to Telemetry.create(), HeartbeatReceiver.create(), etc.
+
+    Sends are accepted and discarded.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, path: str, speed: "float | None" = 1.0) -> "tuple[bool, TlogReplay | None]":
+        """
+        Opens and indexes the log.
+
+        path: Log written by TlogRecorder or a ground station.
+        speed: Replay rate relative to the recording, None for as fast as possible.
+
+        Returns whether the log could be opened and the replay.
+        """
+        if speed is not None and speed <= 0.0:
+            return False, None
+
+        try:
+            with open(path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # ValueError is raised for empty files
+            return False, None
+
+        timestamps = []
+        offsets = []
+        lengths = []
+        offset = 0
+        header_size = tlog_recorder.TLOG_TIMESTAMP.size
+        while offset + header_size < len(buffer):
+            length = frame_length(buffer, offset + header_size)
+            # Stop at a truncated or corrupted tail, such as after a crash while recording
+            if length == 0 or offset + header_size + length > len(buffer):
+                break
+
+            (timestamp,) = tlog_recorder.TLOG_TIMESTAMP.unpack_from(buffer, offset)
+            timestamps.append(timestamp)
+            offsets.append(offset + header_size)
+            lengths.append(length)
+            offset += header_size + length
+
+        return True, TlogReplay(
+            cls.__create_key,
+            buffer,
+            np.array(timestamps, dtype=np.uint64),
+            np.array(offsets, dtype=np.int64),
+            np.array(lengths, dtype=np.int64),
+            speed,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        buffer: "mmap.mmap",
+        timestamps: np.ndarray,
+        offsets: np.ndarray,
+        lengths: np.ndarray,
+        speed: "float | None",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is TlogReplay.__create_key, "Use create() method"
+
+        self.__buffer = buffer
+        self.__timestamps = timestamps
+        self.__offsets = offsets
+        self.__lengths = lengths
+        self.__speed = speed
+
+        self.__index = 0
+        # Monotonic time that the frame at __log_anchor was delivered, reset by seek()
+        self.__wall_anchor: "float | None" = None
+        self.__log_anchor = 0
+
+        self.__parser = mavutil.mavlink.MAVLink(None)
+        self.__parser.robust_parsing = True
+        self.mav = mavutil.mavlink.MAVLink(self)
+        self.sent_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.__timestamps)
+
+    @property
+    def end_of_log(self) -> bool:
+        """
+        Whether every frame has been replayed.
+        """
+        return self.__index >= len(self.__timestamps)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Receive time of every frame in microseconds since the epoch.
+        """
+        return self.__timestamps
+
+    def seek(self, timestamp: int) -> None:
+        """
+        Continues from the first frame received at or after the timestamp (microseconds).
+        """
+        self.__index = int(np.searchsorted(self.__timestamps, timestamp, side="left"))
+        self.__wall_anchor = None
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Sink for self.mav, sends go nowhere.
+        """
+        self.sent_bytes += len(buffer)
+
+    def __time_until_due(self) -> float:
+        """
+        Seconds until the next frame should be delivered, 0 if it already is.
+        """
+        if self.__speed is None:
+            return 0.0
+
+        now = time.monotonic()
+        if self.__wall_anchor is None:
+            self.__wall_anchor = now
+            self.__log_anchor = int(self.__timestamps[self.__index])
+
+        elapsed_in_log = (int(self.__timestamps[self.__index]) - self.__log_anchor) / 1e6
+        return max(0.0, self.__wall_anchor + elapsed_in_log / self.__speed - now)
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Returns the next frame if it is due, otherwise None.
+        """
+        while not self.end_of_log:
+            if self.__time_until_due() > 0.0:
+                return None
+
+            offset = int(self.__offsets[self.__index])
+            length = int(self.__lengths[self.__index])
+            self.__index += 1
+
+            msg = self.__parser.parse_char(self.__buffer[offset : offset + length])
+            if msg is not None and msg.get_type() != "BAD_DATA":
+                return msg
+
+        return None
+
+    def recv_match(
+        self,
+        condition: None = None,
+        type: "str | list[str] | set[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Same semantics as mavutil.mavfile.recv_match() except that blocking
+        returns None immediately at the end of the log.
+
+        condition: Unsupported, must be None.
+        """
+        assert condition is None, "Conditions are not supported, filter by type"
+
+        if type is not None and not isinstance(type, (list, set)):
+            type = [type]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            msg = self.recv_msg()
+            if msg is not None:
+                if type is None or msg.get_type() in type:
+                    return msg
+                continue
+
+            if not blocking or self.end_of_log:
+                return None
+
+            wait = self.__time_until_due()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0.0:
+                    return None
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+    def close(self) -> None:
+        """
+        Unmaps the log.
+        """
+        self.__buffer.close()
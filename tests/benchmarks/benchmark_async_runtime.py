@@ -0,0 +1,255 @@
+"""
+Benchmark memory, wakeups, and CPU of the multiprocess worker layout against the
+single event loop runtime, for one vehicle. Linux only (reads /proc). To run:
+```
+python -m tests.benchmarks.benchmark_async_runtime
+```
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import time
+
+from pymavlink import mavutil
+
+from modules.async_runtime import async_runtime
+from modules.command import command
+from modules.command import command_worker
+from modules.common.modules.logger import logger
+from modules.heartbeat import heartbeat_receiver_worker
+from modules.heartbeat import heartbeat_sender_worker
+from modules.mavlink_demux import mavlink_demux_worker
+from modules.mavlink_demux import subscriber_connection
+from modules.telemetry import telemetry_worker
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+SEND_CONNECTION_STRING = "udpout:127.0.0.1:14670"
+RECEIVE_CONNECTION_STRING = "udpin:127.0.0.1:14670"
+TELEMETRY_RATE = 10  # Hz, for both attitude and position
+DURATION = 10  # seconds measured per case, after startup
+SUBSCRIPTION_QUEUE_MAX_SIZE = 100
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def mock_drone(stop: "mp.Event") -> None:
+    """
+    Sends heartbeats at 1 Hz and attitude and position at TELEMETRY_RATE until stopped.
+    """
+    connection = mavutil.mavlink_connection(
+        SEND_CONNECTION_STRING, source_system=1, source_component=0
+    )
+    start = time.monotonic()
+    next_heartbeat = start
+    next_telemetry = start
+    while not stop.is_set():
+        now = time.monotonic()
+        time_boot_ms = int((now - start) * 1000)
+        if now >= next_heartbeat:
+            connection.mav.heartbeat_send(
+                mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_GENERIC, 0, 0, 0
+            )
+            next_heartbeat += 1
+        if now >= next_telemetry:
+            connection.mav.attitude_send(time_boot_ms, 0.0, 0.0, 0.1, 0.0, 0.0, 0.0)
+            connection.mav.local_position_ned_send(time_boot_ms, 1.0, 2.0, -30.0, 0.1, 0.2, 0.0)
+            next_telemetry += 1 / TELEMETRY_RATE
+
+        time.sleep(max(0.0, min(next_heartbeat, next_telemetry) - time.monotonic()))
+
+    connection.close()
+
+
+def run_multiprocess(started: "mp.Event", stop: "mp.Event") -> None:
+    """
+    The bootcamp_main layout: demultiplexer plus one process per worker, connected by manager queues.
+    """
+    connection = mavutil.mavlink_connection(RECEIVE_CONNECTION_STRING)
+    connection.wait_heartbeat()
+
+    controller = worker_controller.WorkerController()
+    manager = mp.Manager()
+    heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(manager)
+    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(manager)
+    command_output_queue = queue_proxy_wrapper.QueueProxyWrapper(manager)
+    heartbeat_subscription_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        manager, SUBSCRIPTION_QUEUE_MAX_SIZE
+    )
+    telemetry_subscription_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        manager, SUBSCRIPTION_QUEUE_MAX_SIZE
+    )
+    subscriptions = {
+        "HEARTBEAT": [heartbeat_subscription_queue],
+        "ATTITUDE": [telemetry_subscription_queue],
+        "LOCAL_POSITION_NED": [telemetry_subscription_queue],
+    }
+
+    workers = [
+        mp.Process(
+            target=mavlink_demux_worker.mavlink_demux_worker,
+            args=(connection, subscriptions, controller),
+        ),
+        mp.Process(
+            target=heartbeat_sender_worker.heartbeat_sender_worker,
+            args=(connection, controller),
+        ),
+        mp.Process(
+            target=heartbeat_receiver_worker.heartbeat_receiver_worker,
+            args=(
+                subscriber_connection.SubscriberConnection(
+                    connection, heartbeat_subscription_queue
+                ),
+                controller,
+                heartbeat_queue,
+                1,
+            ),
+        ),
+        mp.Process(
+            target=telemetry_worker.telemetry_worker,
+            args=(
+                subscriber_connection.SubscriberConnection(
+                    connection, telemetry_subscription_queue
+                ),
+                controller,
+                telemetry_queue,
+            ),
+        ),
+        mp.Process(
+            target=command_worker.command_worker,
+            args=(
+                connection,
+                command.Position(10, 20, 30),
+                controller,
+                telemetry_queue,
+                command_output_queue,
+            ),
+        ),
+    ]
+    for worker in workers:
+        worker.start()
+    started.set()
+
+    # Main's work, as in bootcamp_main
+    while not stop.is_set():
+        try:
+            command_output_queue.queue.get(timeout=1)
+        except queue.Empty:
+            pass
+
+    controller.request_exit()
+    for worker in workers:
+        worker.join()
+    manager.shutdown()
+
+
+def run_event_loop(started: "mp.Event", stop: "mp.Event") -> None:
+    """
+    Every worker as a task on one event loop.
+    """
+    result, local_logger = logger.Logger.create("benchmark_async_runtime", True)
+    assert result
+
+    connection = mavutil.mavlink_connection(RECEIVE_CONNECTION_STRING)
+    connection.wait_heartbeat()
+    started.set()
+
+    asyncio.run(
+        async_runtime.run_vehicle(
+            connection, command.Position(10, 20, 30), DURATION + 2, local_logger
+        )
+    )
+    stop.wait()
+
+
+def descendants(pid: int) -> "list[int]":
+    """
+    The process and every process below it.
+    """
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children", encoding="utf-8") as file:
+            for child in file.read().split():
+                pids += descendants(int(child))
+
+    return pids
+
+
+def sample(pids: "list[int]") -> "tuple[int, int, float]":
+    """
+    Context switches (wakeups) over every thread, proportional set size in kB, and CPU seconds.
+    """
+    switches = 0
+    pss = 0
+    cpu = 0.0
+    for pid in pids:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/status", encoding="utf-8") as file:
+                for line in file:
+                    if line.startswith(("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")):
+                        switches += int(line.split()[1])
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("Pss:"):
+                    pss += int(line.split()[1])
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as file:
+            # utime and stime, after the command name which may contain spaces
+            fields = file.read().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+    return switches, pss, cpu
+
+
+def run_case(target: "(...) -> None") -> "tuple[int, int, float, int]":  # type: ignore
+    """
+    Returns process count, wakeups per second, PSS in kB, and CPU percent during the window.
+    """
+    drone_stop = mp.Event()
+    started = mp.Event()
+    stop = mp.Event()
+    drone = mp.Process(target=mock_drone, args=(drone_stop,))
+    drone.start()
+    layout = mp.Process(target=target, args=(started, stop))
+    layout.start()
+
+    started.wait()
+    # Let startup allocations and connections settle
+    time.sleep(1)
+    pids = descendants(layout.pid)
+    switches_start, _, cpu_start = sample(pids)
+    time.sleep(DURATION)
+    switches_end, pss, cpu_end = sample(pids)
+
+    stop.set()
+    layout.join()
+    drone_stop.set()
+    drone.join()
+
+    return (
+        len(pids),
+        int((switches_end - switches_start) / DURATION),
+        pss,
+        (cpu_end - cpu_start) / DURATION * 100,
+    )
+
+
+def main() -> int:
+    """
+    Run both layouts against the same mock drone.
+    """
+    print(f"{'layout':>12} {'processes':>10} {'wakeups/s':>10} {'PSS kB':>8} {'CPU %':>6}")
+    for name, target in [("multiprocess", run_multiprocess), ("event loop", run_event_loop)]:
+        processes, wakeups, pss, cpu = run_case(target)
+        print(f"{name:>12} {processes:>10} {wakeups:>10} {pss:>8} {cpu:>6.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
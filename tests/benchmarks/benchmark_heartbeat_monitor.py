@@ -0,0 +1,114 @@
+"""
+Benchmark liveness tracking of 1000 simulated peers. To run:
+```
+python -m tests.benchmarks.benchmark_heartbeat_monitor
+```
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.heartbeat import heartbeat_monitor
+from modules.heartbeat import link_state
+
+
+PEER_COUNT = 1000
+SIMULATED_TIME = 60  # s
+PERIOD = 1.0  # s
+DISCONNECT_THRESHOLD = 5
+# Every this many peers, one stops sending halfway through
+SILENT_EVERY = 20
+
+
+def encode_heartbeats() -> "list[mavutil.mavlink.MAVLink_heartbeat_message]":
+    """
+    One parsed HEARTBEAT per peer, from systems 1 to 250 and components 1 to 4.
+    """
+    parser = mavutil.mavlink.MAVLink(None)
+    messages = []
+    for index in range(PEER_COUNT):
+        encoder = mavutil.mavlink.MAVLink(
+            None, srcSystem=index % 250 + 1, srcComponent=index // 250 + 1
+        )
+        msg = encoder.heartbeat_encode(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA, 0, 0, 0
+        )
+        messages.append(parser.decode(bytearray(msg.pack(encoder))))
+    return messages
+
+
+def main() -> int:
+    """
+    Simulate the peers with staggered heartbeats, checking for loss every tick,
+    and compare against checking every peer every tick.
+    """
+    result, local_logger = logger.Logger.create("benchmark_heartbeat_monitor", False)
+    if not result:
+        return -1
+    result, monitor = heartbeat_monitor.HeartbeatMonitor.create(
+        local_logger, PERIOD, DISCONNECT_THRESHOLD
+    )
+    if not result:
+        return -1
+
+    messages = encode_heartbeats()
+    tick = PERIOD / heartbeat_monitor.TICKS_PER_PERIOD
+    ticks_per_period = heartbeat_monitor.TICKS_PER_PERIOD
+    # Each peer sends on one tick of the period
+    senders_by_tick = [messages[offset::ticks_per_period] for offset in range(ticks_per_period)]
+    silent = {id(msg) for msg in messages[::SILENT_EVERY]}
+
+    base = time.monotonic()
+    heartbeat_seconds = 0.0
+    update_seconds = 0.0
+    scan_seconds = 0.0
+    heartbeat_count = 0
+    lost_count = 0
+    tick_count = round(SIMULATED_TIME / tick)
+    for step in range(tick_count):
+        now = base + step * tick
+
+        start = time.perf_counter()
+        for msg in senders_by_tick[step % ticks_per_period]:
+            if step * tick >= SIMULATED_TIME / 2 and id(msg) in silent:
+                continue
+            monitor.heartbeat(msg, now)
+            heartbeat_count += 1
+        heartbeat_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        lost_count += len(monitor.update(now))
+        update_seconds += time.perf_counter() - start
+
+        # What the timer wheel replaces: a deadline comparison for every peer
+        start = time.perf_counter()
+        for peer in monitor.peers.values():
+            _ = peer.state_machine.deadline() <= now
+        scan_seconds += time.perf_counter() - start
+
+    expected_lost = len(silent)
+    if lost_count != expected_lost:
+        print(f"ERROR: lost {lost_count} peers, expected {expected_lost}")
+        return -1
+
+    connected = sum(
+        row["state"] == link_state.LinkState.CONNECTED.value
+        for row in monitor.liveness_table(base + SIMULATED_TIME)
+    )
+    print(f"{len(monitor.peers)} peers, {connected} connected, {lost_count} lost")
+    print(f"{heartbeat_count} heartbeats: {heartbeat_seconds / heartbeat_count * 1e6:.2f} us each")
+    print(f"{tick_count} ticks: timer wheel {update_seconds / tick_count * 1e6:.2f} us per tick")
+    print(
+        f"{tick_count} ticks: scanning all peers {scan_seconds / tick_count * 1e6:.2f} us per tick"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,90 @@
+"""
+Benchmark MAVLink frame parsing throughput with the Python and native parsers. To run:
+```
+python -m tests.benchmarks.benchmark_mavlink_parser
+```
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from utilities.mavlink import mavlink_parser
+
+
+MESSAGE_COUNT = 100_000
+# Bytes handed to the parser at once, about what a socket read returns under load
+CHUNK_SIZE = 4096
+
+
+def encode_mix(count: int) -> bytes:
+    """
+    Telemetry heavy mix: 10 ATTITUDE and 10 LOCAL_POSITION_NED per HEARTBEAT.
+    """
+    encoder = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+    frames = []
+    for i in range(count):
+        time_boot_ms = i * 5
+        if i % 21 == 20:
+            msg = encoder.heartbeat_encode(
+                mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                0,
+                0,
+                0,
+            )
+        elif i % 2 == 0:
+            msg = encoder.attitude_encode(time_boot_ms, 0.1, -0.2, 0.3, 0.01, 0.02, 0.03)
+        else:
+            msg = encoder.local_position_ned_encode(time_boot_ms, 1.0, 2.0, -3.0, 0.1, 0.2, 0.3)
+        frames.append(msg.pack(encoder))
+
+    return b"".join(frames)
+
+
+def messages_per_second(stream: bytes, use_native: bool) -> "tuple[float, int]":
+    """
+    Returns parse rate and the number of messages parsed.
+    """
+    parser = mavutil.mavlink.MAVLink(None, use_native=use_native)
+    parsed = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), CHUNK_SIZE):
+        messages = parser.parse_buffer(stream[offset : offset + CHUNK_SIZE])
+        if messages:
+            parsed += len(messages)
+    seconds = time.perf_counter() - start
+
+    return parsed / seconds, parsed
+
+
+def main() -> int:
+    """
+    Compare both parsers, the native one only if it was built.
+    """
+    stream = encode_mix(MESSAGE_COUNT)
+    print(f"{MESSAGE_COUNT} messages, {len(stream)} bytes")
+
+    cases = [("python", False)]
+    if mavlink_parser.native_parser_available():
+        cases.append(("native", True))
+    else:
+        print("Native parser not available in this pymavlink build, skipping")
+
+    for name, use_native in cases:
+        rate, parsed = messages_per_second(stream, use_native)
+        if parsed != MESSAGE_COUNT:
+            print(f"ERROR: {name} parsed {parsed} of {MESSAGE_COUNT} messages")
+            return -1
+
+        print(f"{name:>8}: {rate:>10.0f} messages/s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,125 @@
+"""
+Benchmark sends per second of pre-encoded templates against pymavlink. To run:
+```
+python -m tests.benchmarks.benchmark_mavlink_templates
+```
+Set MAVLINK20=1 to benchmark MAVLink 2 frames.
+"""
+
+import time
+from typing import Callable
+
+from pymavlink import mavutil
+
+from modules.command import command_tracker
+from modules.common.modules.logger import logger
+from tests.unit import conftest
+from utilities.mavlink import mavlink_templates
+
+
+SEND_COUNT = 100_000
+
+
+def sends_per_second(send: Callable[[int], None]) -> float:
+    """
+    Rate of send(i) for SEND_COUNT calls.
+    """
+    start = time.perf_counter()
+    for i in range(SEND_COUNT):
+        send(i)
+    return SEND_COUNT / (time.perf_counter() - start)
+
+
+def tracked_send(tracker: command_tracker.CommandTracker) -> Callable[[int], None]:
+    """
+    Sends a command through the tracker and acknowledges it, so the next is not held.
+    """
+    yaw = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+    ack = mavutil.mavlink.MAVLink_command_ack_message(yaw, mavutil.mavlink.MAV_RESULT_ACCEPTED)
+
+    def send(i: int) -> None:
+        tracker.send(yaw, (i, 5, 1, 1, 0, 0, 0))
+        tracker.handle_ack(ack)
+
+    return send
+
+
+def main() -> int:
+    """
+    Compare COMMAND_LONG, tracked COMMAND_LONG, and HEARTBEAT sends, after checking that
+    both paths agree.
+    """
+    print(f"MAVLink {mavutil.mavlink.WIRE_PROTOCOL_VERSION}, {SEND_COUNT} sends each")
+
+    result, local_logger = logger.Logger.create("benchmark_mavlink_templates", False)
+    if not result:
+        return -1
+
+    pymavlink_connection = conftest.FakeConnection()
+    template_connection = conftest.FakeConnection()
+    result, command_template = mavlink_templates.CommandLongTemplate.create(template_connection)
+    if not result:
+        return -1
+    result, heartbeat_template = mavlink_templates.HeartbeatTemplate.create(
+        template_connection, mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID
+    )
+    if not result:
+        return -1
+    # The command worker's default path, acknowledgements tracked
+    result, pymavlink_tracker = command_tracker.CommandTracker.create(
+        pymavlink_connection, local_logger
+    )
+    if not result:
+        return -1
+    result, template_tracker = command_tracker.CommandTracker.create(
+        template_connection, local_logger, template=command_template
+    )
+    if not result:
+        return -1
+
+    yaw = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+    cases = [
+        (
+            "COMMAND_LONG",
+            lambda i: pymavlink_connection.mav.command_long_send(1, 0, yaw, 0, i, 5, 1, 1, 0, 0, 0),
+            lambda i: command_template.send(yaw, (i, 5, 1, 1, 0, 0, 0)),
+        ),
+        (
+            "tracked",
+            tracked_send(pymavlink_tracker),
+            tracked_send(template_tracker),
+        ),
+        (
+            "HEARTBEAT",
+            lambda _: pymavlink_connection.mav.heartbeat_send(
+                mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+            ),
+            lambda _: heartbeat_template.send(),
+        ),
+    ]
+
+    for name, pymavlink_send, template_send in cases:
+        pymavlink_send(SEND_COUNT)
+        template_send(SEND_COUNT)
+        if pymavlink_connection.frames[-1] != template_connection.frames[-1]:
+            print(f"ERROR: {name} frames differ")
+            return -1
+
+        pymavlink_rate = sends_per_second(pymavlink_send)
+        template_rate = sends_per_second(template_send)
+        print(
+            f"{name:>13}: pymavlink {pymavlink_rate:>9.0f} sends/s, "
+            f"template {template_rate:>9.0f} sends/s ({template_rate / pymavlink_rate:.1f}x)"
+        )
+        pymavlink_connection.frames.clear()
+        template_connection.frames.clear()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
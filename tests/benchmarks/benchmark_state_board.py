@@ -0,0 +1,87 @@
+"""
+Benchmark reading the newest state from the shared memory board against a manager queue. To run:
+```
+python -m tests.benchmarks.benchmark_state_board
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_state_board
+
+
+FIELD_COUNT = 13  # Same as TelemetryData
+READ_COUNT = 20_000
+
+
+def read_board(board: shared_state_board.SharedStateBoard, result_queue: mp.Queue) -> None:
+    """
+    Reader in a separate process, like a worker.
+    """
+    start = time.perf_counter()
+    for _ in range(READ_COUNT):
+        board.read()
+    result_queue.put((time.perf_counter() - start) / READ_COUNT)
+    board.close()
+
+
+def read_queue(
+    telemetry_queue: queue_proxy_wrapper.QueueProxyWrapper, result_queue: mp.Queue
+) -> None:
+    """
+    Reader in a separate process, each sample is a proxy round trip plus unpickling.
+    """
+    start = time.perf_counter()
+    for _ in range(READ_COUNT):
+        telemetry_queue.queue.get()
+    result_queue.put((time.perf_counter() - start) / READ_COUNT)
+
+
+def main() -> int:
+    """
+    Compare per read latency.
+    """
+    sample = [float(i) for i in range(FIELD_COUNT)]
+    result_queue = mp.Queue()
+
+    result, board = shared_state_board.SharedStateBoard.create(FIELD_COUNT)
+    if not result:
+        print("ERROR: Failed to create board")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert board is not None
+
+    board.write(sample)
+    reader = mp.Process(target=read_board, args=(board, result_queue))
+    reader.start()
+    reader.join()
+    board_latency = result_queue.get()
+    board.close()
+    board.unlink()
+
+    mp_manager = mp.Manager()
+    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    # Prefill so that only the read side is measured
+    for _ in range(READ_COUNT):
+        telemetry_queue.queue.put(sample)
+    reader = mp.Process(target=read_queue, args=(telemetry_queue, result_queue))
+    reader.start()
+    reader.join()
+    queue_latency = result_queue.get()
+
+    print(f"state board read: {board_latency * 1e6:.2f} us")
+    print(f"manager queue get: {queue_latency * 1e6:.2f} us")
+    print(f"speedup: {queue_latency / board_latency:.0f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
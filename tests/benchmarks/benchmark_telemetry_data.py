@@ -0,0 +1,113 @@
+"""
+Benchmark TelemetryData memory and serialization against the previous dict backed class. To run:
+```
+python -m tests.benchmarks.benchmark_telemetry_data
+```
+"""
+
+import pickle
+import timeit
+import tracemalloc
+
+from modules.telemetry import telemetry
+
+
+INSTANCE_COUNT = 100_000
+ROUND_TRIPS = 100_000
+
+
+class LegacyTelemetryData:  # pylint: disable=too-many-instance-attributes
+    """
+    TelemetryData before it was packed, one attribute per field in the instance __dict__.
+    """
+
+    def __init__(
+        self,
+        time_since_boot: int | None = None,
+        x: float | None = None,
+        y: float | None = None,
+        z: float | None = None,
+        x_velocity: float | None = None,
+        y_velocity: float | None = None,
+        z_velocity: float | None = None,
+        roll: float | None = None,
+        pitch: float | None = None,
+        yaw: float | None = None,
+        roll_speed: float | None = None,
+        pitch_speed: float | None = None,
+        yaw_speed: float | None = None,
+    ) -> None:
+        self.time_since_boot = time_since_boot
+        self.x = x
+        self.y = y
+        self.z = z
+        self.x_velocity = x_velocity
+        self.y_velocity = y_velocity
+        self.z_velocity = z_velocity
+        self.roll = roll
+        self.pitch = pitch
+        self.yaw = yaw
+        self.roll_speed = roll_speed
+        self.pitch_speed = pitch_speed
+        self.yaw_speed = yaw_speed
+
+
+def sample_fields(i: int) -> "tuple":
+    """
+    Distinct values for every instance so that floats are not shared.
+    """
+    return (i,) + tuple(float(i) + 0.1 * field for field in range(1, 13))
+
+
+def bytes_per_instance(cls: type) -> float:
+    """
+    Average traced allocation per instance, including its float objects.
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    instances = [cls(*sample_fields(i)) for i in range(INSTANCE_COUNT)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Exclude the list holding the instances
+    return (end - start - len(instances) * 8) / INSTANCE_COUNT
+
+
+def pickle_round_trips_per_second(instance: object) -> "tuple[float, int]":
+    """
+    Returns pickle round trips per second and the pickled size, which is what a queue sends.
+    """
+    seconds = timeit.timeit(lambda: pickle.loads(pickle.dumps(instance)), number=ROUND_TRIPS)
+    return ROUND_TRIPS / seconds, len(pickle.dumps(instance))
+
+
+def main() -> int:
+    """
+    Compare both classes.
+    """
+    legacy = LegacyTelemetryData(*sample_fields(1))
+    packed = telemetry.TelemetryData(*sample_fields(1))
+
+    print(f"{'class':>20} {'bytes/instance':>15} {'pickle bytes':>13} {'pickle trips/s':>15}")
+    for name, cls, instance in [
+        ("legacy", LegacyTelemetryData, legacy),
+        ("TelemetryData", telemetry.TelemetryData, packed),
+    ]:
+        memory = bytes_per_instance(cls)
+        rate, size = pickle_round_trips_per_second(instance)
+        print(f"{name:>20} {memory:>15.1f} {size:>13} {rate:>15.0f}")
+
+    seconds = timeit.timeit(
+        lambda: telemetry.TelemetryData.from_bytes(packed.to_bytes()), number=ROUND_TRIPS
+    )
+    print(f"to_bytes/from_bytes round trips/s: {ROUND_TRIPS / seconds:.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
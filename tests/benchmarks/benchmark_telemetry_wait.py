@@ -0,0 +1,119 @@
+"""
+Benchmark CPU time per TelemetryData for each Telemetry wait mode. To run:
+```
+python -m tests.benchmarks.benchmark_telemetry_wait
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+
+
+SEND_CONNECTION_STRING = "udpout:127.0.0.1:14660"
+RECEIVE_CONNECTION_STRING = "udpin:127.0.0.1:14660"
+DURATION = 5  # seconds per case
+
+# (name, attitude rate, position rate) in Hz
+RATES = [
+    ("realistic", 3, 2),
+    ("1 kHz", 1000, 1000),
+]
+
+
+def send_telemetry(attitude_rate: float, position_rate: float, duration: float) -> None:
+    """
+    Mock drone sending ATTITUDE and LOCAL_POSITION_NED at fixed rates.
+    """
+    connection = mavutil.mavlink_connection(
+        SEND_CONNECTION_STRING, source_system=1, source_component=0
+    )
+    attitude_period = 1 / attitude_rate
+    position_period = 1 / position_rate
+
+    start = time.monotonic()
+    next_attitude = start
+    next_position = start
+    while True:
+        now = time.monotonic()
+        if now - start > duration:
+            break
+
+        time_boot_ms = int((now - start) * 1000)
+        if now >= next_attitude:
+            connection.mav.attitude_send(time_boot_ms, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            next_attitude += attitude_period
+        if now >= next_position:
+            connection.mav.local_position_ned_send(time_boot_ms, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            next_position += position_period
+
+        time.sleep(max(0.0, min(next_attitude, next_position) - time.monotonic()))
+
+
+def run_case(
+    wait_mode: telemetry.WaitMode,
+    attitude_rate: float,
+    position_rate: float,
+    local_logger: logger.Logger,
+) -> "tuple[int, float, float]":
+    """
+    Returns the number of TelemetryData produced, CPU seconds, and wall seconds.
+    """
+    connection = mavutil.mavlink_connection(RECEIVE_CONNECTION_STRING)
+    telemetry_object = telemetry.Telemetry.create(connection, local_logger, wait_mode)
+
+    sender = mp.Process(target=send_telemetry, args=(attitude_rate, position_rate, DURATION))
+    sender.start()
+
+    produced = 0
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    while time.monotonic() - wall_start < DURATION:
+        if telemetry_object.run() is not None:
+            produced += 1
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.monotonic() - wall_start
+
+    sender.join()
+    connection.close()
+
+    return produced, cpu_time, wall_time
+
+
+def main() -> int:
+    """
+    Run every wait mode against every rate.
+    """
+    result, local_logger = logger.Logger.create("benchmark_telemetry_wait", True)
+    if not result:
+        print("ERROR: Failed to create logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    print(f"{'rate':>10} {'mode':>9} {'samples':>8} {'CPU %':>6} {'CPU ms/sample':>14}")
+    for name, attitude_rate, position_rate in RATES:
+        for wait_mode in telemetry.WaitMode:
+            produced, cpu_time, wall_time = run_case(
+                wait_mode, attitude_rate, position_rate, local_logger
+            )
+            per_sample = cpu_time / produced * 1000 if produced > 0 else float("inf")
+            print(
+                f"{name:>10} {wait_mode.name:>9} {produced:>8} "
+                f"{cpu_time / wall_time * 100:>6.1f} {per_sample:>14.3f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -9,9 +9,11 @@ import time
 from pymavlink import mavutil
 
 from modules.common.modules.logger import logger
+from utilities.mavlink import mavlink_parser
 
 
 CONNECTION_STRING = "tcpin:localhost:12345"
+USE_NATIVE_PARSER = True
 HEARTBEAT_PERIOD = 1
 NUM_TRIALS = 10
 ERROR_TOLERANCE = 1e-2
@@ -24,7 +26,9 @@ def main() -> int:
     # Mocked autopilot/drone
     # source_system = 1 (airside on drone)
     # source_component = 0 (autopilot)
-    connection = mavutil.mavlink_connection(CONNECTION_STRING, source_system=1, source_component=0)
+    connection, _ = mavlink_parser.mavlink_connection(
+        CONNECTION_STRING, USE_NATIVE_PARSER, source_system=1, source_component=0
+    )
 
     # Instantiate logger after main starts
     drone_name = pathlib.Path(__file__).stem
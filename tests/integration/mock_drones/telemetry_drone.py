@@ -7,12 +7,12 @@ import math
 import pathlib
 import time
 
-from pymavlink import mavutil
-
 from modules.common.modules.logger import logger
+from utilities.mavlink import mavlink_parser
 
 
 CONNECTION_STRING = "tcpin:localhost:12345"
+USE_NATIVE_PARSER = True
 ATTITUDE_PERIOD = 1 / 3
 POSITION_PERIOD = 1 / 2
 TOTAL_PERIOD = 1
@@ -28,7 +28,9 @@ def main() -> int:
     # Mocked autopilot/drone
     # source_system = 1 (airside on drone)
     # source_component = 0 (autopilot)
-    connection = mavutil.mavlink_connection(CONNECTION_STRING, source_system=1, source_component=0)
+    connection, _ = mavlink_parser.mavlink_connection(
+        CONNECTION_STRING, USE_NATIVE_PARSER, source_system=1, source_component=0
+    )
     connection.wait_heartbeat()
 
     # Instantiate logger after main starts
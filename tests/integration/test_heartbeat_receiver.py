@@ -12,6 +12,7 @@ from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.heartbeat import heartbeat_receiver_worker
+from modules.heartbeat import link_state
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 
@@ -69,10 +70,11 @@ def read_queue(
     """
     while not controller.is_exit_requested():
         if not queue.queue.empty():
-            if queue.queue.get() == "Disconnected":
+            transition = queue.queue.get()
+            if transition.state == link_state.LinkState.DISCONNECTED:
                 main_logger.info("Disconnected")
             else:
-                main_logger.info("Connected")
+                main_logger.info(str(transition))
 
 
 # =================================================================================================
@@ -0,0 +1,110 @@
+"""
+Fixtures and stand-ins shared by the unit tests.
+"""
+
+import collections
+import multiprocessing.managers
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+
+
+class FakeConnection:  # pylint: disable=too-many-instance-attributes
+    """
+    Connection stand-in without a transport.
+
+    Every frame sent through self.mav is recorded. recv_match() returns queued messages,
+    and, with loopback, every frame sent. When nothing matches, a blocking call waits out
+    the timeout like a silent link.
+    """
+
+    def __init__(
+        self, loopback: bool = False, src_system: int = 255, src_component: int = 190
+    ) -> None:
+        # Where the sender addresses its commands, as on a connected mavfile
+        self.target_system = 1
+        self.target_component = 1
+        self.mav = mavutil.mavlink.MAVLink(self, srcSystem=src_system, srcComponent=src_component)
+        self.frames: "list[bytes]" = []
+        self.received: "collections.deque[mavutil.mavlink.MAVLink_message]" = collections.deque()
+        self.loopback = loopback
+        # Discards sends, e.g. to simulate a lost link
+        self.dropping = False
+        self.__parser = mavutil.mavlink.MAVLink(None)
+
+    @property
+    def sent(self) -> "list[mavutil.mavlink.MAVLink_message]":
+        """
+        Every recorded frame, decoded.
+        """
+        return [self.__parser.decode(bytearray(frame)) for frame in self.frames]
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Sink for self.mav.
+        """
+        if self.dropping:
+            return
+
+        frame = bytes(buffer)
+        self.frames.append(frame)
+        if self.loopback:
+            self.received.append(self.__parser.decode(bytearray(frame)))
+
+    def queue(
+        self, msg: "mavutil.mavlink.MAVLink_message", system: int = 1, component: int = 1
+    ) -> None:
+        """
+        Queues a message to be received, as parsed from a frame sent by system and component.
+        """
+        encoder = mavutil.mavlink.MAVLink(None, srcSystem=system, srcComponent=component)
+        self.received.append(self.__parser.decode(bytearray(msg.pack(encoder))))
+
+    def ack(self, command: int, result: int = mavutil.mavlink.MAV_RESULT_ACCEPTED) -> None:
+        """
+        Queues a COMMAND_ACK.
+        """
+        self.queue(mavutil.mavlink.MAVLink_command_ack_message(command, result))
+
+    def recv_match(
+        self,
+        type: "str | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Same signature as mavutil.mavfile.recv_match() for the arguments used.
+        Returns the oldest queued message of the type, leaving the others queued.
+        """
+        for msg in self.received:
+            if type is None or msg.get_type() == type:
+                self.received.remove(msg)
+                return msg
+
+        if blocking and timeout is not None:
+            time.sleep(timeout)
+        return None
+
+
+@pytest.fixture()
+def local_logger(request: pytest.FixtureRequest) -> logger.Logger:
+    """
+    Logger without file output, named after the test module.
+    """
+    result, test_logger = logger.Logger.create(request.module.__name__.rsplit(".", 1)[-1], False)
+    assert result
+    assert test_logger is not None
+    return test_logger
+
+
+@pytest.fixture(scope="module")
+def mp_manager() -> multiprocessing.managers.SyncManager:  # type: ignore
+    """
+    Shared manager per test module, starting one is slow.
+    """
+    manager = multiprocessing.Manager()
+    yield manager  # type: ignore
+    manager.shutdown()
@@ -0,0 +1,125 @@
+"""
+Test the event loop runtime over a local UDP link.
+"""
+
+import asyncio
+import socket
+
+import pytest
+from pymavlink import mavutil
+
+from modules.async_runtime import async_connection
+from modules.async_runtime import async_heartbeat_receiver
+from modules.async_runtime import async_telemetry
+from modules.common.modules.logger import logger
+from modules.heartbeat import link_state
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def link() -> "tuple[mavutil.mavfile, mavutil.mavfile]":  # type: ignore
+    """
+    Ground side listening on a free port and a drone side sending to it.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    ground = mavutil.mavlink_connection(f"udpin:127.0.0.1:{port}")
+    drone = mavutil.mavlink_connection(
+        f"udpout:127.0.0.1:{port}", source_system=1, source_component=0
+    )
+    yield ground, drone  # type: ignore
+    ground.close()
+    drone.close()
+
+
+def test_routing_and_telemetry(
+    link: "tuple[mavutil.mavfile, mavutil.mavfile]", local_logger: logger.Logger
+) -> None:
+    """
+    Heartbeats reach the receiver and attitude and position pairs reach telemetry.
+    """
+    ground, drone = link
+
+    async def scenario() -> "tuple[list, list, async_connection.AsyncConnection]":
+        result, reader = async_connection.AsyncConnection.create(ground, local_logger)
+        assert result
+        assert reader is not None
+        result, receiver = async_heartbeat_receiver.AsyncHeartbeatReceiver.create(
+            reader, local_logger
+        )
+        assert result
+        result, telemetry_object = async_telemetry.AsyncTelemetry.create(reader, local_logger)
+        assert result
+
+        heartbeat_queue = asyncio.Queue()
+        telemetry_queue = asyncio.Queue()
+        reader.start()
+        tasks = [
+            asyncio.create_task(receiver.run(heartbeat_queue)),
+            asyncio.create_task(telemetry_object.run(telemetry_queue)),
+        ]
+
+        drone.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_GENERIC, 0, 0, 0
+        )
+        for i in range(3):
+            drone.mav.attitude_send(100 * i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            drone.mav.local_position_ned_send(100 * i, float(i), 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        states = [await asyncio.wait_for(heartbeat_queue.get(), 1.0)]
+        samples = [await asyncio.wait_for(telemetry_queue.get(), 1.0) for _ in range(3)]
+
+        reader.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return states, samples, reader
+
+    # Run
+    states, samples, reader = asyncio.run(scenario())
+
+    # Test
+    assert [str(state) for state in states] == ["Connected"]
+    assert [sample.x for sample in samples] == [0.0, 1.0, 2.0]
+    assert reader.received_count == 7
+    assert reader.dropped_counts == {}
+
+
+def test_missed_heartbeats(
+    link: "tuple[mavutil.mavfile, mavutil.mavfile]", local_logger: logger.Logger
+) -> None:
+    """
+    Silence past the threshold reports disconnected.
+    """
+    ground, _ = link
+
+    async def scenario() -> link_state.LinkTransition:
+        result, reader = async_connection.AsyncConnection.create(ground, local_logger)
+        assert result
+        assert reader is not None
+        result, receiver = async_heartbeat_receiver.AsyncHeartbeatReceiver.create(
+            reader, local_logger, 0.01
+        )
+        assert result
+
+        heartbeat_queue = asyncio.Queue()
+        reader.start()
+        task = asyncio.create_task(receiver.run(heartbeat_queue))
+        state = await asyncio.wait_for(heartbeat_queue.get(), 1.0)
+
+        reader.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return state
+
+    # Run
+    state = asyncio.run(scenario())
+
+    # Test
+    assert state.state == link_state.LinkState.DISCONNECTED
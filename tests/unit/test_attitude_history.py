@@ -0,0 +1,186 @@
+"""
+Test attitude interpolation and extrapolation.
+"""
+
+import math
+
+import pytest
+from pymavlink import mavutil
+
+from modules.telemetry import attitude_history
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+def attitude(
+    time_boot_ms: int, roll: float, yaw: float, yaw_speed: float = 0.0
+) -> "mavutil.mavlink.MAVLink_attitude_message":
+    """
+    ATTITUDE message with zero pitch.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(
+        time_boot_ms, roll, 0.0, yaw, 0.0, 0.0, yaw_speed
+    )
+
+
+@pytest.fixture()
+def history() -> attitude_history.AttitudeHistory:  # type: ignore
+    """
+    Short history.
+    """
+    result, history_object = attitude_history.AttitudeHistory.create(
+        history_size=4, max_extrapolation=200
+    )
+    assert result
+    assert history_object is not None
+    yield history_object  # type: ignore
+
+
+class TestInterpolation:
+    """
+    Timestamps between two attitudes.
+    """
+
+    def test_linear(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        Attitude is interpolated to the timestamp.
+        """
+        # Setup
+        history.add(attitude(0, 0.0, 0.0))
+        history.add(attitude(100, 0.2, 1.0))
+
+        # Run
+        result, actual = history.at(25)
+
+        # Test
+        assert result
+        assert math.isclose(actual.roll, 0.05)
+        assert math.isclose(actual.yaw, 0.25)
+
+    def test_yaw_wraps(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        Yaw takes the short way across +-pi.
+        """
+        # Setup
+        history.add(attitude(0, 0.0, math.pi - 0.1))
+        history.add(attitude(100, 0.0, -math.pi + 0.1))
+
+        # Run
+        result, actual = history.at(25)
+
+        # Test
+        assert result
+        assert math.isclose(actual.yaw, math.pi - 0.05)
+
+    def test_older_than_history(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        Timestamps older than every stored attitude cannot be estimated.
+        """
+        # Setup
+        history.add(attitude(100, 0.0, 0.0))
+        history.add(attitude(200, 0.0, 0.0))
+
+        # Run
+        result, actual = history.at(50)
+
+        # Test
+        assert not result
+        assert actual is None
+
+
+class TestExtrapolation:
+    """
+    Timestamps newer than every attitude.
+    """
+
+    def test_uses_rates(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        Yaw is advanced by yaw speed instead of waiting for the next attitude.
+        """
+        # Setup
+        history.add(attitude(0, 0.0, 0.0, yaw_speed=1.0))
+
+        # Run
+        result, actual = history.at(100)
+
+        # Test
+        assert result
+        assert math.isclose(actual.yaw, 0.1)
+
+    def test_limit(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        Beyond the maximum extrapolation nothing is estimated.
+        """
+        # Setup
+        history.add(attitude(0, 0.0, 0.0, yaw_speed=1.0))
+
+        # Run
+        result, _ = history.at(201)
+
+        # Test
+        assert not result
+
+    def test_no_attitude(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        Nothing can be estimated before the first attitude.
+        """
+        # Run
+        result, _ = history.at(0)
+
+        # Test
+        assert not result
+
+
+class TestOrdering:
+    """
+    Attitudes arriving out of order or after a clock reset.
+    """
+
+    def test_late_discarded(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        A slightly older attitude is late and does not change the history.
+        """
+        # Setup
+        history.add(attitude(1000, 0.0, 0.0))
+        history.add(attitude(1100, 0.2, 0.0))
+
+        # Run
+        history.add(attitude(1050, 1.0, 0.0))
+        result, actual = history.at(1050)
+
+        # Test
+        assert result
+        assert math.isclose(actual.roll, 0.1)
+
+    def test_timestamp_reset(self, history: attitude_history.AttitudeHistory) -> None:
+        """
+        After a reboot the timestamps start again and the old history is dropped.
+        """
+        # Setup
+        history.add(attitude(60000, 0.5, 0.0))
+        history.add(attitude(60100, 0.5, 0.0))
+
+        # Run
+        history.add(attitude(100, 0.0, 0.0))
+        history.add(attitude(200, 0.2, 0.0))
+        result, actual = history.at(150)
+        result_old, _ = history.at(60050)
+
+        # Test
+        assert result
+        assert math.isclose(actual.roll, 0.1)
+        assert not result_old
+
+
+def test_wrap_angle() -> None:
+    """
+    Wrapped into [-pi, pi).
+    """
+    # Run
+    actual = attitude_history.wrap_angle(3 * math.pi / 2)
+
+    # Test
+    assert math.isclose(actual, -math.pi / 2)
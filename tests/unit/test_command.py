@@ -0,0 +1,32 @@
+"""
+Test Command's velocity statistics.
+"""
+
+from modules.command import command
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+from tests.unit import conftest
+
+
+def test_samples_without_timestamp_skipped(local_logger: logger.Logger) -> None:
+    """
+    Only samples with a vehicle timestamp enter the velocity window, so it stays on one clock.
+    """
+    # Setup
+    target = command.Position(10, 20, 30)
+    command_object = command.Command.create(conftest.FakeConnection(), target, local_logger)
+    assert command_object is not None
+    stamped = telemetry.TelemetryData(
+        time_since_boot=1000, x=10, y=20, z=30, yaw=0, x_velocity=0, y_velocity=0, z_velocity=4
+    )
+    unstamped = telemetry.TelemetryData(
+        x=10, y=20, z=30, yaw=0, x_velocity=0, y_velocity=0, z_velocity=8
+    )
+
+    # Run
+    command_object.run(target, stamped)
+    command_object.run(target, unstamped)
+
+    # Test
+    assert command_object.velocity_statistics["speed"].count == 1
+    assert command_object.velocity_statistics["speed"].max == 4.0
@@ -0,0 +1,123 @@
+"""
+Test that batch decisions match the scalar Command path.
+"""
+
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+from modules.command import command
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_batch
+from tests.unit import conftest
+
+
+PROPERTY_TRIALS = 50
+SAMPLES_PER_TRIAL = 1000
+
+
+def random_trajectory(
+    generator: np.random.Generator, count: int
+) -> "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]":
+    """
+    Positions around the target, with some exactly at its altitude and yaw wrapping edges.
+    """
+    x = generator.uniform(-50.0, 50.0, count)
+    y = generator.uniform(-50.0, 50.0, count)
+    z = generator.uniform(20.0, 40.0, count)
+    z[::3] = 30.0 + generator.uniform(-0.5, 0.5, len(z[::3]))
+    yaw = generator.uniform(-math.pi, math.pi, count)
+    yaw[::7] = math.pi
+    yaw[1::7] = -math.pi
+    return x, y, z, yaw
+
+
+def test_batch_matches_scalar() -> None:
+    """
+    Property: for random targets and trajectories, every decision and amount agrees.
+    """
+    generator = np.random.default_rng(0)
+    for _ in range(PROPERTY_TRIALS):
+        # Setup
+        target = command.Position(*generator.uniform(-50.0, 50.0, 2), 30.0)
+        x, y, z, yaw = random_trajectory(generator, SAMPLES_PER_TRIAL)
+
+        # Run
+        decisions, amounts = command.decide_batch(target, x, y, z, yaw)
+
+        # Test
+        for i in range(SAMPLES_PER_TRIAL):
+            decision, amount = command.decide(target, x[i], y[i], z[i], yaw[i])
+            assert decisions[i] == decision
+            assert amounts[i] == pytest.approx(amount, rel=1e-12, abs=1e-9)
+
+
+def test_run_uses_decision(local_logger: logger.Logger) -> None:
+    """
+    Command.run() reports what decide() returned, and only sends when there is a decision.
+    """
+    # Setup
+    connection = conftest.FakeConnection()
+    target = command.Position(10, 20, 30)
+    command_object = command.Command.create(connection, target, local_logger)
+    assert command_object is not None
+    samples = [
+        telemetry.TelemetryData(0, 0.0, 0.0, 25.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+        telemetry.TelemetryData(100, 0.0, 0.0, 30.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+        telemetry.TelemetryData(200, 0.0, 0.0, 30.0, 0.0, 0.0, 0.0, 0.0, 0.0, math.atan2(20, 10)),
+    ]
+
+    # Run
+    outputs = [command_object.run(target, sample) for sample in samples]
+
+    # Test
+    trajectory = telemetry_batch.TelemetryBatch.from_list(samples)
+    decisions, amounts = command.decide_batch(
+        target,
+        trajectory.field("x"),
+        trajectory.field("y"),
+        trajectory.field("z"),
+        trajectory.field("yaw"),
+    )
+    assert list(decisions) == [
+        command.Decision.CHANGE_ALTITUDE,
+        command.Decision.CHANGE_YAW,
+        command.Decision.NONE,
+    ]
+    assert [str(output) for output in outputs[:2]] == [
+        f"CHANGE_ALTITUDE: {amounts[0]}",
+        f"CHANGING_YAW: {amounts[1]}",
+    ]
+    assert outputs[2] is None
+    assert [output.sequence for output in outputs[:2]] == [0, 1]
+    assert len(connection.frames) == 2
+
+
+@pytest.mark.parametrize("time_since_boot", [123456, None])
+def test_command_result_round_trip(time_since_boot: "int | None") -> None:
+    """
+    CommandResult survives the wire format and pickling, which queues use.
+    """
+    original = command.CommandResult(command.Decision.CHANGE_YAW, -12.5, time_since_boot, 7)
+
+    result, unpacked = command.CommandResult.from_bytes(original.to_bytes())
+    assert result
+    assert unpacked == original
+    assert pickle.loads(pickle.dumps(original)) == original
+    assert str(original) == "CHANGING_YAW: -12.5"
+
+
+def test_command_result_rejects_invalid() -> None:
+    """
+    Truncated data and unknown kinds are rejected.
+    """
+    data = command.CommandResult(command.Decision.CHANGE_ALTITUDE, 1.0, 0).to_bytes()
+
+    assert command.CommandResult.from_bytes(data[:-1]) == (False, None)
+    assert command.CommandResult.from_bytes(bytes([command.Decision.NONE]) + data[1:]) == (
+        False,
+        None,
+    )
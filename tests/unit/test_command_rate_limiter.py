@@ -0,0 +1,214 @@
+"""
+Test per command type token buckets and coalescing.
+"""
+
+import math
+import time
+
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.command import command_rate_limiter
+from modules.command import command_tracker
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+from tests.unit import conftest
+
+
+YAW = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+CHANGE_ALT = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+
+
+def yaw_sample(time_since_boot: int, yaw_deg: float) -> telemetry.TelemetryData:
+    """
+    Level at 30 m at the origin, facing yaw_deg.
+    """
+    return telemetry.TelemetryData(
+        time_since_boot, 0.0, 0.0, 30.0, 0, 0, 0, yaw=math.radians(yaw_deg)
+    )
+
+
+def create(
+    local_logger: logger.Logger,
+    limits: "dict[str, tuple[float, int]]",
+    default_limit: "tuple[float, int] | None" = None,
+) -> command_rate_limiter.CommandRateLimiter:
+    """
+    Creation that must succeed.
+    """
+    result, limiter = command_rate_limiter.CommandRateLimiter.create(
+        limits, local_logger, default_limit
+    )
+    assert result
+    assert limiter is not None
+    return limiter
+
+
+def test_burst_then_wait(local_logger: logger.Logger) -> None:
+    """
+    The burst goes out immediately and the rest waits.
+    """
+    # Setup
+    limiter = create(local_logger, {"MAV_CMD_CONDITION_YAW": (1, 2)})
+
+    # Run
+    sent = [limiter.submit(YAW, i) for i in range(3)]
+
+    # Test
+    assert sent == [True, True, False]
+    assert limiter.waiting_count == 1
+    assert not limiter.release()
+
+
+def test_coalesce_newest(local_logger: logger.Logger) -> None:
+    """
+    Only the newest waiting command is released, once a token refills.
+    """
+    # Setup
+    limiter = create(local_logger, {"MAV_CMD_CONDITION_YAW": (20, 1)})
+    limiter.submit(YAW, "first")
+
+    # Run
+    limiter.submit(YAW, "second")
+    limiter.submit(YAW, "third")
+    time.sleep(0.1)
+    released = limiter.release()
+
+    # Test
+    assert released == ["third"]
+    assert limiter.coalesced_count == 1
+    assert limiter.deferred_count == 1
+    assert limiter.sent_count == 2
+
+
+def test_types_independent(local_logger: logger.Logger) -> None:
+    """
+    Each command type has its own bucket, and types without a limit are never held.
+    """
+    # Setup
+    limiter = create(local_logger, {"MAV_CMD_CONDITION_YAW": (1, 1)})
+    limiter.submit(YAW, "yaw")
+
+    # Run
+    sent = [limiter.submit(CHANGE_ALT, i) for i in range(5)]
+
+    # Test
+    assert all(sent)
+
+
+def test_default_limit(local_logger: logger.Logger) -> None:
+    """
+    Commands without their own limit share the default rate, each with its own bucket.
+    """
+    # Setup
+    limiter = create(local_logger, {}, (1, 1))
+
+    # Run
+    sent = [limiter.submit(CHANGE_ALT, 0), limiter.submit(CHANGE_ALT, 1), limiter.submit(YAW, 2)]
+
+    # Test
+    assert sent == [True, False, True]
+
+
+def test_unknown_command(local_logger: logger.Logger) -> None:
+    """
+    Names must be MAV_CMD values.
+    """
+    # Setup
+
+    # Run
+    result, limiter = command_rate_limiter.CommandRateLimiter.create(
+        {"MAV_TYPE_GCS": (1, 1)}, local_logger
+    )
+
+    # Test
+    assert not result
+    assert limiter is None
+
+
+def test_command_sends_released(local_logger: logger.Logger) -> None:
+    """
+    Command holds yaw decisions over the limit and update() sends the newest one later.
+    """
+
+    # Setup
+    connection = conftest.FakeConnection()
+    target = command.Position(10, 20, 30)
+    command_object = command.Command.create(
+        connection,
+        target,
+        local_logger,
+        limiter=create(local_logger, {"MAV_CMD_CONDITION_YAW": (20, 1)}),
+    )
+    assert command_object is not None
+
+    # Run
+    outputs = [
+        command_object.run(target, telemetry.TelemetryData(i, 0.0, 0.0, 30.0, 0, 0, 0, yaw=0.1 * i))
+        for i in range(3)
+    ]
+    time.sleep(0.1)
+    released = command_object.update()
+
+    # Test
+    assert outputs[0].kind == command.Decision.CHANGE_YAW
+    assert outputs[1:] == [None, None]
+    assert released == [
+        command.CommandResult(
+            command.Decision.CHANGE_YAW, command.decide(target, 0.0, 0.0, 30.0, 0.2)[1], 2, 1
+        )
+    ]
+    assert len(connection.frames) == 2
+
+
+def test_duplicate_takes_no_token(local_logger: logger.Logger) -> None:
+    """
+    A decision the tracker would suppress neither uses a token nor waits.
+    """
+    # Setup
+    connection = conftest.FakeConnection()
+    result, tracker = command_tracker.CommandTracker.create(connection, local_logger)
+    assert result
+    limiter = create(local_logger, {"MAV_CMD_CONDITION_YAW": (1, 1)})
+    target = command.Position(10, 10, 30)
+    command_object = command.Command.create(connection, target, local_logger, tracker, limiter)
+    assert command_object is not None
+
+    # Run, turning towards the 45 degree bearing of the target
+    outputs = [command_object.run(target, yaw_sample(i, 3 * i)) for i in range(5)]
+
+    # Test
+    assert outputs[0] is not None
+    assert outputs[1:] == [None] * 4
+    assert limiter.sent_count == 1
+    assert limiter.waiting_count == 0
+    assert limiter.deferred_count == 0
+    assert tracker.suppressed_count == 4
+    assert len(connection.frames) == 1
+
+
+def test_stale_waiting_dropped(local_logger: logger.Logger) -> None:
+    """
+    A waiting yaw is dropped once newer telemetry no longer calls for it.
+    """
+    # Setup
+    connection = conftest.FakeConnection()
+    limiter = create(local_logger, {"MAV_CMD_CONDITION_YAW": (20, 1)})
+    target = command.Position(10, 10, 30)
+    command_object = command.Command.create(connection, target, local_logger, limiter=limiter)
+    assert command_object is not None
+
+    # Run
+    first = command_object.run(target, yaw_sample(0, 0))
+    waiting = command_object.run(target, yaw_sample(1, 20))
+    aligned = command_object.run(target, yaw_sample(2, 44))
+    time.sleep(0.1)
+    released = command_object.update()
+
+    # Test
+    assert first is not None
+    assert waiting is None
+    assert aligned is None
+    assert released == []
+    assert limiter.discarded_count == 1
+    assert len(connection.frames) == 1
@@ -0,0 +1,231 @@
+"""
+Test COMMAND_ACK matching, retries, and duplicate suppression.
+"""
+
+import math
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.command import command_tracker
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+from tests.unit import conftest
+from utilities.metrics import latency_histogram
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+YAW = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+CHANGE_ALT = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+YAW_PARAMS = (30.0, 5, -1, 1, 0, 0, 0)
+
+
+@pytest.fixture()
+def connection() -> conftest.FakeConnection:
+    """
+    Fresh connection, the vehicle acknowledges only when told to.
+    """
+    return conftest.FakeConnection()
+
+
+def create(
+    connection: conftest.FakeConnection,
+    local_logger: logger.Logger,
+    ack_timeout: float = 1.0,
+    metrics: "latency_histogram.LatencyMetrics | None" = None,
+) -> command_tracker.CommandTracker:
+    """
+    Creation that must succeed.
+    """
+    result, tracker = command_tracker.CommandTracker.create(
+        connection, local_logger, ack_timeout, max_retries=2, latency_metrics=metrics
+    )
+    assert result
+    assert tracker is not None
+    return tracker
+
+
+def test_ack_completes(connection: conftest.FakeConnection, local_logger: logger.Logger) -> None:
+    """
+    The acknowledgement finishes the command, runs callbacks, and records the round trip.
+    """
+    # Setup
+    metrics = latency_histogram.LatencyMetrics()
+    tracker = create(connection, local_logger, metrics=metrics)
+    results = []
+    _, pending = tracker.send(YAW, YAW_PARAMS)
+    pending.add_done_callback(lambda done: results.append(done.result))
+
+    # Run
+    connection.ack(YAW)
+    tracker.update()
+
+    # Test
+    assert pending.done()
+    assert results == [mavutil.mavlink.MAV_RESULT_ACCEPTED]
+    assert not tracker.in_flight
+    assert metrics.histograms["command MAV_CMD_CONDITION_YAW"].count == 1
+
+
+def test_duplicate_suppressed(
+    connection: conftest.FakeConnection, local_logger: logger.Logger
+) -> None:
+    """
+    Only one send while an identical command is in flight, but other commands still go out.
+    """
+    # Setup
+    tracker = create(connection, local_logger)
+    tracker.send(YAW, YAW_PARAMS)
+
+    # Run
+    duplicate, _ = tracker.send(YAW, YAW_PARAMS)
+    other, _ = tracker.send(CHANGE_ALT, (1, 0, 0, 0, 0, 0, 30))
+
+    # Test
+    assert not duplicate
+    assert other
+    assert len(connection.sent) == 2
+    assert tracker.suppressed_count == 1
+
+
+def test_held_until_ack(connection: conftest.FakeConnection, local_logger: logger.Logger) -> None:
+    """
+    A different command waits for the one in flight, the newest replaces an older held one,
+    and it is sent once the first is acknowledged.
+    """
+    # Setup
+    tracker = create(connection, local_logger)
+    _, first = tracker.send(YAW, YAW_PARAMS)
+
+    # Run
+    sent_older, older = tracker.send(YAW, (20.0, 5, -1, 1, 0, 0, 0))
+    sent_newer, newer = tracker.send(YAW, (10.0, 5, -1, 1, 0, 0, 0))
+    sent_before_ack = len(connection.sent)
+    connection.ack(YAW)
+    released = tracker.update()
+
+    # Test
+    assert not sent_older
+    assert not sent_newer
+    assert older.done()
+    assert older.result is None
+    assert sent_before_ack == 1
+    assert first.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
+    assert released == [newer]
+    assert tracker.in_flight[YAW] is newer
+    assert [msg.param1 for msg in connection.sent] == [30.0, 10.0]
+    assert tracker.held_count == 2
+
+
+def test_held_sent_on_timeout(
+    connection: conftest.FakeConnection, local_logger: logger.Logger
+) -> None:
+    """
+    An unacknowledged command is replaced by the held one instead of being retried.
+    """
+    # Setup
+    tracker = create(connection, local_logger, ack_timeout=0.01)
+    _, first = tracker.send(YAW, YAW_PARAMS)
+    _, held = tracker.send(YAW, (10.0, 5, -1, 1, 0, 0, 0))
+
+    # Run
+    time.sleep(0.02)
+    released = tracker.update()
+
+    # Test
+    assert first.done()
+    assert first.result is None
+    assert released == [held]
+    assert [msg.confirmation for msg in connection.sent] == [0, 0]
+    assert tracker.retry_count == 0
+
+
+def test_turning_yaw_not_resent(
+    connection: conftest.FakeConnection, local_logger: logger.Logger
+) -> None:
+    """
+    While the drone turns, each sample's relative angle shrinks but the heading it turns to
+    is the same, so nothing is resent before the acknowledgement.
+    """
+    # Setup
+    tracker = create(connection, local_logger)
+    target = command.Position(10, 10, 30)
+    command_object = command.Command.create(connection, target, local_logger, tracker)
+    assert command_object is not None
+    # Target bearing is 45 degrees, turning from 0 towards it
+    samples = [
+        telemetry.TelemetryData(
+            time_since_boot=100 * i,
+            x=0,
+            y=0,
+            z=30,
+            yaw=math.radians(3 * i),
+            x_velocity=0,
+            y_velocity=0,
+            z_velocity=0,
+        )
+        for i in range(12)
+    ]
+
+    # Run
+    outputs = [command_object.run(target, sample) for sample in samples]
+    connection.ack(YAW)
+    released = command_object.update()
+
+    # Test
+    assert [output.delta for output in outputs if output is not None] == [pytest.approx(45.0)]
+    assert len(connection.sent) == 1
+    assert tracker.suppressed_count == 11
+    assert released == []
+    assert not tracker.in_flight
+
+
+def test_retry_then_timeout(
+    connection: conftest.FakeConnection, local_logger: logger.Logger
+) -> None:
+    """
+    Unacknowledged commands are resent with increasing confirmation, then given up.
+    """
+    # Setup
+    tracker = create(connection, local_logger, ack_timeout=0.01)
+    _, pending = tracker.send(YAW, YAW_PARAMS)
+
+    # Run
+    for _ in range(3):
+        time.sleep(0.02)
+        tracker.update()
+
+    # Test
+    assert [msg.confirmation for msg in connection.sent] == [0, 1, 2]
+    assert tracker.retry_count == 2
+    assert tracker.timed_out_count == 1
+    assert pending.done()
+    assert pending.result is None
+
+
+def test_in_progress_extends(
+    connection: conftest.FakeConnection, local_logger: logger.Logger
+) -> None:
+    """
+    MAV_RESULT_IN_PROGRESS keeps the command in flight without a retry.
+    """
+    # Setup
+    tracker = create(connection, local_logger, ack_timeout=0.05)
+    _, pending = tracker.send(YAW, YAW_PARAMS)
+    time.sleep(0.03)
+
+    # Run
+    connection.ack(YAW, mavutil.mavlink.MAV_RESULT_IN_PROGRESS)
+    tracker.update()
+    time.sleep(0.03)
+    tracker.update()
+
+    # Test
+    assert not pending.done()
+    assert len(connection.sent) == 1
@@ -0,0 +1,87 @@
+"""
+Test dead reckoning of aged telemetry.
+"""
+
+import math
+
+import pytest
+
+from modules.command import dead_reckoning
+from modules.telemetry import telemetry
+
+
+def sample_at(
+    time_since_boot: int, receive_time: float, x: float, yaw: float
+) -> telemetry.TelemetryData:
+    """
+    Sample moving along x at 2 m/s and yawing at 0.5 rad/s.
+    """
+    sample = telemetry.TelemetryData(time_since_boot, x, 0, 10, 2, 0, 0, 0, 0, yaw, 0, 0, 0.5)
+    sample.receive_time = receive_time
+    return sample
+
+
+def test_extrapolate() -> None:
+    """
+    Position and yaw advance by their rates, yaw wraps.
+    """
+    predicted = dead_reckoning.extrapolate(sample_at(1000, 0.0, 1.0, 3.0), 0.5)
+
+    assert predicted.time_since_boot == 1500
+    assert predicted.x == pytest.approx(2.0)
+    assert predicted.z == pytest.approx(10.0)
+    assert predicted.yaw == pytest.approx(3.25 - 2 * math.pi)
+
+
+def test_field_indices() -> None:
+    """
+    Indices follow the field names, not their current order.
+    """
+    fields = telemetry.TELEMETRY_FIELDS
+
+    assert [(fields[p], fields[v]) for p, v in dead_reckoning.POSITION_RATES] == [
+        ("x", "x_velocity"),
+        ("y", "y_velocity"),
+        ("z", "z_velocity"),
+    ]
+    assert fields[dead_reckoning.TIME_INDEX] == "time_since_boot"
+    assert fields[dead_reckoning.YAW_INDEX] == "yaw"
+    assert fields[dead_reckoning.YAW_SPEED_INDEX] == "yaw_speed"
+
+
+def test_create_invalid() -> None:
+    """
+    The horizon must be positive.
+    """
+    assert dead_reckoning.DeadReckoning.create(0.0) == (False, None)
+
+
+def test_predict_to_now() -> None:
+    """
+    The age includes the time before receive, measured with the clock offset.
+    """
+    result, predictor = dead_reckoning.DeadReckoning.create(1.0)
+    assert result
+    # The first sample sets the offset: received with no delay
+    predictor.predict(sample_at(1000, 100.0, 0.0, 0.0), 100.0)
+
+    # Vehicle time 1200 ms was local 100.2 s, so it is 0.3 s old at 100.5 s
+    predicted = predictor.predict(sample_at(1200, 100.4, 0.4, 0.1), 100.5)
+
+    assert predicted.x == pytest.approx(0.4 + 2 * 0.3)
+    assert predicted.yaw == pytest.approx(0.1 + 0.5 * 0.3)
+    assert predictor.statistics["position_error"].mean == pytest.approx(0.0)
+    assert predictor.statistics["hold_position_error"].mean == pytest.approx(0.4)
+
+
+def test_horizon_clamped() -> None:
+    """
+    Very old samples are only predicted up to the maximum horizon.
+    """
+    result, predictor = dead_reckoning.DeadReckoning.create(0.5)
+    assert result
+
+    predicted = predictor.predict(sample_at(1000, 100.0, 0.0, 0.0), 105.0)
+
+    assert predicted.x == pytest.approx(1.0)
+    assert predictor.clamped_count == 1
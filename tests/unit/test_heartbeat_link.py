@@ -0,0 +1,90 @@
+"""
+Test heartbeat sending and receiving from one loop.
+"""
+
+import time
+
+from modules.common.modules.logger import logger
+from modules.heartbeat import heartbeat_link
+from modules.heartbeat import heartbeat_receiver
+from modules.heartbeat import heartbeat_sender
+from modules.heartbeat import link_state
+from tests.unit import conftest
+
+
+PERIOD = 0.02  # s
+DISCONNECT_THRESHOLD = 3
+
+
+def test_sends_and_receives(local_logger: logger.Logger) -> None:
+    """
+    The sender keeps its period while the receiver waits, and its heartbeats keep the link up.
+    """
+    # Setup
+    connection = conftest.FakeConnection(loopback=True)
+    sender = heartbeat_sender.HeartbeatSender.create(connection)
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, PERIOD, DISCONNECT_THRESHOLD
+    )
+    result, link = heartbeat_link.HeartbeatLink.create(sender, receiver, PERIOD)
+    assert result
+
+    # Run
+    start = time.monotonic()
+    transitions = []
+    while time.monotonic() - start < PERIOD * 10:
+        transition = link.run(1.0)
+        if transition is not None:
+            transitions.append(transition)
+
+    # Test
+    assert [transition.state for transition in transitions] == [link_state.LinkState.CONNECTED]
+    assert 9 <= receiver.state_machine.heartbeat_count <= 11
+    assert link.scheduler.tasks[0].missed_count == 0
+
+
+def test_loss_and_recovery(local_logger: logger.Logger) -> None:
+    """
+    Dropped heartbeats lose the link, and it reconnects once they arrive again.
+    """
+    # Setup
+    connection = conftest.FakeConnection(loopback=True)
+    sender = heartbeat_sender.HeartbeatSender.create(connection)
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, PERIOD, DISCONNECT_THRESHOLD
+    )
+    result, link = heartbeat_link.HeartbeatLink.create(sender, receiver, PERIOD)
+    assert result
+
+    def run_until_transition() -> "link_state.LinkTransition | None":
+        start = time.monotonic()
+        while time.monotonic() - start < PERIOD * DISCONNECT_THRESHOLD * 5:
+            transition = link.run(1.0)
+            if transition is not None:
+                return transition
+        return None
+
+    # Run
+    connected = run_until_transition()
+    connection.dropping = True
+    lost = run_until_transition()
+    connection.dropping = False
+    recovered = run_until_transition()
+
+    # Test
+    assert connected.state == link_state.LinkState.CONNECTED
+    assert lost.state == link_state.LinkState.DISCONNECTED
+    assert recovered is not None
+    assert recovered.state == link_state.LinkState.CONNECTED
+    assert receiver.state_machine.disconnect_count == 1
+
+
+def test_create_invalid(local_logger: logger.Logger) -> None:
+    """
+    The period must be positive.
+    """
+    connection = conftest.FakeConnection(loopback=True)
+    sender = heartbeat_sender.HeartbeatSender.create(connection)
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(connection, local_logger)
+
+    assert heartbeat_link.HeartbeatLink.create(sender, receiver, 0.0) == (False, None)
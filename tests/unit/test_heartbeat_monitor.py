@@ -0,0 +1,82 @@
+"""
+Test per peer liveness tracking.
+"""
+
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.heartbeat import heartbeat_monitor
+from modules.heartbeat import link_state
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+def heartbeat_from(system: int, component: int) -> "mavutil.mavlink.MAVLink_heartbeat_message":
+    """
+    HEARTBEAT as parsed from the given source.
+    """
+    encoder = mavutil.mavlink.MAVLink(None, srcSystem=system, srcComponent=component)
+    msg = encoder.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA, 0, 0, 0
+    )
+    return mavutil.mavlink.MAVLink(None).decode(bytearray(msg.pack(encoder)))
+
+
+@pytest.fixture()
+def monitor(local_logger: logger.Logger) -> heartbeat_monitor.HeartbeatMonitor:
+    """
+    Monitor with a 1 s period and a threshold of 3 periods.
+    """
+    result, test_monitor = heartbeat_monitor.HeartbeatMonitor.create(local_logger, 1.0, 3)
+    assert result
+    return test_monitor
+
+
+def test_peers_tracked_independently(monitor: heartbeat_monitor.HeartbeatMonitor) -> None:
+    """
+    A silent peer is lost while the others stay connected, and counts its loss and uptime.
+    """
+    start = time.monotonic()
+    peers = [(1, 1), (2, 1), (1, 190)]
+    connected = [monitor.heartbeat(heartbeat_from(*peer), start) for peer in peers]
+    assert [peer_id for peer_id, _ in connected] == peers
+
+    lost = []
+    for second in range(1, 8):
+        now = start + second
+        for peer in peers[:2]:
+            assert monitor.heartbeat(heartbeat_from(*peer), now) is None
+        lost.extend(monitor.update(now + 0.01))
+
+    assert [(peer_id, transition.state) for peer_id, transition in lost] == [
+        ((1, 190), link_state.LinkState.DISCONNECTED)
+    ]
+    assert monitor.connected_count() == 2
+
+    table = {(row["system"], row["component"]): row for row in monitor.liveness_table(start + 7)}
+    assert table[(1, 190)]["losses"] == 1
+    assert table[(1, 190)]["uptime"] == pytest.approx(0.0)
+    assert table[(1, 1)]["uptime"] == pytest.approx(7.0)
+    assert table[(2, 1)]["heartbeats"] == 8
+    assert table[(2, 1)]["vehicle_type"] == mavutil.mavlink.MAV_TYPE_QUADROTOR
+
+
+def test_reconnect(monitor: heartbeat_monitor.HeartbeatMonitor) -> None:
+    """
+    A lost peer reconnects on its next heartbeat.
+    """
+    start = time.monotonic()
+    monitor.heartbeat(heartbeat_from(3, 1), start)
+
+    assert len(monitor.update(start + 3.2)) == 1
+    peer_id, transition = monitor.heartbeat(heartbeat_from(3, 1), start + 4)
+
+    assert peer_id == (3, 1)
+    assert transition.state == link_state.LinkState.CONNECTED
+    assert monitor.peers[(3, 1)].uptime(start + 5) == pytest.approx(1.0)
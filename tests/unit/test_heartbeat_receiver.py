@@ -0,0 +1,185 @@
+"""
+Test the deadline driven heartbeat receiver.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.heartbeat import heartbeat_monitor
+from modules.heartbeat import heartbeat_receiver
+from modules.heartbeat import link_state
+from tests.unit import conftest
+
+
+PERIOD = 0.02  # s
+DISCONNECT_THRESHOLD = 2
+
+
+def queue_heartbeats(connection: conftest.FakeConnection, count: int) -> conftest.FakeConnection:
+    """
+    Queues count vehicle heartbeats, after which the link is silent.
+    """
+    for _ in range(count):
+        connection.queue(
+            mavutil.mavlink.MAVLink_heartbeat_message(
+                mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+                0,
+                0,
+                0,
+                3,
+            )
+        )
+    return connection
+
+
+def test_create_invalid(local_logger: logger.Logger) -> None:
+    """
+    The period must be positive.
+    """
+    assert (
+        heartbeat_receiver.HeartbeatReceiver.create(conftest.FakeConnection(), local_logger, 0)
+        is None
+    )
+
+
+def test_only_transitions(local_logger: logger.Logger) -> None:
+    """
+    A steady link reports connected once, then the loss within the deadline.
+    """
+    # Setup
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        queue_heartbeats(conftest.FakeConnection(), 10), local_logger, PERIOD, DISCONNECT_THRESHOLD
+    )
+    assert receiver is not None
+
+    # Run
+    transitions = [receiver.run(1.0) for _ in range(10)]
+    silent_start = time.monotonic()
+    lost = None
+    while lost is None:
+        lost = receiver.run(1.0)
+    detection_time = time.monotonic() - silent_start
+
+    # Test
+    assert [str(transition) for transition in transitions if transition is not None] == [
+        "Connected"
+    ]
+    assert transitions[0].state == link_state.LinkState.CONNECTED
+    assert lost.state == link_state.LinkState.DISCONNECTED
+    assert lost.silence >= PERIOD * DISCONNECT_THRESHOLD
+    assert detection_time < PERIOD * DISCONNECT_THRESHOLD + 0.02
+    assert receiver.run(0.01) is None
+
+
+def test_receiver_reconnect(local_logger: logger.Logger) -> None:
+    """
+    After loss the receiver keeps waiting on the connection and reports the next heartbeat.
+    """
+    # Setup
+    connection = queue_heartbeats(conftest.FakeConnection(), 1)
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, PERIOD, DISCONNECT_THRESHOLD
+    )
+    assert receiver is not None
+    assert receiver.run(1.0).state == link_state.LinkState.CONNECTED
+    lost = None
+    while lost is None:
+        lost = receiver.run(1.0)
+
+    # Run
+    silent_start = time.monotonic()
+    silent = receiver.run(0.05)
+    silent_time = time.monotonic() - silent_start
+    queue_heartbeats(connection, 1)
+    reconnected = receiver.run(1.0)
+
+    # Test
+    assert lost.state == link_state.LinkState.DISCONNECTED
+    # Blocked on the connection instead of returning at once
+    assert silent is None
+    assert silent_time >= 0.05
+    assert reconnected.state == link_state.LinkState.CONNECTED
+    assert receiver.state_machine.disconnect_count == 1
+
+
+def test_peer_transitions(local_logger: logger.Logger) -> None:
+    """
+    With a monitor, each change of peer state is kept until taken.
+    """
+    # Setup
+    result, monitor = heartbeat_monitor.HeartbeatMonitor.create(
+        local_logger, PERIOD, DISCONNECT_THRESHOLD
+    )
+    assert result
+    receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        queue_heartbeats(conftest.FakeConnection(), 1),
+        local_logger,
+        PERIOD,
+        DISCONNECT_THRESHOLD,
+        monitor,
+    )
+    assert receiver is not None
+
+    # Run
+    receiver.run(1.0)
+    connected = receiver.take_peer_transitions()
+    lost = []
+    while len(lost) == 0:
+        receiver.run(1.0)
+        lost = receiver.take_peer_transitions()
+
+    # Test
+    assert [(peer_id, transition.state) for peer_id, transition in connected] == [
+        ((1, 1), link_state.LinkState.CONNECTED)
+    ]
+    assert [(peer_id, transition.state) for peer_id, transition in lost] == [
+        ((1, 1), link_state.LinkState.DISCONNECTED)
+    ]
+    assert len(receiver.take_peer_transitions()) == 0
+
+
+def test_reconnect() -> None:
+    """
+    A heartbeat after loss reports connected again.
+    """
+    result, state_machine = link_state.LinkStateMachine.create(1.0, 3)
+    assert result
+    start = state_machine.last_heartbeat
+
+    assert state_machine.check(start + 2.9) is None
+    assert state_machine.check(start + 3.0).state == link_state.LinkState.DISCONNECTED
+    assert state_machine.check(start + 4.0) is None
+    assert state_machine.heartbeat(start + 5.0).state == link_state.LinkState.CONNECTED
+    assert state_machine.heartbeat(start + 6.0) is None
+    assert state_machine.disconnect_count == 1
+
+
+def test_degraded() -> None:
+    """
+    Loss degrades a connected link, with hysteresis, and heartbeats do not undo it.
+    """
+    result, state_machine = link_state.LinkStateMachine.create(1.0, 3, 0.2, 0.1)
+    assert result
+    start = state_machine.last_heartbeat
+
+    assert state_machine.link_quality(0.5, start) is None
+    assert state_machine.heartbeat(start + 1.0).state == link_state.LinkState.CONNECTED
+    assert state_machine.link_quality(0.19, start + 1.0) is None
+    assert state_machine.link_quality(0.2, start + 1.0).state == link_state.LinkState.DEGRADED
+    assert state_machine.heartbeat(start + 2.0) is None
+    assert state_machine.link_quality(0.15, start + 2.0) is None
+    assert state_machine.link_quality(0.1, start + 2.0).state == link_state.LinkState.CONNECTED
+    assert state_machine.link_quality(0.3, start + 2.0).state == link_state.LinkState.DEGRADED
+    assert state_machine.check(start + 5.0).state == link_state.LinkState.DISCONNECTED
+    assert state_machine.link_quality(0.0, start + 5.0) is None
+
+
+def test_degraded_invalid() -> None:
+    """
+    The recovery threshold must be below the degradation threshold.
+    """
+    result, _ = link_state.LinkStateMachine.create(1.0, 3, 0.1, 0.2)
+    assert not result
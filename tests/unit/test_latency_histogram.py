@@ -0,0 +1,128 @@
+"""
+Test the latency histograms and the clock offset estimator.
+"""
+
+import pytest
+
+from utilities.metrics import clock_offset_estimator
+from utilities.metrics import latency_histogram
+
+
+class TestBuckets:
+    """
+    Bucket indices and bounds agree.
+    """
+
+    @pytest.mark.parametrize("value", [0, 1, 31, 32, 33, 63, 64, 1000, 123456, 10**9])
+    def test_value_within_bounds(self, value: int) -> None:
+        """
+        Every value falls inside the bounds of its bucket.
+        """
+        # Run
+        lower, upper = latency_histogram.bucket_bounds(latency_histogram.bucket_index(value))
+
+        # Test
+        assert lower <= value < upper
+
+    def test_relative_error(self) -> None:
+        """
+        Bucket width is at most about 6% of its lower bound.
+        """
+        # Setup
+        index = latency_histogram.bucket_index(50000)
+
+        # Run
+        lower, upper = latency_histogram.bucket_bounds(index)
+
+        # Test
+        assert (upper - lower) / lower <= 2 / latency_histogram.HALF_SUB_BUCKET_COUNT
+
+
+class TestLatencyHistogram:
+    """
+    Percentiles and merging.
+    """
+
+    def test_percentiles(self) -> None:
+        """
+        Percentiles are within bucket resolution of the exact value.
+        """
+        # Setup
+        histogram = latency_histogram.LatencyHistogram()
+
+        # Run
+        for milliseconds in range(1, 101):
+            histogram.record(milliseconds / 1000)
+
+        # Test
+        assert histogram.count == 100
+        assert histogram.percentile(50) == pytest.approx(0.050, rel=0.05)
+        assert histogram.percentile(99) == pytest.approx(0.099, rel=0.05)
+        assert histogram.max == 0.1
+
+    def test_empty(self) -> None:
+        """
+        Empty histograms report 0.
+        """
+        # Setup
+        histogram = latency_histogram.LatencyHistogram()
+
+        # Run
+        actual = histogram.percentile(99)
+
+        # Test
+        assert actual == 0.0
+
+    def test_merge(self) -> None:
+        """
+        Merged metrics contain the samples of both.
+        """
+        # Setup
+        first = latency_histogram.LatencyMetrics()
+        second = latency_histogram.LatencyMetrics()
+        first.record("link ATTITUDE", 0.001)
+        second.record("link ATTITUDE", 0.003)
+        second.record("queue dwell", 0.002)
+
+        # Run
+        first.merge(second)
+
+        # Test
+        assert first.histograms["link ATTITUDE"].count == 2
+        assert first.histograms["link ATTITUDE"].max == 0.003
+        assert first.histograms["queue dwell"].count == 1
+
+
+class TestClockOffsetEstimator:
+    """
+    Latency is relative to the fastest message.
+    """
+
+    def test_latency(self) -> None:
+        """
+        A message arriving 20ms slower than the fastest has 20ms latency.
+        """
+        # Setup
+        estimator = clock_offset_estimator.ClockOffsetEstimator()
+        estimator.latency(1000.010, 1000)
+
+        # Run
+        actual = estimator.latency(1001.030, 2000)
+
+        # Test
+        assert actual == pytest.approx(0.020)
+
+    def test_reboot(self) -> None:
+        """
+        The estimate restarts when the boot time goes backwards.
+        """
+        # Setup
+        estimator = clock_offset_estimator.ClockOffsetEstimator()
+        estimator.latency(1000.0, 500000)
+
+        # Run
+        actual = estimator.latency(1010.0, 100)
+
+        # Test
+        assert actual == 0.0
+        assert estimator.offset == pytest.approx(1009.9)
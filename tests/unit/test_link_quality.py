@@ -0,0 +1,191 @@
+"""
+Test link quality estimation from sequence numbers.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+from modules.link_quality import link_quality
+from modules.link_quality import link_quality_board
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+def heartbeat_with_sequence(
+    sequence: int, system: int = 1, component: int = 1
+) -> "mavutil.mavlink.MAVLink_heartbeat_message":
+    """
+    HEARTBEAT as parsed, sent with the given sequence number.
+    """
+    encoder = mavutil.mavlink.MAVLink(None, srcSystem=system, srcComponent=component)
+    encoder.seq = sequence
+    msg = encoder.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA, 0, 0, 0
+    )
+    return mavutil.mavlink.MAVLink(None).decode(bytearray(msg.pack(encoder)))
+
+
+@pytest.fixture()
+def quality() -> link_quality.LinkQuality:
+    """
+    10 s window in 10 buckets.
+    """
+    result, quality_object = link_quality.LinkQuality.create(10.0, 10)
+    assert result
+    return quality_object
+
+
+def feed(quality: link_quality.LinkQuality, sequences: "list[int]", now: float) -> None:
+    """
+    Adds a heartbeat for each sequence number, all at time now.
+    """
+    for sequence in sequences:
+        quality.add(heartbeat_with_sequence(sequence), now)
+
+
+def test_create_invalid() -> None:
+    """
+    Window and bucket count must be positive.
+    """
+    assert not link_quality.LinkQuality.create(0.0, 10)[0]
+    assert not link_quality.LinkQuality.create(10.0, 0)[0]
+
+
+def test_no_traffic(quality: link_quality.LinkQuality) -> None:
+    """
+    Nothing received reports no loss.
+    """
+    report = quality.report(1000.0)
+
+    assert report.received == 0
+    assert report.loss_rate == 0.0
+
+
+def test_loss(quality: link_quality.LinkQuality) -> None:
+    """
+    Gaps in the sequence count as lost, across the wrap from 255 to 0.
+    """
+    feed(quality, [250, 251, 254, 255, 0, 3], 1000.0)
+
+    report = quality.report(1000.5)
+
+    assert report.received == 6
+    assert report.lost == 4
+    assert report.loss_rate == pytest.approx(0.4)
+    assert report.reordered == 0
+    assert report.duplicates == 0
+
+
+def test_reorder(quality: link_quality.LinkQuality) -> None:
+    """
+    A late frame is reordered, not lost.
+    """
+    feed(quality, [10, 12, 11, 13], 1000.0)
+
+    report = quality.report(1000.5)
+
+    assert report.lost == 0
+    assert report.reordered == 1
+    assert report.duplicates == 0
+
+
+def test_duplicate(quality: link_quality.LinkQuality) -> None:
+    """
+    A repeated frame is a duplicate, not loss or reordering.
+    """
+    feed(quality, [10, 11, 11, 12, 10], 1000.0)
+
+    report = quality.report(1000.5)
+
+    assert report.lost == 0
+    assert report.reordered == 0
+    assert report.duplicates == 2
+
+
+def test_sources_independent(quality: link_quality.LinkQuality) -> None:
+    """
+    Each system and component has its own sequence.
+    """
+    for sequence in range(5):
+        quality.add(heartbeat_with_sequence(sequence, 1, 1), 1000.0)
+        quality.add(heartbeat_with_sequence(100 + sequence, 2, 1), 1000.0)
+
+    report = quality.report(1000.5)
+
+    assert len(quality.sources) == 2
+    assert report.lost == 0
+
+
+def test_window_slides(quality: link_quality.LinkQuality) -> None:
+    """
+    Loss older than the window is forgotten.
+    """
+    feed(quality, [0, 5], 1000.0)
+    assert quality.report(1005.0).lost == 4
+
+    feed(quality, [6, 7], 1011.0)
+    assert quality.report(1011.5).lost == 0
+
+
+def test_late_arrival_credited_to_loss(quality: link_quality.LinkQuality) -> None:
+    """
+    A late frame takes back the loss in the bucket that counted it, not in the current one.
+    """
+    feed(quality, [0, 2], 1000.0)
+    feed(quality, [3, 5], 1005.0)
+    feed(quality, [1], 1009.0)
+    assert quality.report(1009.5).lost == 1
+    assert quality.report(1009.5).reordered == 1
+
+    # Only the loss of 4 is left once the bucket that counted 1 has slid out
+    feed(quality, [6], 1010.0)
+    assert quality.report(1010.5).lost == 1
+
+    # The loss of 4 already left the window, its late frame takes nothing back
+    feed(quality, [4], 1016.0)
+    assert quality.report(1016.5).lost == 0
+
+
+def test_rates(quality: link_quality.LinkQuality) -> None:
+    """
+    Rates are per second over the elapsed time, and by message type.
+    """
+    for second in range(20):
+        feed(quality, [second * 2 % 256, (second * 2 + 1) % 256], 1000.0 + second)
+
+    report = quality.report(1019.5)
+    frame_size = len(heartbeat_with_sequence(0).get_msgbuf())
+
+    assert report.window == pytest.approx(10.0)
+    assert report.messages_per_second == pytest.approx(2.0)
+    assert report.bytes_per_second == pytest.approx(2.0 * frame_size)
+    assert quality.message_rates(1019.5) == {"HEARTBEAT": pytest.approx(2.0)}
+
+
+def test_board_round_trip(quality: link_quality.LinkQuality) -> None:
+    """
+    A report written to the board reads back equal, once per write.
+    """
+    result, board = link_quality_board.LinkQualityBoard.create()
+    assert result
+    assert board is not None
+
+    try:
+        assert board.read() == (False, None)
+        assert not board.read_if_changed(0)[0]
+
+        feed(quality, [0, 2, 3], 1000.0)
+        board.write(quality.report(1000.5))
+
+        result, report = board.read()
+        assert result
+        assert report.values() == quality.report(1000.5).values()
+        result, generation, _ = board.read_if_changed(0)
+        assert result
+        assert not board.read_if_changed(generation)[0]
+    finally:
+        board.close()
+        board.unlink()
@@ -0,0 +1,186 @@
+"""
+Test routing of received messages to the subscriber queues.
+"""
+
+import multiprocessing.managers
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.mavlink_demux import mavlink_demux
+from tests.unit import conftest
+from utilities.workers import queue_proxy_wrapper
+
+
+def attitude(time_boot_ms: int) -> mavutil.mavlink.MAVLink_attitude_message:
+    """
+    Level ATTITUDE at time_boot_ms.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(time_boot_ms, 0, 0, 0, 0, 0, 0)
+
+
+def create(
+    connection: conftest.FakeConnection,
+    subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+    local_logger: logger.Logger,
+) -> mavlink_demux.MavlinkDemux:
+    """
+    Creation that must succeed.
+    """
+    result, demux = mavlink_demux.MavlinkDemux.create(connection, subscriptions, local_logger)
+    assert result
+    assert demux is not None
+    return demux
+
+
+def test_create_without_subscriptions(local_logger: logger.Logger) -> None:
+    """
+    Nothing would consume the link.
+    """
+    assert mavlink_demux.MavlinkDemux.create(conftest.FakeConnection(), {}, local_logger) == (
+        False,
+        None,
+    )
+
+
+def test_routes_by_type(
+    mp_manager: multiprocessing.managers.SyncManager, local_logger: logger.Logger
+) -> None:
+    """
+    Each message goes only to the subscribers of its type, and unsubscribed types are dropped.
+    """
+    # Setup
+    attitude_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    position_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    connection = conftest.FakeConnection()
+    connection.queue(attitude(100))
+    connection.queue(mavutil.mavlink.MAVLink_local_position_ned_message(200, 1, 2, 3, 0, 0, 0))
+    connection.queue(mavutil.mavlink.MAVLink_system_time_message(0, 300))
+    demux = create(
+        connection,
+        {"ATTITUDE": [attitude_queue], "LOCAL_POSITION_NED": [position_queue]},
+        local_logger,
+    )
+
+    # Run
+    results = [demux.run(0.01) for _ in range(3)]
+
+    # Test
+    assert results == [(True, "ATTITUDE"), (True, "LOCAL_POSITION_NED"), (True, "SYSTEM_TIME")]
+    assert attitude_queue.queue.qsize() == 1
+    assert attitude_queue.queue.get_nowait().time_boot_ms == 100
+    assert position_queue.queue.qsize() == 1
+    assert position_queue.queue.get_nowait().time_boot_ms == 200
+    assert demux.received_count == 3
+    assert demux.routed_count == 2
+    assert len(demux.dropped_counts) == 0
+
+
+def test_all_messages_wildcard(
+    mp_manager: multiprocessing.managers.SyncManager, local_logger: logger.Logger
+) -> None:
+    """
+    A wildcard subscriber receives every message, alongside the subscribers of its type.
+    """
+    # Setup
+    attitude_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    all_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    connection = conftest.FakeConnection()
+    connection.queue(attitude(100))
+    connection.queue(mavutil.mavlink.MAVLink_system_time_message(0, 300))
+    demux = create(
+        connection,
+        {"ATTITUDE": [attitude_queue], mavlink_demux.ALL_MESSAGES: [all_queue]},
+        local_logger,
+    )
+
+    # Run
+    demux.run(0.01)
+    demux.run(0.01)
+
+    # Test
+    assert attitude_queue.queue.qsize() == 1
+    assert [all_queue.queue.get_nowait().get_type() for _ in range(2)] == [
+        "ATTITUDE",
+        "SYSTEM_TIME",
+    ]
+    assert demux.routed_count == 3
+
+
+def test_bad_data_skipped(
+    mp_manager: multiprocessing.managers.SyncManager, local_logger: logger.Logger
+) -> None:
+    """
+    Unparsable bytes are neither counted nor routed, even to a wildcard subscriber.
+    """
+    # Setup
+    all_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    connection = conftest.FakeConnection()
+    connection.received.append(mavutil.mavlink.MAVLink_bad_data(bytearray(b"\x01"), "Bad prefix"))
+    connection.queue(attitude(100))
+    demux = create(connection, {mavlink_demux.ALL_MESSAGES: [all_queue]}, local_logger)
+
+    # Run
+    bad = demux.run(0.01)
+    good = demux.run(0.01)
+
+    # Test
+    assert bad == (False, None)
+    assert good == (True, "ATTITUDE")
+    assert demux.received_count == 1
+    assert all_queue.queue.qsize() == 1
+    assert all_queue.queue.get_nowait().get_type() == "ATTITUDE"
+
+
+def test_silent_link(local_logger: logger.Logger) -> None:
+    """
+    Nothing received within the timeout.
+    """
+    # Setup
+    demux = create(conftest.FakeConnection(), {mavlink_demux.ALL_MESSAGES: []}, local_logger)
+
+    # Run
+    result = demux.run(0.01)
+
+    # Test
+    assert result == (False, None)
+    assert demux.received_count == 0
+
+
+def test_full_queue_dropped(
+    mp_manager: multiprocessing.managers.SyncManager, local_logger: logger.Logger
+) -> None:
+    """
+    A full subscriber queue drops the message without blocking, and the other subscribers
+    still receive it.
+    """
+    # Setup
+    full_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, 1)
+    full_queue.queue.put(attitude(0))
+    other_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    all_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    connection = conftest.FakeConnection()
+    connection.queue(attitude(100))
+    connection.queue(attitude(200))
+    demux = create(
+        connection,
+        {"ATTITUDE": [full_queue, other_queue], mavlink_demux.ALL_MESSAGES: [all_queue]},
+        local_logger,
+    )
+
+    # Run
+    start = time.monotonic()
+    results = [demux.run(0.01) for _ in range(2)]
+    elapsed = time.monotonic() - start
+
+    # Test
+    assert results == [(True, "ATTITUDE"), (True, "ATTITUDE")]
+    assert demux.dropped_counts == {"ATTITUDE": 2}
+    assert demux.routed_count == 4
+    assert [other_queue.queue.get_nowait().time_boot_ms for _ in range(2)] == [100, 200]
+    assert all_queue.queue.qsize() == 2
+    # Still only the message that filled it
+    assert full_queue.queue.get_nowait().time_boot_ms == 0
+    # A blocking put would wait until the full queue drains
+    assert elapsed < 1.0
@@ -0,0 +1,24 @@
+"""
+Test the parser selection fallback.
+"""
+
+import pathlib
+
+from utilities.mavlink import mavlink_parser
+
+
+def test_fallback_to_python(tmp_path: pathlib.Path) -> None:
+    """
+    Requesting the native parser never fails, and reports what is actually used.
+    """
+    # Setup
+    path = tmp_path / "empty.tlog"
+    path.write_bytes(b"")
+
+    # Run
+    connection, is_native = mavlink_parser.mavlink_connection(str(path), True)
+
+    # Test
+    assert is_native == mavlink_parser.native_parser_available()
+    assert mavlink_parser.parser_name(connection) == ("native" if is_native else "python")
+    connection.close()
@@ -0,0 +1,119 @@
+"""
+Test that pre-encoded frames are identical to pymavlink's.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from modules.command import command_tracker
+from modules.common.modules.logger import logger
+from tests.unit import conftest
+from utilities.mavlink import mavlink_templates
+
+
+def test_x25_crc() -> None:
+    """
+    Same CRC as pymavlink.
+    """
+    data = bytes(range(256)) * 2
+
+    assert mavlink_templates.x25_crc(data) == mavutil.mavlink.x25crc(data).crc
+
+
+def test_frames_match_pymavlink() -> None:
+    """
+    Mixed COMMAND_LONG and HEARTBEAT sends, across a sequence number wrap.
+    """
+    # Setup
+    expected = conftest.FakeConnection()
+    actual = conftest.FakeConnection()
+    result, command_template = mavlink_templates.CommandLongTemplate.create(actual)
+    assert result
+    result, heartbeat_template = mavlink_templates.HeartbeatTemplate.create(
+        actual, mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID
+    )
+    assert result
+
+    # Run
+    for i in range(300):
+        params = (i * 0.5, 0, 0, -1.25, 0, 0, i % 3)
+        command_template.send(mavutil.mavlink.MAV_CMD_CONDITION_YAW, params, i % 2)
+        expected.mav.command_long_send(1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, i % 2, *params)
+        heartbeat_template.send()
+        expected.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+        )
+
+    # Test
+    assert actual.frames == expected.frames
+    assert actual.mav.seq == expected.mav.seq
+    assert actual.mav.total_bytes_sent == expected.mav.total_bytes_sent
+
+
+def test_tracked_sends_match_pymavlink(local_logger: logger.Logger) -> None:
+    """
+    The tracker sends through the template, with the confirmation field counting retries,
+    and other targets through pymavlink.
+    """
+    # Setup
+    expected = conftest.FakeConnection()
+    actual = conftest.FakeConnection()
+    result, template = mavlink_templates.CommandLongTemplate.create(actual)
+    assert result
+    result, tracker = command_tracker.CommandTracker.create(
+        actual, local_logger, 0.001, max_retries=2, template=template
+    )
+    assert result
+    yaw = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+    params = (30.0, 5.0, 1.0, 1.0, 0.0, 0.0, 0.0)
+    # Targets of the sends that went through pymavlink
+    fallback_targets = []
+    pymavlink_send = actual.mav.command_long_send
+
+    def command_long_send(target_system: int, *args: object) -> None:
+        fallback_targets.append(target_system)
+        pymavlink_send(target_system, *args)
+
+    actual.mav.command_long_send = command_long_send
+
+    # Run
+    tracker.send(yaw, params)
+    for _ in range(2):
+        time.sleep(0.002)
+        tracker.check_timeouts()
+    tracker.send(mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT, params, target_system=2)
+    for confirmation in range(3):
+        expected.mav.command_long_send(1, 0, yaw, confirmation, *params)
+    expected.mav.command_long_send(2, 0, mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT, 0, *params)
+
+    # Test
+    assert actual.frames == expected.frames
+    assert fallback_targets == [2]
+    assert tracker.retry_count == 2
+
+
+def test_send_callback_falls_back() -> None:
+    """
+    A connection that reports sent messages still gets message objects.
+    """
+    connection = conftest.FakeConnection()
+    reported = []
+    connection.mav.set_send_callback(reported.append)
+    result, template = mavlink_templates.CommandLongTemplate.create(connection)
+    assert result
+
+    template.send(mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT, (1, 0, 0, 0, 0, 0, 30))
+
+    assert len(connection.frames) == 1
+    assert reported[0].get_type() == "COMMAND_LONG"
+
+
+def test_create_invalid_target() -> None:
+    """
+    Targets must fit in a byte.
+    """
+    assert mavlink_templates.CommandLongTemplate.create(conftest.FakeConnection(), 256) == (
+        False,
+        None,
+    )
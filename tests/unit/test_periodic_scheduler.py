@@ -0,0 +1,76 @@
+"""
+Test drift-free periodic scheduling.
+"""
+
+import time
+
+import pytest
+
+from utilities.workers import periodic_scheduler
+
+
+def test_create_invalid() -> None:
+    """
+    Negative spin time and non-positive periods are rejected.
+    """
+    assert periodic_scheduler.PeriodicScheduler.create(-1.0) == (False, None)
+
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create()
+    assert result
+    assert not scheduler.add("zero", 0.0, lambda: None)
+
+
+def test_sub_millisecond_no_drift() -> None:
+    """
+    A 0.5 ms task run for 0.2 s stays on its grid: every deadline is run or counted as missed.
+    """
+    # Setup
+    period = 0.0005
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(spin_time=0.001)
+    assert result
+    start = time.monotonic()
+    assert scheduler.add("stress", period, lambda: None, start)
+    task = scheduler.tasks[0]
+
+    # Run
+    while time.monotonic() - start < 0.2:
+        scheduler.run_next(0.01)
+
+    # Test
+    elapsed = time.monotonic() - start
+    deadlines = task.run_count + task.missed_count
+    assert deadlines == pytest.approx(elapsed / period, abs=2)
+    assert task.next_deadline == pytest.approx(start + deadlines * period)
+    # How many run depends on machine load, the rest are skipped rather than run late
+    assert task.run_count > 0
+
+
+def test_overrun_counts_missed() -> None:
+    """
+    A run that overruns two deadlines skips them instead of running them late.
+    """
+    # Setup
+    period = 0.05
+    calls = []
+
+    def slow_once() -> None:
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            time.sleep(2.5 * period)
+
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create()
+    assert result
+    start = time.monotonic()
+    assert scheduler.add("slow", period, slow_once, start)
+
+    # Run
+    for _ in range(3):
+        scheduler.run_next(1.0)
+
+    # Test
+    task = scheduler.tasks[0]
+    assert task.run_count == 3
+    assert task.missed_count == 2
+    # On the original grid, not a period after the overrun ended
+    assert 3 * period <= calls[1] - start < 3.5 * period
+    assert 4 * period <= calls[2] - start < 4.5 * period
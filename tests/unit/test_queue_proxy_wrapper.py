@@ -0,0 +1,31 @@
+"""
+Test the latest-value read of the queue wrapper.
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import queue_proxy_wrapper
+
+
+def test_get_latest_skips_stale(mp_manager: mp.managers.SyncManager) -> None:
+    """
+    Only the newest item is returned, the older ones are counted as skipped.
+    """
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    for i in range(5):
+        wrapper.queue.put(i)
+
+    assert wrapper.get_latest(0.1) == (True, 4, 4)
+    assert wrapper.queue.empty()
+
+
+def test_get_latest_timeout(mp_manager: mp.managers.SyncManager) -> None:
+    """
+    An empty queue blocks for the timeout and then returns nothing.
+    """
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+
+    start = time.monotonic()
+    assert wrapper.get_latest(0.05) == (False, None, 0)
+    assert time.monotonic() - start >= 0.05
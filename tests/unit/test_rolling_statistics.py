@@ -0,0 +1,111 @@
+"""
+Test windowed statistics against direct computation.
+"""
+
+import random
+import statistics
+
+import pytest
+
+from utilities.metrics import rolling_statistics
+
+
+def create(
+    window_size: int, window_time: "float | None" = None
+) -> rolling_statistics.RollingStatistics:
+    """
+    Creation that must succeed.
+    """
+    result, instance = rolling_statistics.RollingStatistics.create(window_size, window_time)
+    assert result
+    assert instance is not None
+    return instance
+
+
+class TestWindow:
+    """
+    Window contents follow the size and time limits.
+    """
+
+    def test_matches_reference(self) -> None:
+        """
+        Mean, variance, and max equal a direct computation over the last samples.
+        """
+        # Setup
+        generator = random.Random(0)
+        stats = create(16)
+        values = []
+
+        for i in range(500):
+            value = generator.uniform(-5.0, 5.0)
+            values.append(value)
+
+            # Run
+            stats.add(value, i * 0.1)
+
+            # Test
+            window = values[-16:]
+            assert stats.count == len(window)
+            assert stats.mean == pytest.approx(statistics.fmean(window), abs=1e-9)
+            if len(window) >= 2:
+                assert stats.variance == pytest.approx(statistics.variance(window), abs=1e-9)
+            assert stats.max == max(window)
+
+    def test_time_limit(self) -> None:
+        """
+        Samples older than the window time are dropped even if there is room.
+        """
+        # Setup
+        stats = create(100, 1.0)
+
+        # Run
+        for i in range(20):
+            stats.add(float(i), i * 0.25)
+
+        # Test
+        # Timestamps 3.75 to 4.75
+        assert stats.count == 5
+        assert stats.mean == pytest.approx(17.0)
+        assert stats.max == 19.0
+
+    def test_reboot(self) -> None:
+        """
+        A timestamp going backwards restarts the window.
+        """
+        # Setup
+        stats = create(10)
+        stats.add(100.0, 50.0)
+
+        # Run
+        stats.add(1.0, 0.0)
+
+        # Test
+        assert stats.count == 1
+        assert stats.max == 1.0
+        assert stats.ema == 1.0
+
+    def test_invalid(self) -> None:
+        """
+        Empty windows are rejected.
+        """
+        # Run
+        result, instance = rolling_statistics.RollingStatistics.create(0)
+
+        # Test
+        assert not result
+        assert instance is None
+
+
+def test_ema_time_constant() -> None:
+    """
+    After one time constant the average covers 63% of a step.
+    """
+    # Setup
+    stats = create(10)
+    stats.add(0.0, 0.0)
+
+    # Run
+    stats.add(1.0, 1.0)
+
+    # Test
+    assert stats.ema == pytest.approx(0.632, abs=1e-3)
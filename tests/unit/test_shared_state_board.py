@@ -0,0 +1,223 @@
+"""
+Test the shared memory seqlock board.
+"""
+
+import math
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import time
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_state_board
+from utilities.workers import shared_state_board
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+FIELD_COUNT = 13
+
+
+@pytest.fixture()
+def board() -> shared_state_board.SharedStateBoard:  # type: ignore
+    """
+    Board owned by the test.
+    """
+    result, board_object = shared_state_board.SharedStateBoard.create(FIELD_COUNT)
+    assert result
+    assert board_object is not None
+    yield board_object  # type: ignore
+    board_object.close()
+    board_object.unlink()
+
+
+def write_in_child(board: shared_state_board.SharedStateBoard, value: float) -> None:
+    """
+    Receives the board through pickling, like a worker.
+    """
+    board.write([value] * FIELD_COUNT)
+    board.close()
+
+
+class TestReadWrite:
+    """
+    Snapshots and generations.
+    """
+
+    def test_initially_empty(self, board: shared_state_board.SharedStateBoard) -> None:
+        """
+        Nothing written yet, every value is NaN.
+        """
+        # Run
+        result, generation, values = board.read()
+
+        # Test
+        assert result
+        assert generation == 0
+        assert all(math.isnan(value) for value in values)
+
+    def test_write_then_read(self, board: shared_state_board.SharedStateBoard) -> None:
+        """
+        Each write is one generation.
+        """
+        # Setup
+        expected = np.arange(FIELD_COUNT, dtype=np.float64)
+
+        # Run
+        board.write(expected)
+        board.write(expected)
+        result, generation, actual = board.read()
+
+        # Test
+        assert result
+        assert generation == 2
+        assert np.array_equal(actual, expected)
+
+    def test_read_if_changed(self, board: shared_state_board.SharedStateBoard) -> None:
+        """
+        No copy when nothing changed since the last read.
+        """
+        # Setup
+        board.write([1.0] * FIELD_COUNT)
+        _, last_generation, _ = board.read_if_changed(0)
+
+        # Run
+        changed, generation, values = board.read_if_changed(last_generation)
+
+        # Test
+        assert not changed
+        assert generation == last_generation
+        assert values is None
+
+    def test_other_process(self, board: shared_state_board.SharedStateBoard) -> None:
+        """
+        A write from another process is visible.
+        """
+        # Setup
+        writer = mp.Process(target=write_in_child, args=(board, 7.0))
+
+        # Run
+        writer.start()
+        writer.join()
+        result, generation, values = board.read()
+
+        # Test
+        assert result
+        assert generation == 1
+        assert values[0] == 7.0
+
+    def test_writer_died_mid_write(self, board: shared_state_board.SharedStateBoard) -> None:
+        """
+        A write that never finishes fails the read after the timeout instead of spinning forever.
+        """
+        # Setup
+        board.write([1.0] * FIELD_COUNT)
+        memory = multiprocessing.shared_memory.SharedMemory(name=board.name)
+        sequence = np.ndarray((1,), dtype=np.uint64, buffer=memory.buf)
+        sequence[0] += 1
+
+        # Run
+        start = time.monotonic()
+        result, generation, values = board.read(0.01)
+        elapsed = time.monotonic() - start
+        changed, _, _ = board.read_if_changed(0)
+
+        # Test
+        assert not result
+        assert generation == 1
+        assert values is None
+        assert 0.01 <= elapsed < 0.5
+        assert not changed
+
+        # Teardown
+        del sequence
+        memory.close()
+
+
+def test_invalid_field_count() -> None:
+    """
+    At least one field.
+    """
+    # Run
+    result, board_object = shared_state_board.SharedStateBoard.create(0)
+
+    # Test
+    assert not result
+    assert board_object is None
+
+
+def test_telemetry_board_round_trip() -> None:
+    """
+    A sample reads back with its fields and receive time, once per write.
+    """
+    # Setup
+    result, telemetry_board = telemetry_state_board.TelemetryStateBoard.create()
+    assert result
+    assert telemetry_board is not None
+    sample = telemetry.TelemetryData(time_since_boot=1000, x=1.0, yaw=0.5)
+    sample.receive_time = 1700000000.25
+
+    try:
+        # Run
+        telemetry_board.write(sample)
+        result, generation, actual = telemetry_board.read()
+        changed, _, _ = telemetry_board.read_if_changed(generation)
+
+        # Test
+        assert result
+        assert generation == 1
+        assert actual.time_since_boot == 1000
+        assert actual.x == 1.0
+        assert actual.y is None
+        assert actual.receive_time == sample.receive_time
+        assert not changed
+    finally:
+        telemetry_board.close()
+        telemetry_board.unlink()
+
+
+def write_sample_in_child(telemetry_board: telemetry_state_board.TelemetryStateBoard) -> None:
+    """
+    Writes one sample from another process after a short delay.
+    """
+    time.sleep(0.05)
+    telemetry_board.write(telemetry.TelemetryData(time_since_boot=2000))
+    telemetry_board.close()
+
+
+def test_telemetry_board_wait() -> None:
+    """
+    wait() blocks until a write from another process, and times out without one.
+    """
+    # Setup
+    result, telemetry_board = telemetry_state_board.TelemetryStateBoard.create()
+    assert result
+    assert telemetry_board is not None
+    writer = mp.Process(target=write_sample_in_child, args=(telemetry_board,))
+
+    try:
+        # Run
+        start = time.monotonic()
+        idle = telemetry_board.wait(0.02)
+        idle_time = time.monotonic() - start
+        writer.start()
+        written = telemetry_board.wait(5.0)
+        writer.join()
+        changed, generation, actual = telemetry_board.read_if_changed(0)
+
+        # Test
+        assert not idle
+        assert idle_time >= 0.02
+        assert written
+        assert changed
+        assert generation == 1
+        assert actual.time_since_boot == 2000
+        assert not telemetry_board.wait(0.0)
+    finally:
+        telemetry_board.close()
+        telemetry_board.unlink()
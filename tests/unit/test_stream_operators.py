@@ -0,0 +1,131 @@
+"""
+Test the streaming operators and Telemetry.stream().
+"""
+
+import pathlib
+from typing import Iterator
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+from modules.tlog import tlog_recorder
+from modules.tlog import tlog_replay
+from utilities.streams import stream_operators
+
+
+class TestOperators:
+    """
+    Each operator on its own, and chained.
+    """
+
+    def test_keep_and_transform(self) -> None:
+        """
+        Filter then map.
+        """
+        # Run
+        actual = list(
+            stream_operators.pipeline(
+                range(10),
+                stream_operators.keep(lambda value: value % 2 == 0),
+                stream_operators.transform(lambda value: value * 10),
+            )
+        )
+
+        # Test
+        assert actual == [0, 20, 40, 60, 80]
+
+    def test_decimate(self) -> None:
+        """
+        First of every factor samples.
+        """
+        # Run
+        actual = list(stream_operators.pipeline(range(10), stream_operators.decimate(3)))
+
+        # Test
+        assert actual == [0, 3, 6, 9]
+
+    def test_window(self) -> None:
+        """
+        Full windows only, every step samples.
+        """
+        # Run
+        actual = list(stream_operators.pipeline(range(6), stream_operators.window(3, 2)))
+
+        # Test
+        assert actual == [(0, 1, 2), (2, 3, 4)]
+
+    def test_tap(self) -> None:
+        """
+        The sink sees every sample and the stream is unchanged.
+        """
+        # Setup
+        seen = []
+
+        # Run
+        actual = list(stream_operators.pipeline(range(3), stream_operators.tap(seen.append)))
+
+        # Test
+        assert actual == [0, 1, 2]
+        assert seen == [0, 1, 2]
+
+    def test_lazy(self) -> None:
+        """
+        Nothing is pulled from the source until the pipeline is consumed.
+        """
+        # Setup
+        pulled = []
+
+        def source() -> Iterator[int]:
+            for value in range(100):
+                pulled.append(value)
+                yield value
+
+        # Run
+        stream = stream_operators.pipeline(source(), stream_operators.decimate(2))
+        first = next(stream)
+
+        # Test
+        assert first == 0
+        assert pulled == [0]
+
+
+def test_telemetry_stream(tmp_path: pathlib.Path, local_logger: logger.Logger) -> None:
+    """
+    A replayed log streams one sample per attitude and position pair.
+    """
+    # Setup
+    path = str(tmp_path / "flight.tlog")
+    encoder = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+    result, recorder = tlog_recorder.TlogRecorder.create(path)
+    assert result
+    assert recorder is not None
+    for i in range(10):
+        msg = mavutil.mavlink.MAVLink_attitude_message(100 * i, 0.0, 0.0, 0.1 * i, 0.0, 0.0, 0.0)
+        msg.pack(encoder)
+        recorder.record(msg, 1.0 + i)
+        msg = mavutil.mavlink.MAVLink_local_position_ned_message(
+            100 * i + 50, float(i), 0.0, 0.0, 0.0, 0.0, 0.0
+        )
+        msg.pack(encoder)
+        recorder.record(msg, 1.5 + i)
+    recorder.close()
+
+    result, replay = tlog_replay.TlogReplay.create(path, None)
+    assert result
+    assert replay is not None
+    telemetry_object = telemetry.Telemetry.create(replay, local_logger)
+    assert telemetry_object is not None
+
+    # Run
+    actual = list(
+        stream_operators.pipeline(
+            telemetry_object.stream(lambda: replay.end_of_log),
+            stream_operators.transform(lambda telemetry_data: telemetry_data.x),
+            stream_operators.decimate(2),
+        )
+    )
+
+    # Test
+    assert actual == [0.0, 2.0, 4.0, 6.0, 8.0]
+    replay.close()
@@ -0,0 +1,144 @@
+"""
+Test stream rate requests and rate verification.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.stream_rate import stream_rate_negotiator
+from tests.unit import conftest
+
+
+SET_MESSAGE_INTERVAL = mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL
+
+
+def test_set_message_interval_accepted(local_logger: logger.Logger) -> None:
+    """
+    An accepted SET_MESSAGE_INTERVAL needs no fallback, and no default stream is stopped.
+    """
+    # Setup
+    connection = conftest.FakeConnection()
+    connection.ack(SET_MESSAGE_INTERVAL)
+    result, negotiator = stream_rate_negotiator.StreamRateNegotiator.create(
+        connection, {"ATTITUDE": 10}, local_logger
+    )
+    assert result
+
+    # Run
+    methods = negotiator.negotiate()
+
+    # Test
+    assert methods == {"ATTITUDE": "SET_MESSAGE_INTERVAL"}
+    assert len(connection.sent) == 1
+    request = connection.sent[0]
+    assert request.command == mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL
+    assert request.param1 == mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE
+    assert request.param2 == pytest.approx(100000)
+
+
+def test_request_data_stream_fallback(local_logger: logger.Logger) -> None:
+    """
+    A rejected or unanswered request falls back to the message's legacy stream group.
+    """
+    # Setup
+    connection = conftest.FakeConnection()
+    connection.ack(SET_MESSAGE_INTERVAL, mavutil.mavlink.MAV_RESULT_UNSUPPORTED)
+    result, negotiator = stream_rate_negotiator.StreamRateNegotiator.create(
+        connection,
+        {"ATTITUDE": 10, "LOCAL_POSITION_NED": 4, "SCALED_IMU": 5},
+        local_logger,
+        0.01,
+    )
+    assert result
+
+    # Run
+    methods = negotiator.negotiate()
+
+    # Test
+    assert methods == {
+        "ATTITUDE": "REQUEST_DATA_STREAM",
+        "LOCAL_POSITION_NED": "REQUEST_DATA_STREAM",
+        "SCALED_IMU": "UNSUPPORTED",
+    }
+    streams = [
+        (msg.req_stream_id, msg.req_message_rate, msg.start_stop)
+        for msg in connection.sent
+        if msg.get_type() == "REQUEST_DATA_STREAM"
+    ]
+    assert streams == [
+        (mavutil.mavlink.MAV_DATA_STREAM_EXTRA1, 10, 1),
+        (mavutil.mavlink.MAV_DATA_STREAM_POSITION, 4, 1),
+    ]
+
+
+def test_stop_other_streams(local_logger: logger.Logger) -> None:
+    """
+    Every default stream that was not requested is stopped, waiting for all the ACKs at once,
+    before the requested ones are set.
+    """
+    # Setup
+    stopped_count = len(stream_rate_negotiator.DEFAULT_STREAMED_MESSAGES) - 1
+    connection = conftest.FakeConnection()
+    for _ in range(stopped_count + 1):
+        connection.ack(SET_MESSAGE_INTERVAL)
+    result, negotiator = stream_rate_negotiator.StreamRateNegotiator.create(
+        connection, {"ATTITUDE": 10}, local_logger, stop_other_streams=True
+    )
+    assert result
+
+    # Run
+    methods = negotiator.negotiate()
+
+    # Test
+    assert methods == {"ATTITUDE": "SET_MESSAGE_INTERVAL"}
+    assert len(connection.received) == 0
+    assert connection.sent[0].get_type() == "REQUEST_DATA_STREAM"
+    assert connection.sent[0].req_stream_id == mavutil.mavlink.MAV_DATA_STREAM_ALL
+    assert connection.sent[0].start_stop == 0
+    intervals = {
+        mavutil.mavlink.mavlink_map[int(msg.param1)].msgname: msg.param2
+        for msg in connection.sent[1:-1]
+    }
+    assert len(intervals) == stopped_count
+    assert "ATTITUDE" not in intervals
+    assert set(intervals.values()) == {stream_rate_negotiator.STOP_INTERVAL}
+    assert connection.sent[-1].param1 == mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE
+    assert connection.sent[-1].param2 == pytest.approx(100000)
+
+
+def test_measure_and_verify(local_logger: logger.Logger) -> None:
+    """
+    Rates and bandwidth are per second of the measurement, and missing messages fail.
+    """
+    # Setup
+    connection = conftest.FakeConnection()
+    for i in range(10):
+        connection.queue(mavutil.mavlink.MAVLink_attitude_message(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+    frame_size = len(connection.received[0].get_msgbuf())
+    result, negotiator = stream_rate_negotiator.StreamRateNegotiator.create(
+        connection, {"ATTITUDE": 200, "LOCAL_POSITION_NED": 10}, local_logger
+    )
+    assert result
+
+    # Run
+    measured = negotiator.measure(0.05)
+    verified = negotiator.verify(measured)
+
+    # Test
+    assert measured == {"ATTITUDE": (pytest.approx(200), pytest.approx(200 * frame_size))}
+    assert verified == {"ATTITUDE": True, "LOCAL_POSITION_NED": False}
+
+
+def test_create_invalid(local_logger: logger.Logger) -> None:
+    """
+    Message types must exist and rates must be positive.
+    """
+    connection = conftest.FakeConnection()
+
+    assert not stream_rate_negotiator.StreamRateNegotiator.create(
+        connection, {"NOT_A_MESSAGE": 1}, local_logger
+    )[0]
+    assert not stream_rate_negotiator.StreamRateNegotiator.create(
+        connection, {"ATTITUDE": 0}, local_logger
+    )[0]
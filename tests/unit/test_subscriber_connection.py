@@ -0,0 +1,82 @@
+"""
+Test the demultiplexer subscriber connection.
+"""
+
+import multiprocessing as mp
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_demux import subscriber_connection
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def subscription_queue(
+    mp_manager: mp.managers.SyncManager,
+) -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Subscription queue pre-filled the way the demultiplexer would.
+    """
+    subscription = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    subscription.queue.put(mavutil.mavlink.MAVLink_attitude_message(100, 0, 0, 1, 0, 0, 0))
+    subscription.queue.put(
+        mavutil.mavlink.MAVLink_local_position_ned_message(200, 1, 2, 3, 0, 0, 0)
+    )
+    yield subscription  # type: ignore
+
+
+class TestRecvMatch:
+    """
+    recv_match() must behave like the mavfile version for the workers.
+    """
+
+    def test_type_filter(self, subscription_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Messages of other types are skipped.
+        """
+        # Setup
+        connection = subscriber_connection.SubscriberConnection(None, subscription_queue)
+
+        # Run
+        actual = connection.recv_match(type="LOCAL_POSITION_NED")
+
+        # Test
+        assert actual is not None
+        assert actual.time_boot_ms == 200
+
+    def test_fifo_order(self, subscription_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Without a filter, messages come out in the order they were routed.
+        """
+        # Setup
+        connection = subscriber_connection.SubscriberConnection(None, subscription_queue)
+
+        # Run
+        first = connection.recv_match()
+        second = connection.recv_match()
+        third = connection.recv_match()
+
+        # Test
+        assert first.get_type() == "ATTITUDE"
+        assert second.get_type() == "LOCAL_POSITION_NED"
+        assert third is None
+
+    def test_blocking_timeout(self, mp_manager: mp.managers.SyncManager) -> None:
+        """
+        Blocking on an empty subscription gives up at the timeout.
+        """
+        # Setup
+        empty_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+        connection = subscriber_connection.SubscriberConnection(None, empty_queue)
+
+        # Run
+        actual = connection.recv_match(type="HEARTBEAT", blocking=True, timeout=0.05)
+
+        # Test
+        assert actual is None
@@ -0,0 +1,117 @@
+"""
+Test the columnar telemetry batch.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_batch
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def samples() -> "list[telemetry.TelemetryData]":  # type: ignore
+    """
+    One sample every 100 ms moving along x.
+    """
+    data = [
+        telemetry.TelemetryData(time_since_boot=100 * i, x=float(i), x_velocity=10.0, yaw=0.1 * i)
+        for i in range(50)
+    ]
+    yield data  # type: ignore
+
+
+class TestConversion:
+    """
+    Lists of TelemetryData in and out.
+    """
+
+    def test_round_trip(self, samples: "list[telemetry.TelemetryData]") -> None:
+        """
+        Every field survives, including missing ones.
+        """
+        # Setup
+        batch = telemetry_batch.TelemetryBatch.from_list(samples)
+
+        # Run
+        actual = batch.to_list()
+
+        # Test
+        assert len(actual) == len(samples)
+        for actual_sample, expected_sample in zip(actual, samples):
+            assert actual_sample.time_since_boot == expected_sample.time_since_boot
+            assert actual_sample.x == expected_sample.x
+            assert actual_sample.yaw == expected_sample.yaw
+            assert actual_sample.z is None
+
+    def test_append_grows(self, samples: "list[telemetry.TelemetryData]") -> None:
+        """
+        Appending past the initial capacity keeps earlier records.
+        """
+        # Setup
+        batch = telemetry_batch.TelemetryBatch(1)
+
+        # Run
+        for sample in samples:
+            batch.append(sample)
+
+        # Test
+        assert len(batch) == len(samples)
+        assert np.array_equal(batch.field("x"), np.arange(len(samples), dtype=np.float64))
+
+
+class TestViews:
+    """
+    Fields and slices share memory with the batch.
+    """
+
+    def test_field_is_view(self, samples: "list[telemetry.TelemetryData]") -> None:
+        """
+        Writing through a field view changes the batch.
+        """
+        # Setup
+        batch = telemetry_batch.TelemetryBatch.from_list(samples)
+
+        # Run
+        batch.field("z")[:] = 30.0
+
+        # Test
+        assert batch.to_list()[0].z == 30.0
+
+    def test_slice_by_time(self, samples: "list[telemetry.TelemetryData]") -> None:
+        """
+        Half open time range.
+        """
+        # Setup
+        batch = telemetry_batch.TelemetryBatch.from_list(samples)
+
+        # Run
+        actual = batch.slice_by_time(1000, 1500)
+
+        # Test
+        assert len(actual) == 5
+        assert actual.field("time_since_boot")[0] == 1000
+        assert np.shares_memory(actual.records, batch.records)
+
+    def test_append_after_slice_copies(self, samples: "list[telemetry.TelemetryData]") -> None:
+        """
+        Appending to a slice must not overwrite the parent batch.
+        """
+        # Setup
+        batch = telemetry_batch.TelemetryBatch.from_list(samples)
+        sliced = batch.slice_by_time(0, 500)
+
+        # Run
+        sliced.append(telemetry.TelemetryData(time_since_boot=1, x=-1.0))
+
+        # Test
+        assert len(sliced) == 6
+        assert batch.field("x")[5] == 5.0
+        assert math.isnan(sliced.field("y")[5])
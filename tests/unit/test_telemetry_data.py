@@ -0,0 +1,132 @@
+"""
+Test the packed TelemetryData representation.
+"""
+
+import math
+import pickle
+
+from modules.telemetry import telemetry
+
+
+class TestWireFormat:
+    """
+    to_bytes() and from_bytes() are inverses.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Every field survives, including missing ones.
+        """
+        # Setup
+        expected = telemetry.TelemetryData(1234, 1.5, -2.0, 3.25, yaw=-math.pi, yaw_speed=0.5)
+
+        # Run
+        result, actual = telemetry.TelemetryData.from_bytes(expected.to_bytes())
+
+        # Test
+        assert result
+        assert actual is not None
+        assert actual.time_since_boot == 1234
+        assert isinstance(actual.time_since_boot, int)
+        assert actual.x == 1.5
+        assert actual.y == -2.0
+        assert actual.z == 3.25
+        assert actual.yaw == -math.pi
+        assert actual.yaw_speed == 0.5
+        assert actual.roll is None
+        assert actual.x_velocity is None
+
+    def test_latency_timestamps(self) -> None:
+        """
+        Receive and enqueue times are carried alongside the fields.
+        """
+        # Setup
+        expected = telemetry.TelemetryData(1)
+        expected.receive_time = 1700000000.25
+
+        # Run
+        result, actual = telemetry.TelemetryData.from_bytes(expected.to_bytes())
+
+        # Test
+        assert result
+        assert actual is not None
+        assert actual.receive_time == 1700000000.25
+        assert actual.enqueue_time is None
+
+    def test_size(self) -> None:
+        """
+        104 bytes of fields plus the header.
+        """
+        # Setup
+        data = telemetry.TelemetryData()
+
+        # Run
+        actual = len(data.to_bytes())
+
+        # Test
+        assert actual == 104 + telemetry.TELEMETRY_WIRE_HEADER.size
+
+    def test_bad_header(self) -> None:
+        """
+        Data that was not packed by to_bytes() is rejected.
+        """
+        # Setup
+        data = bytearray(telemetry.TelemetryData(1).to_bytes())
+        data[0:2] = b"XX"
+
+        # Run
+        result, actual = telemetry.TelemetryData.from_bytes(bytes(data))
+
+        # Test
+        assert not result
+        assert actual is None
+
+    def test_pickle(self) -> None:
+        """
+        Pickling, used by the queues, goes through the wire format.
+        """
+        # Setup
+        expected = telemetry.TelemetryData(10, x=1.0, z_velocity=-4.0)
+
+        # Run
+        actual = pickle.loads(pickle.dumps(expected))
+
+        # Test
+        assert actual.time_since_boot == 10
+        assert actual.x == 1.0
+        assert actual.z_velocity == -4.0
+        assert actual.y is None
+
+
+class TestFields:
+    """
+    Fields behave like plain attributes.
+    """
+
+    def test_assign(self) -> None:
+        """
+        Assignment, including back to None.
+        """
+        # Setup
+        data = telemetry.TelemetryData(x=1.0)
+
+        # Run
+        data.y = 2.0
+        data.x = None
+
+        # Test
+        assert data.x is None
+        assert data.y == 2.0
+
+    def test_no_instance_dict(self) -> None:
+        """
+        Slotted, so arbitrary attributes are rejected.
+        """
+        # Setup
+        data = telemetry.TelemetryData()
+
+        # Run
+        has_dict = hasattr(data, "__dict__")
+
+        # Test
+        assert not has_dict
@@ -0,0 +1,58 @@
+"""
+Test the hierarchical timer wheel against a plain scan.
+"""
+
+import random
+
+from utilities.timers import timer_wheel
+
+
+TIMER_COUNT = 500
+STEP_COUNT = 2000
+# Exact in binary, so tick boundaries are not subject to rounding in the comparison
+TICK = 1 / 64  # s
+
+
+def test_create_invalid() -> None:
+    """
+    Tick must be positive and there must be at least 2 slots and 1 level.
+    """
+    assert timer_wheel.TimerWheel.create(0.0, 0.0) == (False, None)
+    assert timer_wheel.TimerWheel.create(TICK, 0.0, slot_count=1) == (False, None)
+    assert timer_wheel.TimerWheel.create(TICK, 0.0, level_count=0) == (False, None)
+
+
+def test_matches_scan() -> None:
+    """
+    Random schedules, reschedules, and cancels, including expiries past the top level,
+    fire on the same tick as scanning every timer would.
+    """
+    # Setup
+    generator = random.Random(0)
+    result, wheel = timer_wheel.TimerWheel.create(TICK, 0.0, slot_count=4, level_count=3)
+    assert result
+    expiries = {}
+
+    # Run
+    for step in range(1, STEP_COUNT + 1):
+        now = step * TICK
+        for _ in range(3):
+            key = generator.randrange(TIMER_COUNT)
+            if generator.random() < 0.1:
+                wheel.cancel(key)
+                expiries.pop(key, None)
+                continue
+
+            # Up to 150 ticks ahead, more than the 64 that the 3 levels span
+            expiry = now + generator.uniform(0.0, 150 * TICK)
+            wheel.schedule(key, expiry)
+            expiries[key] = expiry
+
+        fired = wheel.advance(now)
+        due = {key for key, expiry in expiries.items() if expiry <= now + 1e-9}
+
+        # Test
+        assert set(fired) == due, f"step {step}"
+        for key in due:
+            del expiries[key]
+        assert len(wheel) == len(expiries)
@@ -0,0 +1,38 @@
+"""
+Choice between pymavlink's Python and native (C) frame parsers.
+"""
+
+from pymavlink import mavutil
+
+
+def native_parser_available() -> bool:
+    """
+    Whether the loaded dialect was built with the mavnative extension.
+    Recent pymavlink releases no longer ship it, in which case only the Python parser exists.
+    """
+    return bool(getattr(mavutil.mavlink, "native_supported", False))
+
+
+def parser_name(connection: mavutil.mavfile) -> str:
+    """
+    Parser actually in use by the connection.
+    """
+    return "native" if getattr(connection.mav, "native", None) is not None else "python"
+
+
+def mavlink_connection(
+    connection_string: str, use_native_parser: bool = False, **kwargs: object
+) -> "tuple[mavutil.mavfile, bool]":
+    """
+    mavutil.mavlink_connection() that falls back to the Python parser when the native
+    parser is requested but not built.
+
+    connection_string: Same as mavutil.mavlink_connection().
+    use_native_parser: Whether to try the native parser.
+    kwargs: Passed to mavutil.mavlink_connection().
+
+    Returns the connection and whether it uses the native parser.
+    """
+    use_native = use_native_parser and native_parser_available()
+    connection = mavutil.mavlink_connection(connection_string, use_native=use_native, **kwargs)
+    return connection, parser_name(connection) == "native"
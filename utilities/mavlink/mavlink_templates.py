@@ -0,0 +1,287 @@
+"""
+Pre-encoded MAVLink frames for messages that are sent repeatedly.
+
+pymavlink builds a message object, packs every field, and computes the CRC on every send.
+A template packs the header and the constant fields once, and on each send only patches
+the changing fields, sequence number, and CRC into a preallocated buffer.
+"""
+
+import binascii
+import struct
+
+from pymavlink import mavutil
+
+
+# Bit reversal of every byte value
+_REVERSED_BITS = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+MAVLINK1_HEADER_LENGTH = 6
+MAVLINK2_HEADER_LENGTH = 10
+CRC_LENGTH = 2
+
+COMMAND_LONG_PAYLOAD_LENGTH = 33
+# param1 to param7, command
+COMMAND_LONG_VARIABLE_FORMAT = struct.Struct("<7fH")
+# target_system, target_component, confirmation
+COMMAND_LONG_TARGET_OFFSET = 30
+COMMAND_LONG_CONFIRMATION_OFFSET = 32
+
+HEARTBEAT_FORMAT = struct.Struct("<IBBBBB")
+
+
+def x25_crc(data: "bytes | bytearray") -> int:
+    """
+    MAVLink CRC (CRC-16/MCRF4XX) in C through the standard library.
+
+    binascii.crc_hqx() is the same polynomial but processes bits most significant first,
+    so the input bytes and the result are bit reversed. The 0xFFFF seed is its own reversal.
+    """
+    crc = binascii.crc_hqx(data.translate(_REVERSED_BITS), 0xFFFF)
+    return (_REVERSED_BITS[crc & 0xFF] << 8) | _REVERSED_BITS[crc >> 8]
+
+
+def is_mavlink2() -> bool:
+    """
+    Whether the loaded dialect sends MAVLink 2 frames.
+    """
+    return float(mavutil.mavlink.WIRE_PROTOCOL_VERSION) == 2.0
+
+
+class FrameTemplate:
+    """
+    Buffer holding the header of one message type from the connection's system and component.
+
+    The connection's sequence number and send counters are kept in step with pymavlink,
+    so template and regular sends can be mixed on the same connection.
+    """
+
+    def __init__(self, connection: mavutil.mavfile, message_id: int, crc_extra: int) -> None:
+        mav = connection.mav
+        self.__mav = mav
+        self.__crc_extra = crc_extra
+        self.mavlink2 = is_mavlink2()
+
+        if self.mavlink2:
+            self.header_length = MAVLINK2_HEADER_LENGTH
+            header = struct.pack(
+                "<BBBBBBBHB",
+                mavutil.mavlink.PROTOCOL_MARKER_V2,
+                0,  # Length, patched
+                0,  # Incompatible flags
+                0,  # Compatible flags
+                0,  # Sequence, patched
+                mav.srcSystem,
+                mav.srcComponent,
+                message_id & 0xFFFF,
+                message_id >> 16,
+            )
+            self.__sequence_offset = 4
+        else:
+            self.header_length = MAVLINK1_HEADER_LENGTH
+            header = struct.pack(
+                "<BBBBBB",
+                mavutil.mavlink.PROTOCOL_MARKER_V1,
+                0,
+                0,
+                mav.srcSystem,
+                mav.srcComponent,
+                message_id,
+            )
+            self.__sequence_offset = 2
+
+        # Room for the longest payload, the CRC extra byte, and the CRC
+        self.buffer = bytearray(header) + bytearray(255 + CRC_LENGTH)
+
+    def fallback_required(self) -> bool:
+        """
+        Whether the send must go through pymavlink, because it signs or reports messages.
+        """
+        return self.__mav.signing.sign_outgoing or self.__mav.send_callback is not None
+
+    def encode(self, payload_length: int, sequence: int) -> bytes:
+        """
+        Completes the frame whose full length payload is already in the buffer.
+
+        Returns the frame.
+        """
+        buffer = self.buffer
+        if self.mavlink2:
+            # MAVLink 2 strips trailing zeros, keeping at least one byte
+            while payload_length > 1 and buffer[self.header_length + payload_length - 1] == 0:
+                payload_length -= 1
+
+        end = self.header_length + payload_length
+        buffer[1] = payload_length
+        buffer[self.__sequence_offset] = sequence
+        # A stripped payload's constant zeros are where the CRC goes, restored afterwards
+        stripped = buffer[end : end + CRC_LENGTH]
+        # The CRC covers everything after the start marker, then the CRC extra byte
+        buffer[end] = self.__crc_extra
+        crc = x25_crc(buffer[1 : end + 1])
+        buffer[end] = crc & 0xFF
+        buffer[end + 1] = crc >> 8
+        frame = bytes(buffer[: end + CRC_LENGTH])
+        buffer[end : end + CRC_LENGTH] = stripped
+        return frame
+
+    def write(self, frame: bytes) -> None:
+        """
+        Writes the frame with the bookkeeping of MAVLink.send().
+        """
+        mav = self.__mav
+        mav.file.write(frame)
+        mav.seq = (mav.seq + 1) % 256
+        mav.total_packets_sent += 1
+        mav.total_bytes_sent += len(frame)
+
+    @property
+    def sequence(self) -> int:
+        """
+        Sequence number of the next frame on the connection.
+        """
+        return self.__mav.seq
+
+
+class CommandLongTemplate:
+    """
+    COMMAND_LONG to a fixed target.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        target_system: int = 1,
+        target_component: int = 0,
+    ) -> "tuple[True, CommandLongTemplate] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a CommandLongTemplate object.
+
+        connection: Connection that the frames are written to, its system and component IDs
+        are read once here.
+        """
+        if not 0 <= target_system <= 255 or not 0 <= target_component <= 255:
+            return False, None
+
+        return True, CommandLongTemplate(
+            cls.__private_key, connection, target_system, target_component
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        target_system: int,
+        target_component: int,
+    ) -> None:
+        assert key is CommandLongTemplate.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__target_system = target_system
+        self.__target_component = target_component
+        self.__frame = FrameTemplate(
+            connection,
+            mavutil.mavlink.MAVLINK_MSG_ID_COMMAND_LONG,
+            mavutil.mavlink.MAVLink_command_long_message.crc_extra,
+        )
+        offset = self.__frame.header_length
+        self.__frame.buffer[offset + COMMAND_LONG_TARGET_OFFSET] = target_system
+        self.__frame.buffer[offset + COMMAND_LONG_TARGET_OFFSET + 1] = target_component
+
+    @property
+    def target(self) -> "tuple[int, int]":
+        """
+        System and component the commands are sent to.
+        """
+        return self.__target_system, self.__target_component
+
+    def send(
+        self,
+        command: int,
+        params: "tuple[float, float, float, float, float, float, float]",
+        confirmation: int = 0,
+    ) -> None:
+        """
+        Same as connection.mav.command_long_send() to the target.
+        """
+        frame = self.__frame
+        if frame.fallback_required():
+            self.__connection.mav.command_long_send(
+                self.__target_system, self.__target_component, command, confirmation, *params
+            )
+            return
+
+        offset = frame.header_length
+        COMMAND_LONG_VARIABLE_FORMAT.pack_into(frame.buffer, offset, *params, command)
+        frame.buffer[offset + COMMAND_LONG_CONFIRMATION_OFFSET] = confirmation
+        frame.write(frame.encode(COMMAND_LONG_PAYLOAD_LENGTH, frame.sequence))
+
+
+class HeartbeatTemplate:
+    """
+    HEARTBEAT with fixed contents, so the frame for every sequence number is encoded up front.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        vehicle_type: int,
+        autopilot: int,
+        base_mode: int = 0,
+        custom_mode: int = 0,
+        system_status: int = 0,
+    ) -> "tuple[True, HeartbeatTemplate] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a HeartbeatTemplate object.
+
+        Arguments after the connection are the same as connection.mav.heartbeat_send().
+        """
+        try:
+            payload = HEARTBEAT_FORMAT.pack(
+                custom_mode, vehicle_type, autopilot, base_mode, system_status, 3
+            )
+        except struct.error:
+            return False, None
+
+        return True, HeartbeatTemplate(
+            cls.__private_key,
+            connection,
+            payload,
+            (vehicle_type, autopilot, base_mode, custom_mode, system_status),
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        payload: bytes,
+        arguments: "tuple[int, int, int, int, int]",
+    ) -> None:
+        assert key is HeartbeatTemplate.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__arguments = arguments
+        self.__frame = FrameTemplate(
+            connection,
+            mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT,
+            mavutil.mavlink.MAVLink_heartbeat_message.crc_extra,
+        )
+        offset = self.__frame.header_length
+        self.__frame.buffer[offset : offset + len(payload)] = payload
+        self.__frames = [self.__frame.encode(len(payload), sequence) for sequence in range(256)]
+
+    def send(self) -> None:
+        """
+        Same as connection.mav.heartbeat_send() with the contents given at creation.
+        """
+        frame = self.__frame
+        if frame.fallback_required():
+            self.__connection.mav.heartbeat_send(*self.__arguments)
+            return
+
+        frame.write(self.__frames[frame.sequence])
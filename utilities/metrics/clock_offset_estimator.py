@@ -0,0 +1,35 @@
+"""
+Estimates the offset between the local clock and the vehicle boot clock.
+"""
+
+
+class ClockOffsetEstimator:
+    """
+    The smallest observed (receive time - boot time) is the offset plus the lowest
+    link latency, so latency relative to the fastest message is the difference to it.
+    """
+
+    def __init__(self) -> None:
+        self.offset: "float | None" = None  # s
+        self.__last_time_boot_ms = 0
+
+    def latency(self, receive_time: float, time_boot_ms: int) -> float:
+        """
+        Updates the estimate.
+
+        receive_time: Local time the message was received, seconds since the epoch.
+        time_boot_ms: Vehicle timestamp of the message.
+
+        Returns the latency of the message in seconds.
+        """
+        # Vehicle rebooted
+        if time_boot_ms < self.__last_time_boot_ms:
+            self.offset = None
+
+        self.__last_time_boot_ms = time_boot_ms
+
+        offset = receive_time - time_boot_ms / 1000
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+
+        return offset - self.offset
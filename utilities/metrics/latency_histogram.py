@@ -0,0 +1,132 @@
+"""
+Fixed bucket latency histograms.
+"""
+
+import numpy as np
+
+
+# Log-linear buckets as in HdrHistogram: exact below SUB_BUCKET_COUNT microseconds,
+# then HALF_SUB_BUCKET_COUNT buckets per power of 2, for about 3% relative error
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT // 2
+MAX_VALUE_BITS = 38  # About 76 hours in microseconds
+BUCKET_COUNT = SUB_BUCKET_COUNT + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * HALF_SUB_BUCKET_COUNT
+
+
+def bucket_index(value: int) -> int:
+    """
+    Bucket of a value in microseconds, clamped to the histogram range.
+    """
+    if value < SUB_BUCKET_COUNT:
+        return max(value, 0)
+
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    index = (
+        SUB_BUCKET_COUNT
+        + (shift - 1) * HALF_SUB_BUCKET_COUNT
+        + (value >> shift)
+        - HALF_SUB_BUCKET_COUNT
+    )
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_bounds(index: int) -> "tuple[int, int]":
+    """
+    Lowest value and one past the highest value of a bucket, in microseconds.
+    """
+    if index < SUB_BUCKET_COUNT:
+        return index, index + 1
+
+    shift = (index - SUB_BUCKET_COUNT) // HALF_SUB_BUCKET_COUNT + 1
+    lower = ((index - SUB_BUCKET_COUNT) % HALF_SUB_BUCKET_COUNT + HALF_SUB_BUCKET_COUNT) << shift
+    return lower, lower + (1 << shift)
+
+
+class LatencyHistogram:
+    """
+    Constant memory histogram of durations, recorded in seconds and stored in microseconds.
+    Histograms from different processes can be merged.
+    """
+
+    def __init__(self) -> None:
+        self.counts = np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.count = 0
+        self.max = 0.0  # s
+
+    def record(self, seconds: float) -> None:
+        """
+        Adds a duration. Negative durations, from clock estimation error, count as 0.
+        """
+        self.counts[bucket_index(int(seconds * 1e6))] += 1
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Adds every sample of the other histogram.
+        """
+        self.counts += other.counts
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Value in seconds that percent of the samples are at or below, 0 if empty.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = max(1, int(np.ceil(percent / 100 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        lower, upper = bucket_bounds(index)
+        # Middle of the bucket, but never beyond what was actually recorded
+        return min((lower + upper) / 2 / 1e6, self.max)
+
+    def summary(self) -> str:
+        """
+        Count, p50, p99, and max in milliseconds.
+        """
+        return (
+            f"n={self.count} p50={self.percentile(50) * 1000:.2f}ms "
+            f"p99={self.percentile(99) * 1000:.2f}ms max={self.max * 1000:.2f}ms"
+        )
+
+
+class LatencyMetrics:
+    """
+    Named histograms of a single process, e.g. "link ATTITUDE" or "queue dwell".
+    """
+
+    def __init__(self) -> None:
+        self.histograms: "dict[str, LatencyHistogram]" = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Adds a duration to the named histogram, creating it if needed.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self.histograms[name] = histogram
+
+        histogram.record(seconds)
+
+    def merge(self, other: "LatencyMetrics") -> None:
+        """
+        Adds every histogram of the other metrics.
+        """
+        for name, histogram in other.histograms.items():
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+
+            self.histograms[name].merge(histogram)
+
+    def summary(self) -> str:
+        """
+        One line per histogram.
+        """
+        return "\n".join(
+            f"{name}: {histogram.summary()}" for name, histogram in sorted(self.histograms.items())
+        )
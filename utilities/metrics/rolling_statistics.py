@@ -0,0 +1,163 @@
+"""
+Constant time statistics over a sliding window.
+"""
+
+import array
+import collections
+import math
+
+
+class RollingStatistics:  # pylint: disable=too-many-instance-attributes
+    """
+    Mean, variance, and max over the last window_size samples (and optionally only those
+    within window_time of the newest), plus an exponential moving average over all samples.
+
+    Every add() is amortized O(1) time, and memory is fixed by window_size.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        window_size: int,
+        window_time: "float | None" = None,  # s
+        ema_time_constant: float = 1.0,  # s
+    ) -> "tuple[True, RollingStatistics] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a RollingStatistics object.
+
+        window_size: Maximum number of samples in the window.
+        window_time: Maximum age of samples in the window relative to the newest, None for no limit.
+        ema_time_constant: Time for the moving average to cover 63% of a step change.
+        """
+        if window_size < 1:
+            return False, None
+
+        if window_time is not None and window_time <= 0.0:
+            return False, None
+
+        if ema_time_constant <= 0.0:
+            return False, None
+
+        return True, RollingStatistics(
+            cls.__private_key, window_size, window_time, ema_time_constant
+        )
+
+    def __init__(
+        self,
+        key: object,
+        window_size: int,
+        window_time: "float | None",
+        ema_time_constant: float,
+    ) -> None:
+        assert key is RollingStatistics.__private_key, "Use create() method"
+
+        self.__window_size = window_size
+        self.__window_time = window_time
+        self.__ema_time_constant = ema_time_constant
+
+        # Ring buffer, the oldest sample is at __head
+        self.__values = array.array("d", bytes(8 * window_size))
+        self.__timestamps = array.array("d", bytes(8 * window_size))
+        self.__head = 0
+        self.count = 0
+        # Sample numbers whose values decrease, the front is the window max
+        self.__max_candidates: "collections.deque[tuple[int, float]]" = collections.deque()
+        self.__added = 0
+
+        # Welford's running mean and sum of squared differences
+        self.mean = 0.0
+        self.__squares = 0.0
+
+        self.ema: "float | None" = None
+        self.__last_timestamp: "float | None" = None
+
+    def reset(self) -> None:
+        """
+        Forgets every sample.
+        """
+        self.__head = 0
+        self.count = 0
+        self.__max_candidates.clear()
+        self.mean = 0.0
+        self.__squares = 0.0
+        self.ema = None
+        self.__last_timestamp = None
+
+    def add(self, value: float, timestamp: float) -> None:
+        """
+        Adds a sample.
+
+        timestamp: Seconds on any clock, going backwards (e.g. vehicle reboot) restarts the window.
+        """
+        if self.__last_timestamp is not None and timestamp < self.__last_timestamp:
+            self.reset()
+
+        if self.count == self.__window_size:
+            self.__remove_oldest()
+
+        tail = (self.__head + self.count) % self.__window_size
+        self.__values[tail] = value
+        self.__timestamps[tail] = timestamp
+        self.count += 1
+
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.__squares += delta * (value - self.mean)
+
+        while len(self.__max_candidates) > 0 and self.__max_candidates[-1][1] <= value:
+            self.__max_candidates.pop()
+        self.__max_candidates.append((self.__added, value))
+        self.__added += 1
+
+        if self.ema is None:
+            self.ema = value
+        else:
+            alpha = 1.0 - math.exp(-(timestamp - self.__last_timestamp) / self.__ema_time_constant)
+            self.ema += alpha * (value - self.ema)
+        self.__last_timestamp = timestamp
+
+        if self.__window_time is not None:
+            while self.__timestamps[self.__head] < timestamp - self.__window_time:
+                self.__remove_oldest()
+
+    def __remove_oldest(self) -> None:
+        """
+        Drops the sample at the head of the ring buffer.
+        """
+        value = self.__values[self.__head]
+        oldest_number = self.__added - self.count
+        self.__head = (self.__head + 1) % self.__window_size
+        self.count -= 1
+
+        if self.count == 0:
+            self.mean = 0.0
+            self.__squares = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.__squares = max(0.0, self.__squares - delta * (value - self.mean))
+
+        if self.__max_candidates[0][0] == oldest_number:
+            self.__max_candidates.popleft()
+
+    @property
+    def variance(self) -> float:
+        """
+        Sample variance of the window, 0 with fewer than 2 samples.
+        """
+        if self.count < 2:
+            return 0.0
+
+        return self.__squares / (self.count - 1)
+
+    @property
+    def max(self) -> "float | None":
+        """
+        Largest value in the window, None if empty.
+        """
+        if self.count == 0:
+            return None
+
+        return self.__max_candidates[0][1]
@@ -0,0 +1,93 @@
+"""
+Composable operators over sample streams (any iterable, e.g. Telemetry.stream()).
+
+Each operator returns a stage: a function from an iterable to an iterator.
+Stages are lazy, so a pipeline does one pass per sample with no queue between stages.
+"""
+
+import collections
+import itertools
+from typing import Callable, Iterable, Iterator, TypeVar
+
+
+Sample = TypeVar("Sample")
+Result = TypeVar("Result")
+Stage = Callable[[Iterable], Iterator]
+
+
+def pipeline(source: Iterable, *stages: Stage) -> Iterator:
+    """
+    Chains the stages onto the source, in order.
+    """
+    stream = iter(source)
+    for stage in stages:
+        stream = stage(stream)
+
+    return stream
+
+
+def keep(predicate: Callable[[Sample], bool]) -> Stage:
+    """
+    Only passes samples that the predicate accepts.
+    """
+
+    def stage(stream: Iterable[Sample]) -> Iterator[Sample]:
+        return filter(predicate, stream)
+
+    return stage
+
+
+def transform(function: Callable[[Sample], Result]) -> Stage:
+    """
+    Replaces every sample with function(sample).
+    """
+
+    def stage(stream: Iterable[Sample]) -> Iterator[Result]:
+        return map(function, stream)
+
+    return stage
+
+
+def decimate(factor: int) -> Stage:
+    """
+    Passes the first of every factor samples.
+    """
+    assert factor >= 1, "Decimation factor must be at least 1"
+
+    def stage(stream: Iterable[Sample]) -> Iterator[Sample]:
+        return itertools.islice(stream, 0, None, factor)
+
+    return stage
+
+
+def window(size: int, step: int = 1) -> Stage:
+    """
+    Sliding windows as tuples of the last size samples, emitted every step samples once full.
+    """
+    assert size >= 1, "Window size must be at least 1"
+    assert step >= 1, "Window step must be at least 1"
+
+    def stage(stream: Iterable[Sample]) -> "Iterator[tuple[Sample, ...]]":
+        samples = collections.deque(maxlen=size)
+        since_emit = step
+        for sample in stream:
+            samples.append(sample)
+            since_emit += 1
+            if len(samples) == size and since_emit >= step:
+                since_emit = 0
+                yield tuple(samples)
+
+    return stage
+
+
+def tap(sink: Callable[[Sample], object]) -> Stage:
+    """
+    Calls sink(sample) (e.g. a queue put or a recorder) and passes the sample on unchanged.
+    """
+
+    def stage(stream: Iterable[Sample]) -> Iterator[Sample]:
+        for sample in stream:
+            sink(sample)
+            yield sample
+
+    return stage
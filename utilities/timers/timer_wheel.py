@@ -0,0 +1,143 @@
+"""
+Hierarchical timer wheel for many timeouts that are rescheduled often.
+"""
+
+import math
+from typing import Hashable
+
+
+class TimerWheel:  # pylint: disable=too-many-instance-attributes
+    """
+    Timers are kept in slots by their expiry tick, with coarser levels for later expiries
+    that are moved down a level as their time approaches.
+
+    Scheduling and cancelling are O(1), and each tick only touches the slot that is due,
+    so the cost of advancing does not depend on the number of timers.
+    Expiry is quantized to the tick: a timer fires on the first tick at or after its time.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        tick: float,  # s
+        start: float,  # s
+        slot_count: int = 64,
+        level_count: int = 4,
+    ) -> "tuple[True, TimerWheel] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a TimerWheel object.
+
+        tick: Resolution of expiry times.
+        start: Time of tick 0, on the same clock as every later time.
+        slot_count: Slots per level, each level spans slot_count times the level below.
+        level_count: Levels, timers beyond tick * slot_count ** level_count are held at the top.
+        """
+        if tick <= 0.0 or slot_count < 2 or level_count < 1:
+            return False, None
+
+        return True, TimerWheel(cls.__private_key, tick, start, slot_count, level_count)
+
+    def __init__(
+        self, key: object, tick: float, start: float, slot_count: int, level_count: int
+    ) -> None:
+        assert key is TimerWheel.__private_key, "Use create() method"
+
+        self.tick = tick
+        self.__start = start
+        self.__slot_count = slot_count
+        self.__level_count = level_count
+        # Per level, per slot: timer key to expiry tick
+        self.__levels: "list[list[dict[Hashable, int]]]" = [
+            [{} for _ in range(slot_count)] for _ in range(level_count)
+        ]
+        # Timer key to the slot holding it
+        self.__locations: "dict[Hashable, dict[Hashable, int]]" = {}
+        self.current_tick = 0
+
+    def __len__(self) -> int:
+        return len(self.__locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__locations
+
+    def __insert(self, key: Hashable, expiry_tick: int) -> None:
+        """
+        Places the timer in the finest level whose span reaches its expiry.
+        """
+        delta = expiry_tick - self.current_tick
+        level = 0
+        span = self.__slot_count
+        while delta >= span and level < self.__level_count - 1:
+            level += 1
+            span *= self.__slot_count
+
+        slot = self.__levels[level][
+            (expiry_tick // (span // self.__slot_count)) % self.__slot_count
+        ]
+        slot[key] = expiry_tick
+        self.__locations[key] = slot
+
+    def schedule(self, key: Hashable, expiry_time: float) -> None:
+        """
+        Sets the timer to fire at expiry_time, replacing any earlier schedule of key.
+        """
+        self.cancel(key)
+        expiry_tick = math.ceil((expiry_time - self.__start) / self.tick)
+        self.__insert(key, max(expiry_tick, self.current_tick + 1))
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        Removes the timer, if scheduled.
+        """
+        slot = self.__locations.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def time_of_tick(self, tick: int) -> float:
+        """
+        Time on the caller's clock of the tick.
+        """
+        return self.__start + tick * self.tick
+
+    def __cascade(self) -> None:
+        """
+        Moves timers down from every coarser slot that starts at the current tick.
+        """
+        span = 1
+        for level in range(1, self.__level_count):
+            span *= self.__slot_count
+            if self.current_tick % span != 0:
+                return
+
+            slot = self.__levels[level][(self.current_tick // span) % self.__slot_count]
+            timers = list(slot.items())
+            slot.clear()
+            for key, expiry_tick in timers:
+                self.__insert(key, expiry_tick)
+
+    def advance(self, now: float) -> "list[Hashable]":
+        """
+        Processes every tick up to now.
+
+        Returns the keys of the timers that fired, in expiry order.
+        """
+        target_tick = math.floor((now - self.__start) / self.tick)
+        expired = []
+        while self.current_tick < target_tick:
+            self.current_tick += 1
+            self.__cascade()
+
+            slot = self.__levels[0][self.current_tick % self.__slot_count]
+            if not slot:
+                continue
+
+            # Timers at the top level wrap around, so they may not be due yet
+            due = [key for key, expiry_tick in slot.items() if expiry_tick <= self.current_tick]
+            for key in due:
+                del slot[key]
+                del self.__locations[key]
+            expired.extend(due)
+
+        return expired
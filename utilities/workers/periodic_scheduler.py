@@ -0,0 +1,172 @@
+"""
+Drift-free scheduling of periodic tasks on the monotonic clock.
+"""
+
+import math
+import time
+from typing import Callable
+
+from utilities.metrics import rolling_statistics
+
+
+JITTER_WINDOW_SIZE = 1000
+
+
+class PeriodicTask:  # pylint: disable=too-many-instance-attributes
+    """
+    A callback and its schedule.
+
+    Deadlines are start + k * period, so time spent in the callback and late wakeups
+    never shift later deadlines.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        period: float,
+        callback: Callable[[], object],
+        start: float,
+        lateness: rolling_statistics.RollingStatistics,
+    ) -> None:
+        self.name = name
+        self.period = period
+        self.callback = callback
+        self.next_deadline = start
+        # Seconds from the deadline to the start of the callback, over recent runs
+        self.lateness = lateness
+
+        self.run_count = 0
+        # Deadlines skipped because the previous run finished after them
+        self.missed_count = 0
+        self.max_lateness = 0.0
+
+    def run(self, now: float) -> None:
+        """
+        Runs the callback and advances to the next deadline after it finishes.
+        Deadlines already passed are counted as missed instead of being run late in a burst.
+        """
+        lateness = now - self.next_deadline
+        self.lateness.add(lateness, now)
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.run_count += 1
+
+        self.callback()
+
+        self.next_deadline += self.period
+        finished = time.monotonic()
+        if self.next_deadline <= finished:
+            missed = math.floor((finished - self.next_deadline) / self.period) + 1
+            self.missed_count += missed
+            self.next_deadline += missed * self.period
+
+    def summary(self) -> str:
+        """
+        Run and miss counts, and lateness.
+        """
+        if self.run_count == 0:
+            return f"{self.name}: not run"
+
+        return (
+            f"{self.name}: {self.run_count} runs, {self.missed_count} missed, lateness mean "
+            f"{self.lateness.mean * 1000:.3f} ms std {math.sqrt(self.lateness.variance) * 1000:.3f} ms "
+            f"max {self.max_lateness * 1000:.3f} ms"
+        )
+
+
+class PeriodicScheduler:
+    """
+    Runs any number of periodic tasks from one loop, sleeping until the earliest deadline.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        spin_time: float = 0.0,  # s
+    ) -> "tuple[True, PeriodicScheduler] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a PeriodicScheduler object.
+
+        spin_time: The last part of every wait is busy waited instead of slept, for deadlines
+        more precise than the operating system's sleep. Only for sub-millisecond periods,
+        as the process then uses a full core.
+        """
+        if spin_time < 0.0:
+            return False, None
+
+        return True, PeriodicScheduler(cls.__private_key, spin_time)
+
+    def __init__(self, key: object, spin_time: float) -> None:
+        assert key is PeriodicScheduler.__private_key, "Use create() method"
+
+        self.__spin_time = spin_time
+        self.tasks: "list[PeriodicTask]" = []
+
+    def add(
+        self,
+        name: str,
+        period: float,  # s
+        callback: Callable[[], object],
+        start: "float | None" = None,
+    ) -> bool:
+        """
+        Schedules callback every period.
+
+        start: Monotonic time of the first run, None for now.
+
+        Returns whether the task was added.
+        """
+        if period <= 0.0:
+            return False
+
+        result, lateness = rolling_statistics.RollingStatistics.create(JITTER_WINDOW_SIZE)
+        if not result:
+            return False
+
+        if start is None:
+            start = time.monotonic()
+
+        self.tasks.append(PeriodicTask(name, period, callback, start, lateness))
+        return True
+
+    def next_deadline(self) -> "float | None":
+        """
+        Monotonic time of the earliest deadline, None if there are no tasks.
+        """
+        return min((task.next_deadline for task in self.tasks), default=None)
+
+    def run_pending(self) -> None:
+        """
+        Runs every task that is due, earliest deadline first.
+        """
+        for task in sorted(self.tasks, key=lambda task: task.next_deadline):
+            now = time.monotonic()
+            if task.next_deadline > now:
+                break
+
+            task.run(now)
+
+    def run_next(self, max_wait: float) -> None:
+        """
+        Waits for the earliest deadline and runs every task that is due.
+
+        max_wait: Longest wait in seconds, so the caller can check for exit requests.
+        """
+        deadline = self.next_deadline()
+        now = time.monotonic()
+        wake = now + max_wait if deadline is None else min(deadline, now + max_wait)
+
+        sleep_time = wake - now - self.__spin_time
+        if sleep_time > 0.0:
+            time.sleep(sleep_time)
+        while time.monotonic() < wake:
+            pass
+
+        self.run_pending()
+
+    def summary(self) -> str:
+        """
+        Every task's summary.
+        """
+        return "; ".join(task.summary() for task in self.tasks)
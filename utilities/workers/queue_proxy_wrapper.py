@@ -51,6 +51,29 @@ class QueueProxyWrapper:
         except queue.Empty:
             return
 
+    def get_latest(self, timeout: float) -> "tuple[bool, object, int]":
+        """
+        Waits for an item and then drains the queue, keeping only the newest item.
+
+        timeout: Time waiting in seconds for the first item.
+
+        Returns whether an item was received, the newest item, and how many older items were discarded.
+        """
+        try:
+            item = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return False, None, 0
+
+        skipped = 0
+        while True:
+            try:
+                newer = self.queue.get_nowait()
+            except queue.Empty:
+                return True, item, skipped
+
+            item = newer
+            skipped += 1
+
     def fill_and_drain_queue(self) -> None:
         """
         Fill with sentinel and then drain.
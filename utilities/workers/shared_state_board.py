@@ -0,0 +1,178 @@
+"""
+Latest value board in shared memory.
+"""
+
+import multiprocessing.shared_memory
+import time
+
+import numpy as np
+
+
+HEADER_SIZE = 8  # bytes, one uint64 sequence number
+# Longest wait for a write in progress, a writer that died mid-write never finishes it
+READ_TIMEOUT = 0.1  # s
+
+
+class SharedStateBoard:
+    """
+    Fixed number of float64 values in shared memory, protected by a seqlock.
+
+    Exactly one process may write. Any number of processes may read a consistent
+    snapshot without IPC calls or pickling. The sequence number is odd while a write
+    is in progress, and the generation (sequence / 2) counts completed writes.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, field_count: int) -> "tuple[bool, SharedStateBoard | None]":
+        """
+        Allocates a new board, owned by the calling process.
+
+        field_count: Number of float64 values.
+
+        Returns whether the board was created and the board.
+        """
+        if field_count <= 0:
+            return False, None
+
+        try:
+            memory = multiprocessing.shared_memory.SharedMemory(
+                create=True, size=HEADER_SIZE + 8 * field_count
+            )
+        except OSError:
+            return False, None
+
+        board = SharedStateBoard(cls.__create_key, memory, field_count)
+        board.__sequence[0] = 0
+        board.__values[:] = np.nan
+        return True, board
+
+    @classmethod
+    def attach(cls, name: str, field_count: int) -> "tuple[bool, SharedStateBoard | None]":
+        """
+        Attaches to a board created by another process.
+
+        name: Name of the board from the creating process.
+        field_count: Number of float64 values.
+
+        Returns whether the board was found and the board.
+        """
+        try:
+            memory = multiprocessing.shared_memory.SharedMemory(name=name)
+        except (FileNotFoundError, OSError):
+            return False, None
+
+        if memory.size < HEADER_SIZE + 8 * field_count:
+            memory.close()
+            return False, None
+
+        return True, SharedStateBoard(cls.__create_key, memory, field_count)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        memory: multiprocessing.shared_memory.SharedMemory,
+        field_count: int,
+    ) -> None:
+        """
+        Private constructor, use create() or attach() methods.
+        """
+        assert class_private_create_key is SharedStateBoard.__create_key, "Use create() method"
+
+        self.__memory = memory
+        self.__field_count = field_count
+        self.__sequence = np.ndarray((1,), dtype=np.uint64, buffer=memory.buf)
+        self.__values = np.ndarray(
+            (field_count,), dtype=np.float64, buffer=memory.buf, offset=HEADER_SIZE
+        )
+
+    def __reduce__(self) -> "tuple":
+        """
+        Worker processes receive the board by name and attach to it.
+        """
+        return _attach_board, (self.__memory.name, self.__field_count)
+
+    @property
+    def name(self) -> str:
+        """
+        Name to attach with.
+        """
+        return self.__memory.name
+
+    @property
+    def generation(self) -> int:
+        """
+        Number of completed writes.
+        """
+        return int(self.__sequence[0]) // 2
+
+    def write(self, values: "np.ndarray | list[float]") -> None:
+        """
+        Replaces every value. Must only be called from one process.
+        """
+        self.__sequence[0] += 1
+        self.__values[:] = values
+        self.__sequence[0] += 1
+
+    def read(self, timeout: float = READ_TIMEOUT) -> "tuple[bool, int, np.ndarray | None]":
+        """
+        Returns whether a consistent copy was read within timeout seconds,
+        the generation, and the copy of the values.
+        """
+        deadline = None
+        while True:
+            sequence_before = int(self.__sequence[0])
+            if sequence_before % 2 == 0:
+                values = self.__values.copy()
+                if int(self.__sequence[0]) == sequence_before:
+                    return True, sequence_before // 2, values
+
+            # Write in progress, only the slow path reads the clock
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + timeout
+            elif now >= deadline:
+                return False, sequence_before // 2, None
+
+            # Yield so a writer sharing this core can finish
+            time.sleep(0)
+
+    def read_if_changed(self, last_generation: int) -> "tuple[bool, int, np.ndarray | None]":
+        """
+        Only copies the values if there has been a write since last_generation.
+
+        Returns whether anything changed and was read, the current generation, and the values.
+        """
+        if self.generation == last_generation:
+            return False, last_generation, None
+
+        result, generation, values = self.read()
+        if not result:
+            return False, last_generation, None
+
+        return True, generation, values
+
+    def close(self) -> None:
+        """
+        Detaches this process from the board.
+        """
+        # Views must be released before the buffer can be closed
+        del self.__sequence
+        del self.__values
+        self.__memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the board, only called by the creating process once every worker has stopped.
+        """
+        self.__memory.unlink()
+
+
+def _attach_board(name: str, field_count: int) -> SharedStateBoard:
+    """
+    Unpickle helper.
+    """
+    result, board = SharedStateBoard.attach(name, field_count)
+    assert result, f"Shared state board {name} no longer exists"
+    return board